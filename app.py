@@ -12,6 +12,10 @@ from dotenv import load_dotenv
 # Cargar variables de entorno
 load_dotenv()
 
+# Trazas OpenTelemetry (solo con TRACING_ENABLED=true; idempotente entre reruns)
+from src.observability.tracing import init_tracing
+init_tracing()
+
 # Configurar página
 st.set_page_config(
     page_title="Jami - Muebles Jamar",
@@ -126,10 +130,10 @@ def get_actor_id() -> str:
 
 @st.cache_resource
 def init_memory():
-    """Inicializa memoria (una sola vez)."""
-    from src.memory.manager import create_memory
+    """Inicializa memoria (una sola vez; el warm-up puede haberla creado ya)."""
+    from src.memory.manager import get_memory
     region = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
-    memory = create_memory(region_name=region)
+    memory = get_memory(region_name=region)
     return memory, region
 
 
@@ -198,228 +202,292 @@ class ResponseCapture:
         return all_text.strip()
 
 
-def get_mcp_client(region: str):
-    """Obtiene o crea el MCPClient."""
-    if "mcp_client" not in st.session_state:
-        try:
-            from strands.tools.mcp import MCPClient
-            from mcp.client.streamable_http import streamablehttp_client
-            import sys
-            import os
-            
-            # Agregar gateway al path
-            gateway_path = os.path.join(os.path.dirname(__file__), "gateway")
-            if gateway_path not in sys.path:
-                sys.path.insert(0, gateway_path)
-            from gateway.utils import get_ssm_parameter, get_cognito_token
-            
-            gateway_url = get_ssm_parameter("/jamar/agentcore/gateway_url", region)
-            if not gateway_url:
-                raise ValueError("Gateway URL no encontrada en SSM")
-            
-            # Obtener configuración de Cognito
-            client_id = get_ssm_parameter("/jamar/agentcore/cognito_client_id", region)
-            pool_id = get_ssm_parameter("/jamar/agentcore/cognito_pool_id", region)
-            
-            if not client_id or not pool_id:
-                raise ValueError("Cognito no configurado en SSM")
-            
-            # Obtener token real de Cognito
-            bearer_token = get_cognito_token(client_id, pool_id, region)
-            if not bearer_token:
-                raise ValueError("No se pudo obtener token de Cognito")
-            
-            mcp_client = MCPClient(
-                lambda: streamablehttp_client(
-                    gateway_url,
-                    headers={"Authorization": f"Bearer {bearer_token}"},
-                )
-            )
-            
-            # Guardar cliente para usar cuando se ejecute el agente
-            st.session_state.mcp_client = mcp_client
-            
-        except Exception as e:
-            st.session_state.mcp_client = None
-    
-    return st.session_state.get("mcp_client")
-
-
-def run_agent_with_gateway(prompt: str, actor_id: str):
+def start_warmup():
     """
-    Ejecuta el agente dentro del contexto del MCPClient.
-    IMPORTANTE: El agente DEBE crearse Y ejecutarse dentro del mismo contexto with mcp_client
-    para que las tools del Gateway funcionen correctamente.
+    Inicia el warm-up del proceso si no se hizo al arrancar (p.ej. con
+    `streamlit run app.py` en lugar de `python serve.py`).
     """
-    from src.core.agent import create_agent_in_context
-    
-    memory, region = init_memory()
-    mcp_client = get_mcp_client(region)
-    
-    if not mcp_client:
-        raise RuntimeError("MCPClient no disponible")
-    
-    # Obtener o crear session_id persistente (para mantener contexto)
+    from src.config import WARMUP_ENABLED
+    if not WARMUP_ENABLED:
+        return None
+    from src.core.warmup import start_warmup as start_process_warmup
+    return start_process_warmup(os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
+
+
+def wait_for_warmup():
+    """El primer turno espera a que termine el warm-up en curso (no lo repite)."""
+    from src.config import WARMUP_TIMEOUT
+    warmup = start_warmup()
+    if warmup is not None and not warmup.done:
+        with st.spinner("Preparando el asistente..."):
+            warmup.wait(WARMUP_TIMEOUT)
+
+
+def get_mcp_pool(region: str):
+    """Obtiene el pool de sesiones MCP compartido por todo el proceso."""
+    from src.core.mcp_pool import get_mcp_pool as get_process_pool
+    return get_process_pool(region)
+
+
+def get_session_id() -> str:
+    """Obtiene o crea el session_id persistente de la conversación."""
     # IMPORTANTE: El session_id debe ser el mismo durante toda la conversación
     if "session_id" not in st.session_state:
-        import uuid
         st.session_state.session_id = str(uuid.uuid4())
     
-    session_id = st.session_state.session_id
-    
     # Debug: Verificar que el session_id persiste
-    # print(f"🔍 Session ID: {session_id[:8]}... (persistente: {session_id in st.session_state})")
-    
-    # Crear y ejecutar agente dentro del mismo contexto
-    with mcp_client:
-        agent, _ = create_agent_in_context(
-            memory_id=memory["id"],
-            region=region,
-            actor_id=actor_id,
-            mcp_client=mcp_client,
-            session_id=session_id  # Usar session_id persistente
-        )
-        
-        # Ejecutar el agente dentro del mismo contexto
-        response = agent(prompt)
-        
-        return response, session_id
+    # print(f"🔍 Session ID: {st.session_state.session_id[:8]}...")
+    return st.session_state.session_id
 
 
-def get_response_text(response) -> str:
-    """Extrae texto de la respuesta del agente."""
+def restore_conversation(actor_id: str):
+    """
+    Retoma la conversación guardada del cliente (session_id e historial) si esta
+    sesión del navegador aún no tiene una, p.ej. porque llegó a otra réplica.
+    """
+    if "session_id" in st.session_state:
+        return
+    from src.core.session_store import get_session_store
     try:
-        # Si es string directo
-        if isinstance(response, str):
-            return response
-        
-        texts = []
-        
-        # 1. Intentar obtener del message.content
-        if hasattr(response, 'message'):
-            msg = response.message
-            
-            # Si message es un diccionario
-            if isinstance(msg, dict):
-                content = msg.get('content', [])
-                if isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict) and 'text' in item:
-                            texts.append(item['text'])
-                        elif isinstance(item, str):
-                            texts.append(item)
-                elif isinstance(content, str):
-                    texts.append(content)
-            
-            # Si message tiene atributo content (objeto)
-            elif hasattr(msg, 'content'):
-                content = msg.content
-                if isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict) and 'text' in item:
-                            texts.append(item['text'])
-                        elif isinstance(item, str):
-                            texts.append(item)
-                elif isinstance(content, str):
-                    texts.append(content)
-            
-            # Si message es string
-            elif isinstance(msg, str):
-                texts.append(msg)
-        
-        # 2. Buscar en tool_results (incluso si ya hay textos, pueden ser complementarios)
-        if hasattr(response, 'tool_results'):
-            tool_results = response.tool_results
-            if tool_results:
-                for tool_result in tool_results:
-                    # Si tool_result es un diccionario
-                    if isinstance(tool_result, dict):
-                        if 'result' in tool_result:
-                            result = tool_result['result']
-                            if isinstance(result, str) and result.strip():
-                                texts.append(result)
-                            elif isinstance(result, dict):
-                                if 'content' in result:
-                                    texts.append(str(result['content']))
-                                elif 'text' in result:
-                                    texts.append(str(result['text']))
-                                else:
-                                    texts.append(str(result))
-                        # Buscar directamente en el diccionario
-                        elif 'content' in tool_result:
-                            texts.append(str(tool_result['content']))
-                        elif 'text' in tool_result:
-                            texts.append(str(tool_result['text']))
-                    # Si tool_result es un objeto
-                    elif hasattr(tool_result, 'result'):
-                        result = tool_result.result
-                        if isinstance(result, str) and result.strip():
-                            texts.append(result)
-                        elif isinstance(result, dict):
-                            if 'content' in result:
-                                texts.append(str(result['content']))
-                            elif 'text' in result:
-                                texts.append(str(result['text']))
-                            else:
-                                texts.append(str(result))
-                    # Si tool_result es string directo
-                    elif isinstance(tool_result, str) and tool_result.strip():
-                        texts.append(tool_result)
-        
-        # 3. Si aún no hay texto, buscar en structured_output
-        if not texts and hasattr(response, 'structured_output'):
-            so = response.structured_output
-            if so:
-                if isinstance(so, str):
-                    texts.append(so)
-                elif isinstance(so, dict):
-                    texts.append(str(so))
-        
-        # 4. Si hay textos, unirlos
-        if texts:
-            return '\n'.join(texts)
-        
-        # 5. Último recurso - convertir todo a string y buscar texto útil
-        response_str = str(response)
-        if len(response_str) > 50:  # Si tiene contenido significativo
-            return response_str
-        
-        return "Lo siento, no pude procesar la respuesta. Por favor intenta de nuevo."
-        
+        state = get_session_store().get(actor_id)
+    except Exception as e:
+        print(f"⚠️ No se pudo leer la conversación guardada de {actor_id}: {e}")
+        return
+    if state:
+        st.session_state.session_id = state["session_id"]
+        st.session_state.messages = state.get("messages", [])
+
+
+def save_conversation(actor_id: str):
+    """Guarda session_id e historial de la UI en el store compartido por las réplicas."""
+    from src.core.session_store import conversation_state, get_session_store
+    try:
+        state = conversation_state(get_session_id(), st.session_state.get("messages", []))
+        get_session_store().put(actor_id, state)
     except Exception as e:
-        import traceback
-        return f"Error extrayendo respuesta: {e}"
+        print(f"⚠️ No se pudo guardar la conversación de {actor_id}: {e}")
+
+
+def forget_conversation(actor_id: str):
+    from src.core.session_store import get_session_store
+    try:
+        get_session_store().delete(actor_id)
+    except Exception as e:
+        print(f"⚠️ No se pudo borrar la conversación guardada de {actor_id}: {e}")
+
+
+def submit_turn(prompt: str, actor_id: str):
+    """
+    Envía el turno al motor de ejecución (fuera del hilo del script) y retorna
+    su handle (ver src/core/turns.py, compartido con la API HTTP).
+    """
+    from src.core.turns import submit_chat_turn
+    
+    # Resolver todo lo que depende de Streamlit en el hilo del script
+    memory, region = init_memory()
+    session_id = get_session_id()
+    first_turn = sum(1 for message in st.session_state.get("messages", []) if message["role"] == "user") <= 1
+    return submit_chat_turn(prompt, memory, region, actor_id, session_id, first_turn)
+
+
+def run_agent_with_gateway(prompt: str, actor_id: str):
+    """
+    Ejecuta el agente con una sesión MCP prestada del pool del proceso y espera la respuesta.
+    IMPORTANTE: El agente DEBE crearse Y ejecutarse mientras la sesión está prestada
+    para que las tools del Gateway funcionen correctamente (ver agent_turn).
+    """
+    handle = submit_turn(prompt, actor_id)
+    actor_id, session_id = handle.session_key
+    return handle.result(), session_id
 
 
 def render_response_with_images(text: str):
     """Renderiza respuesta con detección de URLs e imágenes."""
-    import re
+    from src.config import IMAGE_RENDER_TIMEOUT
+    from src.core.rendering import build_render_model
+    draw_render_model(build_render_model(text), IMAGE_RENDER_TIMEOUT)
+
+
+def draw_render_model(model, image_timeout: float = 0):
+    """
+    Dibuja una respuesta ya procesada (ver src/core/rendering.py).
+    `image_timeout`: segundos que se esperan las imágenes aún en descarga (ver load_product_images).
+    """
+    # Mostrar texto con markdown (links de producto ya clickeables)
+    st.markdown(model.markdown)
     
-    # Detectar URLs de productos
-    url_pattern = r'🔗 Ver producto: (https?://[^\s]+)'
-    image_pattern = r'🖼️ Imagen: (https?://[^\s]+)'
+    # Mostrar imágenes si hay
+    if model.images:
+        images = load_product_images(model.images, image_timeout)
+        cols = st.columns(len(model.images))
+        for i, img_url in enumerate(model.images):
+            with cols[i]:
+                try:
+                    st.image(images[img_url], use_container_width=True, caption=f"Producto {i+1}")
+                except Exception as e:
+                    print(f"⚠️ No se pudo mostrar la imagen {img_url}: {e}")
+
+
+def draw_product_cards(products: list, image_timeout: float = 0):
+    """Dibuja las tarjetas de producto de un turno (ver src/core/products.py), 3 por fila."""
+    images = load_product_images([product["image"] for product in products if product.get("image")], image_timeout)
+    for start in range(0, len(products), 3):
+        cols = st.columns(3)
+        for col, product in zip(cols, products[start:start + 3]):
+            with col.container(border=True):
+                if product.get("image"):
+                    try:
+                        st.image(images[product["image"]], use_container_width=True)
+                    except Exception as e:
+                        print(f"⚠️ No se pudo mostrar la imagen {product['image']}: {e}")
+                st.markdown(f"**[{product.get('number', start + 1)}] {product['name']}**")
+                details = [f"💰 {product['price']}" if product.get("price") else None,
+                           f"📦 Stock: {product['stock']}" if product.get("stock") else None]
+                if any(details):
+                    st.caption(" · ".join(detail for detail in details if detail))
+                st.markdown(f"🔗 [Ver producto]({product['url']})")
+
+
+def load_product_images(urls, timeout: float = 0) -> dict:
+    """
+    Miniaturas de las imágenes ya descargadas (ver src/core/images.py), o un
+    placeholder si no llegan en `timeout` segundos. Sin caché de imágenes, las URLs originales.
+    
+    Con timeout 0 (historial) nunca se espera: las que faltan siguen descargándose
+    en segundo plano y aparecen en el siguiente rerun. Solo la respuesta del turno
+    en curso espera hasta IMAGE_RENDER_TIMEOUT.
+    """
+    from src.config import IMAGE_CACHE_ENABLED
+    if not IMAGE_CACHE_ENABLED:
+        return {url: url for url in urls}
+    from src.core.images import get_image_cache, placeholder_image
+    thumbnails = get_image_cache().get_many(urls, timeout)
+    return {url: data if data is not None else (placeholder_image() or url) for url, data in thumbnails.items()}
+
+
+def render_history(messages: list):
+    """
+    Muestra el historial: solo la última página de mensajes; los anteriores
+    quedan detrás de un botón. Las respuestas se dibujan desde su modelo de
+    render cacheado en el mensaje (sin volver a procesar el texto).
+    """
+    from src.config import HISTORY_PAGE_SIZE
+    from src.core.rendering import message_render_model
     
-    # Extraer URLs e imágenes
-    urls = re.findall(url_pattern, text)
-    images = re.findall(image_pattern, text)
+    limit = st.session_state.get("history_limit", HISTORY_PAGE_SIZE)
+    hidden = max(0, len(messages) - limit) if limit > 0 else 0
+    if hidden and st.button(f"⬆️ Ver mensajes anteriores ({hidden})"):
+        limit += HISTORY_PAGE_SIZE
+        st.session_state.history_limit = limit
+        hidden = max(0, len(messages) - limit)
     
-    # Reemplazar en el texto para markdown
-    # Convertir URLs a links clickeables
-    text = re.sub(url_pattern, r'🔗 [Ver producto](\1)', text)
-    text = re.sub(image_pattern, '', text)  # Remover línea de imagen del texto
+    for message in messages[hidden:]:
+        with st.chat_message(message["role"], avatar="🛋️" if message["role"] == "assistant" else "👤"):
+            if message["role"] == "assistant":
+                draw_render_model(message_render_model(message))
+                if message.get("products"):
+                    draw_product_cards(message["products"])
+            else:
+                st.markdown(message["content"])
+
+
+def stream_response(handle, placeholder):
+    """
+    Escribe la respuesta del turno en `placeholder` a medida que llega.
+    Las tools usadas se muestran como línea de estado ("🔧 Usando: ...").
+    Si el turno ya había avanzado (rerun), se reproduce lo generado hasta ahora.
     
-    # Mostrar texto con markdown
-    st.markdown(text)
+    Returns:
+        AgentResult: Respuesta del agente
+    """
+    outcome = {}
     
-    # Mostrar imágenes si hay
-    if images:
-        cols = st.columns(min(len(images), 3))
-        for i, img_url in enumerate(images[:3]):
-            with cols[i]:
-                try:
-                    st.image(img_url, use_container_width=True, caption=f"Producto {i+1}")
-                except:
-                    pass  # Si falla cargar imagen, continuar
+    with placeholder.container():
+        status = st.empty()
+        status.caption("💭 Pensando...")
+        
+        def text_deltas():
+            for kind, payload in handle.events():
+                if kind == "text":
+                    yield payload
+                elif kind == "tool":
+                    status.caption(f"🔧 Usando: {payload}")
+                elif kind == "done":
+                    outcome["result"] = payload
+                elif kind == "error":
+                    raise payload
+        
+        st.write_stream(text_deltas())
+        status.empty()
+    
+    return outcome["result"]
+
+
+def render_turn(handle, streaming: bool):
+    """Muestra la respuesta de un turno del motor y la guarda en el historial."""
+    from src.config import IMAGE_RENDER_TIMEOUT
+    from src.core.rendering import RENDER_KEY, build_render_model
+    from src.core.turns import EMPTY_ANSWER, get_response_text, store_answer
+    from src.observability.phases import RENDER, phase
+    
+    with st.chat_message("assistant", avatar="🛋️"):
+        answer_area = st.empty()
+        try:
+            if streaming:
+                # Mostrar la respuesta token a token mientras el agente trabaja
+                response = stream_response(handle, answer_area)
+            else:
+                with st.spinner("Pensando..."):
+                    response = handle.result()
+            
+            with phase(RENDER):
+                # Obtener texto de la respuesta
+                response_text = get_response_text(response)
+                answered = bool(response_text and response_text.strip())
+                products = handle.products
+                
+                # Reemplazar el texto en streaming por la versión final
+                answer_area.empty()
+                with answer_area.container():
+                    # Si no hay respuesta ni tarjetas, mostrar mensaje de error
+                    if not answered:
+                        response_text = "" if products else EMPTY_ANSWER
+                        if not products:
+                            st.warning("⚠️ La respuesta está vacía")
+                    
+                    # Renderizar con imágenes y URLs (el modelo queda en el mensaje para los reruns)
+                    rendered = build_render_model(response_text)
+                    draw_render_model(rendered, IMAGE_RENDER_TIMEOUT)
+                    
+                    # Tarjetas de producto tomadas directamente del resultado de las tools
+                    if products:
+                        draw_product_cards(products, IMAGE_RENDER_TIMEOUT)
+            
+            # Guardar en historial
+            message = {"role": "assistant", "content": response_text, RENDER_KEY: rendered}
+            if products:
+                message["products"] = products
+            st.session_state.messages.append(message)
+            
+            if answered:
+                store_answer(handle, response_text)
+            
+        except Exception as e:
+            import traceback
+            error_details = "".join(traceback.format_exception(e))
+            error_msg = f"❌ Error: {str(e)}"
+            answer_area.empty()
+            st.error(error_msg)
+            
+            # Mostrar detalles del error en un expander
+            with st.expander("🔍 Ver detalles del error"):
+                st.code(error_details[:1000], language="python")
+            
+            st.session_state.messages.append({"role": "assistant", "content": error_msg})
+    
+    # Turno consumido (si un rerun interrumpe el render, el handle sigue pendiente)
+    save_conversation(handle.session_key[0])
+    st.session_state.pop("pending_turn", None)
 
 
 # ============================================================================
@@ -427,6 +495,8 @@ def render_response_with_images(text: str):
 # ============================================================================
 
 def main():
+    from src.config import STREAM_RESPONSES
+    
     # Header simple
     st.title("🛋️ Jami - Muebles Jamar")
     st.caption("Tu asistente de ventas virtual 🇵🇦")
@@ -434,6 +504,12 @@ def main():
     # Obtener actor_id
     actor_id = get_actor_id()
     
+    # Conversación guardada por otra réplica o en una sesión anterior del navegador
+    restore_conversation(actor_id)
+    
+    # Recursos compartidos del proceso (no bloquea la página)
+    start_warmup()
+    
     # Sidebar con info
     with st.sidebar:
         st.markdown("### 📊 Sesión")
@@ -441,8 +517,14 @@ def main():
         
         if st.button("🔄 Nueva conversación"):
             st.session_state.messages = []
-            if "agent" in st.session_state:
-                del st.session_state.agent
+            st.session_state.pop("history_limit", None)
+            pending_turn = st.session_state.pop("pending_turn", None)
+            if pending_turn is not None:
+                pending_turn.cancel()
+            if "session_id" in st.session_state:
+                from src.core.agent_registry import get_agent_registry
+                get_agent_registry().evict(actor_id, st.session_state.session_id)
+            forget_conversation(actor_id)
             st.rerun()
         
         st.markdown("---")
@@ -457,9 +539,12 @@ def main():
         st.session_state.messages = []
     
     # Mostrar historial de mensajes
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"], avatar="🛋️" if message["role"] == "assistant" else "👤"):
-            st.markdown(message["content"])
+    render_history(st.session_state.messages)
+    
+    # Retomar un turno en curso (p.ej. rerun del navegador mientras el agente trabajaba)
+    pending_turn = st.session_state.get("pending_turn")
+    if pending_turn is not None:
+        render_turn(pending_turn, STREAM_RESPONSES)
     
     # Input del usuario
     if prompt := st.chat_input("Escribe tu mensaje..."):
@@ -468,40 +553,10 @@ def main():
         with st.chat_message("user", avatar="👤"):
             st.markdown(prompt)
         
-        # Obtener respuesta del agente
-        with st.chat_message("assistant", avatar="🛋️"):
-            with st.spinner("Pensando..."):
-                try:
-                    # NUEVO: Usar run_agent_with_gateway que crea y ejecuta el agente
-                    # dentro del mismo contexto del MCPClient
-                    response, session_id = run_agent_with_gateway(prompt, actor_id)
-                    st.session_state.session_id = session_id
-                    
-                    # Obtener texto de la respuesta
-                    response_text = get_response_text(response)
-                    
-                    # Si no hay respuesta, mostrar mensaje de error
-                    if not response_text or response_text.strip() == "":
-                        response_text = "Lo siento, no pude generar una respuesta. Por favor intenta de nuevo."
-                        st.warning("⚠️ La respuesta está vacía")
-                    
-                    # Renderizar con imágenes y URLs
-                    render_response_with_images(response_text)
-                    
-                    # Guardar en historial
-                    st.session_state.messages.append({"role": "assistant", "content": response_text})
-                    
-                except Exception as e:
-                    import traceback
-                    error_details = traceback.format_exc()
-                    error_msg = f"❌ Error: {str(e)}"
-                    st.error(error_msg)
-                    
-                    # Mostrar detalles del error en un expander
-                    with st.expander("🔍 Ver detalles del error"):
-                        st.code(error_details[:1000], language="python")
-                    
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+        # Enviar el turno al motor y mostrar la respuesta del agente
+        wait_for_warmup()
+        st.session_state.pending_turn = submit_turn(prompt, actor_id)
+        render_turn(st.session_state.pending_turn, STREAM_RESPONSES)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,9 @@
+"""
+Benchmarks
+==========
+Mediciones de latencia del agente con dobles locales de los servicios de AWS.
+"""
+import os
+
+# Carpeta por defecto de los resultados (ignorada por git)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
@@ -0,0 +1,227 @@
+"""
+Latency Benchmark
+=================
+Benchmark de latencia por turno, de punta a punta y sin AWS.
+
+Ejecuta conversaciones de venta completas por el mismo camino de la app
+(`submit_turn` → motor → `agent_turn` → `create_agent_in_context` → `render_turn`)
+contra los dobles de `benchmarks/stand_ins.py`, y reporta p50/p95/p99 de cada
+fase (config, auth, conexión MCP, listado de tools, memoria, modelo, tools y
+render) y del turno completo.
+
+Uso:
+    python -m benchmarks.run_latency --conversations 20 --turns 6 --output benchmarks/results/antes.json
+    python -m benchmarks.run_latency --cold --tool-delay 0.2 --output benchmarks/results/frio.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import threading
+import time
+import uuid
+
+from benchmarks import RESULTS_DIR
+
+TOTAL = "turn"
+
+
+def percentile(values: list, q: float) -> float:
+    """Percentil q (0-100) con interpolación lineal."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: list) -> dict:
+    """Estadísticas en milisegundos de una lista de duraciones en segundos."""
+    millis = [sample * 1000 for sample in samples]
+    return {
+        "count": len(millis),
+        "mean_ms": round(sum(millis) / len(millis), 2) if millis else 0.0,
+        "p50_ms": round(percentile(millis, 50), 2),
+        "p95_ms": round(percentile(millis, 95), 2),
+        "p99_ms": round(percentile(millis, 99), 2),
+        "max_ms": round(max(millis), 2) if millis else 0.0,
+    }
+
+
+class PhaseRecorder:
+    """Listener de fases que acumula las duraciones del turno en curso."""
+
+    def __init__(self):
+        self.turn = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, seconds: float, attributes: dict):
+        with self._lock:
+            self.turn.setdefault(name, []).append(seconds)
+
+    def take(self) -> dict:
+        """Duraciones del turno, sumando las apariciones de cada fase."""
+        with self._lock:
+            turn, self.turn = self.turn, {}
+        return {name: sum(values) for name, values in turn.items()}
+
+
+def reset_process_state():
+    """Descarta lo que el proceso reutiliza entre turnos (arranque en frío)."""
+    import gateway.ssm_config as ssm_config
+    import gateway.token_manager as token_manager
+    from src.core import mcp_pool
+    from src.core.agent_registry import get_agent_registry
+    from src.core.tool_cache import get_tool_cache
+    from src.core.tool_catalog import get_tool_catalog
+    from src.memory import manager as memory_manager
+    from src.memory.retrieval import get_retrieval_cache
+
+    mcp_pool._close_pools()
+    with mcp_pool._pools_lock:
+        mcp_pool._pools.clear()
+    with ssm_config._loaders_lock:
+        ssm_config._loaders.clear()
+    with token_manager._managers_lock:
+        token_manager._managers.clear()
+    with memory_manager._memories_lock:
+        memory_manager._memories.clear()
+    get_tool_catalog().invalidate()
+    get_agent_registry().clear()
+    get_tool_cache().clear()
+    get_retrieval_cache().invalidate()
+
+
+def run(args) -> dict:
+    # Streamlit en modo "bare": sin servidor, st.* solo registra advertencias
+    from benchmarks.stand_ins import SALES_CONVERSATION, install_stand_ins, silence_streamlit, stand_in_options
+
+    silence_streamlit()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import streamlit as st
+        import app
+
+    from src.core.speculation import get_speculation_metrics
+    from src.memory.retrieval import get_retrieval_cache
+    from src.observability.phases import PHASES, add_phase_listener, remove_phase_listener
+
+    stand_ins = install_stand_ins(**stand_in_options(args))
+    get_speculation_metrics().reset()
+    get_retrieval_cache().reset_metrics()
+    recorder = PhaseRecorder()
+    add_phase_listener(recorder)
+
+    samples = {name: [] for name in PHASES + (TOTAL,)}
+    started = time.perf_counter()
+    try:
+        for conversation in range(args.conversations):
+            if args.cold:
+                reset_process_state()
+            st.session_state.session_id = str(uuid.uuid4())
+            st.session_state.messages = []
+            actor_id = f"bench_{conversation:04d}"
+
+            for turn in range(args.turns):
+                prompt = SALES_CONVERSATION[turn % len(SALES_CONVERSATION)][0]
+                st.session_state.messages.append({"role": "user", "content": prompt})
+
+                turn_started = time.perf_counter()
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+                    handle = app.submit_turn(prompt, actor_id)
+                    app.render_turn(handle, args.stream)
+                elapsed = time.perf_counter() - turn_started
+
+                phases = recorder.take()
+                for name in PHASES:
+                    samples[name].append(phases.get(name, 0.0))
+                samples[TOTAL].append(elapsed)
+
+                answer = st.session_state.messages[-1]["content"]
+                if answer.startswith("❌"):
+                    raise RuntimeError(f"Turno fallido ({actor_id}, turno {turn + 1}): {answer}")
+    finally:
+        remove_phase_listener(recorder)
+        stand_ins.uninstall()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "wall_time_s": round(time.perf_counter() - started, 3),
+        "parameters": {
+            "conversations": args.conversations,
+            "turns": args.turns,
+            "cold": args.cold,
+            "stream": args.stream,
+            **stand_in_options(args),
+        },
+        "stand_ins": {
+            "gateway_tool_calls": stand_ins.gateway.calls,
+            "memory_calls": stand_ins.memory.calls,
+            "ssm_calls": stand_ins.ssm.calls,
+            "cognito_calls": stand_ins.cognito.calls,
+        },
+        # Búsquedas de productos adelantadas (ver src/core/speculation.py)
+        "speculation": get_speculation_metrics().metrics(),
+        # Recuperaciones de LTM servidas desde la caché (ver src/memory/retrieval.py)
+        "memory_retrieval_cache": get_retrieval_cache().metrics(),
+        # Duración por turno de cada fase (0 si el turno no pasó por ella)
+        "phases": {name: summarize(samples[name]) for name in PHASES},
+        "turn": summarize(samples[TOTAL]),
+    }
+
+
+def print_report(results: dict):
+    print(f"\n⏱️ {results['parameters']['conversations']} conversaciones x {results['parameters']['turns']} turnos "
+          f"({'frío' if results['parameters']['cold'] else 'caliente'}) en {results['wall_time_s']}s")
+    print(f"{'fase':<18}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name, stats in list(results["phases"].items()) + [(TOTAL, results["turn"])]:
+        print(f"{name:<18}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    speculation = results["speculation"]
+    if speculation["started"]:
+        print(f"🔮 Búsquedas adelantadas: {speculation['started']} lanzadas, {speculation['hits']} usadas, "
+              f"{speculation['misses']} distintas, {speculation['unused']} sin usar, "
+              f"{speculation['saved_seconds'] * 1000:.0f}ms ahorrados")
+    retrieval = results["memory_retrieval_cache"]
+    if retrieval["hits"] + retrieval["misses"]:
+        print(f"🧠 Caché de memoria: {retrieval['hits']} aciertos, {retrieval['misses']} fallos "
+              f"({retrieval['hit_rate']:.0%} de las recuperaciones)")
+
+
+def main(argv=None):
+    from benchmarks.stand_ins import add_stand_in_arguments
+
+    parser = argparse.ArgumentParser(description="Benchmark de latencia por fase del agente (sin AWS)")
+    parser.add_argument("--conversations", type=int, default=10, help="Conversaciones a ejecutar")
+    parser.add_argument("--turns", type=int, default=6, help="Turnos por conversación")
+    parser.add_argument("--cold", action="store_true", help="Descartar pools y cachés antes de cada conversación")
+    parser.add_argument("--stream", action="store_true", help="Renderizar en streaming (STREAM_RESPONSES)")
+    add_stand_in_arguments(parser)
+    parser.add_argument(
+        "--output", default=os.path.join(RESULTS_DIR, "latency_results.json"), help="Archivo JSON de resultados"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Mostrar los logs del agente")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print_report(results)
+    print(f"\n✅ Resultados en {os.path.abspath(args.output)}")
+    # Los hilos de fondo (pool MCP, motor) no deben retrasar la salida
+    from src.observability.tracing import get_tracer, shutdown_tracing
+    if get_tracer() is not None:
+        shutdown_tracing()
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Load Test
+=========
+Prueba de carga con sesiones de navegador concurrentes, sin AWS.
+
+Cada sesión simulada es un `AppTest` de Streamlit que ejecuta `app.py`
+completo (el mismo `main()` que sirve la app) con su propio `actor_id` y
+`session_state`, y envía una conversación de venta por el `chat_input`. Todas
+las sesiones comparten el proceso (motor, pool MCP, cachés), como en un
+contenedor real, contra los dobles de `benchmarks/stand_ins.py`.
+
+Con `--no-sticky` cada mensaje se envía desde una sesión de navegador nueva
+(como si el balanceador lo enviara a otra réplica): la conversación debe
+retomarse desde el store de sesiones (`--session-store memory|sqlite|redis`,
+redis contra un servidor RESP local); si el historial no se recupera, el turno
+cuenta como error.
+
+Por cada nivel de concurrencia reporta throughput, percentiles de latencia por
+turno, hilos, crecimiento de RSS por sesión y tasa de errores. Antes del primer
+nivel se ejecuta una sesión de calentamiento (imports, pool MCP, catálogo) que
+no se reporta.
+
+Uso:
+    python -m benchmarks.run_load --sessions 1,5,10,20 --turns 6 --output benchmarks/results/carga.json
+    python -m benchmarks.run_load --sessions 5 --no-sticky --session-store redis
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+
+from benchmarks import RESULTS_DIR
+from benchmarks.run_latency import summarize
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+FAILED_PREFIXES = ("❌", "Lo siento")
+
+
+def rss_mb() -> float:
+    """RSS actual del proceso en MB (pico si /proc no está disponible)."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KB en Linux, bytes en macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ResourceMonitor:
+    """Muestrea hilos y RSS del proceso en segundo plano."""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.threads = []
+        self.rss = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="load-monitor")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self.threads.append(threading.active_count())
+            self.rss.append(rss_mb())
+            if self._stop.wait(self.interval):
+                return
+
+
+def open_browser_session(actor_id: str, timeout: float):
+    """Abre la app como una sesión de navegador nueva con el actor_id en la URL."""
+    from streamlit.testing.v1 import AppTest
+
+    app_test = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app_test.query_params["actor_id"] = actor_id
+    app_test.run()
+    return app_test
+
+
+def simulate_session(actor_id: str, prompts: list, think_time: float, timeout: float, results: list, sticky: bool = True):
+    """
+    Una sesión de navegador: abre la app y envía los mensajes uno a uno.
+    Sin `sticky`, cada mensaje sale de una sesión nueva (otra réplica).
+    """
+    app_test = open_browser_session(actor_id, timeout)
+
+    for turn, prompt in enumerate(prompts, start=1):
+        if think_time:
+            time.sleep(random.uniform(0, 2 * think_time))
+        started = time.perf_counter()
+        error = None
+        try:
+            if not sticky and turn > 1:
+                app_test = open_browser_session(actor_id, timeout)
+            app_test.chat_input[0].set_value(prompt).run()
+            if app_test.exception:
+                error = app_test.exception[0].message
+            else:
+                messages = app_test.session_state["messages"]
+                answer = messages[-1]["content"]
+                if answer.startswith(FAILED_PREFIXES):
+                    error = answer[:200]
+                elif len(messages) != 2 * turn:
+                    error = f"Historial perdido: {len(messages)} mensajes en el turno {turn}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append({
+            "actor_id": actor_id,
+            "turn": turn,
+            "seconds": time.perf_counter() - started,
+            "error": error,
+        })
+
+
+def run_level(sessions: int, args, prompts: list) -> dict:
+    """Ejecuta `sessions` sesiones concurrentes y resume el nivel."""
+    results = []
+    threads_before = threading.active_count()
+    rss_before = rss_mb()
+    started = time.perf_counter()
+
+    with ResourceMonitor() as monitor:
+        workers = [
+            threading.Thread(
+                target=simulate_session,
+                args=(f"load_{sessions:03d}_{index:03d}", prompts, args.think_time, args.timeout, results, args.sticky),
+                name=f"session-{index}",
+            )
+            for index in range(sessions)
+        ]
+        for worker in workers:
+            worker.start()
+            if args.ramp:
+                time.sleep(args.ramp / sessions)
+        for worker in workers:
+            worker.join()
+
+    wall = time.perf_counter() - started
+    rss_after = rss_mb()
+    ok = [result["seconds"] for result in results if result["error"] is None]
+    errors = [result for result in results if result["error"] is not None]
+    return {
+        "sessions": sessions,
+        "turns": len(results),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(results), 4) if results else 0.0,
+        "sample_errors": sorted({error["error"] for error in errors})[:5],
+        "wall_time_s": round(wall, 3),
+        "throughput_turns_per_s": round(len(ok) / wall, 3) if wall else 0.0,
+        "latency": summarize(ok),
+        "threads": {
+            "before": threads_before,
+            "max": max(monitor.threads, default=threads_before),
+            "after": threading.active_count(),
+        },
+        "rss_mb": {
+            "before": round(rss_before, 1),
+            "peak": round(max(monitor.rss, default=rss_after), 1),
+            "after": round(rss_after, 1),
+            "growth_per_session": round((rss_after - rss_before) / sessions, 2),
+        },
+    }
+
+
+def install_session_store(stand_ins, kind: str):
+    """Reemplaza el store de sesiones del proceso por uno nuevo del tipo pedido."""
+    import tempfile
+
+    from benchmarks.stand_ins import LocalRespServer
+    from src.core import session_store
+
+    url = ""
+    if kind == "sqlite":
+        url = os.path.join(tempfile.mkdtemp(prefix="load-sessions-"), "sessions.db")
+    elif kind == "redis":
+        url = LocalRespServer().start()
+    stand_ins.patch(session_store, "_store", session_store.create_session_store(kind, url))
+
+
+def run(args) -> dict:
+    from benchmarks.stand_ins import SALES_CONVERSATION, install_stand_ins, silence_streamlit, stand_in_options
+
+    silence_streamlit()
+    stand_ins = install_stand_ins(**stand_in_options(args))
+    install_session_store(stand_ins, args.session_store)
+    prompts = [SALES_CONVERSATION[turn % len(SALES_CONVERSATION)][0] for turn in range(args.turns)]
+    levels = [int(level) for level in args.sessions.split(",") if level.strip()]
+
+    report = []
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+            simulate_session("load_warmup", prompts[:1], 0, args.timeout, [])
+        for sessions in levels:
+            print(f"👥 {sessions} sesiones concurrentes...", file=sys.stderr)
+            with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+                report.append(run_level(sessions, args, prompts))
+    finally:
+        stand_ins.uninstall()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "parameters": {
+            "sessions": levels,
+            "turns": args.turns,
+            "think_time": args.think_time,
+            "ramp": args.ramp,
+            "sticky": args.sticky,
+            "session_store": args.session_store,
+            **stand_in_options(args),
+        },
+        "stand_ins": {
+            "gateway_tool_calls": stand_ins.gateway.calls,
+            "memory_calls": stand_ins.memory.calls,
+        },
+        "levels": report,
+    }
+
+
+def print_report(results: dict):
+    print(f"\n👥 Carga: {results['parameters']['turns']} turnos por sesión")
+    print(f"{'sesiones':>9}{'turnos/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'errores':>9}{'hilos':>7}{'RSS/ses':>9}")
+    for level in results["levels"]:
+        print(
+            f"{level['sessions']:>9}{level['throughput_turns_per_s']:>10.2f}"
+            f"{level['latency']['p50_ms'] / 1000:>8.2f}s{level['latency']['p95_ms'] / 1000:>8.2f}s"
+            f"{level['latency']['p99_ms'] / 1000:>8.2f}s{level['error_rate']:>9.1%}"
+            f"{level['threads']['max']:>7}{level['rss_mb']['growth_per_session']:>7.1f}MB"
+        )
+
+
+def main(argv=None):
+    from benchmarks.stand_ins import add_stand_in_arguments
+
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes de la app (sin AWS)")
+    parser.add_argument("--sessions", default="1,5,10", help="Niveles de sesiones concurrentes, separados por coma")
+    parser.add_argument("--turns", type=int, default=6, help="Turnos por sesión")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Pausa media (s) del usuario entre mensajes")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Segundos para abrir todas las sesiones de un nivel")
+    parser.add_argument("--timeout", type=float, default=120, help="Segundos máximos por turno")
+    parser.add_argument("--no-sticky", dest="sticky", action="store_false",
+                        help="Enviar cada mensaje desde una sesión de navegador nueva (otra réplica)")
+    parser.add_argument("--session-store", choices=("memory", "sqlite", "redis"), default="memory",
+                        help="Backend del store de sesiones (redis: servidor RESP local)")
+    add_stand_in_arguments(parser)
+    parser.add_argument(
+        "--output", default=os.path.join(RESULTS_DIR, "load_results.json"), help="Archivo JSON de resultados"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Mostrar los logs del agente")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print_report(results)
+    print(f"\n✅ Resultados en {os.path.abspath(args.output)}")
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Render Benchmark
+================
+Tiempo de rerun de la página según el largo de la conversación.
+
+Para cada largo de historial abre la app (`AppTest`, el mismo `app.py`) con
+la conversación de venta repetida en `session_state` y mide el primer render
+y los reruns siguientes (p.ej. al escribir en el chat), junto con la cantidad
+de elementos enviados al navegador. Con `--page-size 0` se muestra todo el
+historial en cada rerun (comportamiento sin paginación) para comparar.
+
+Uso:
+    python -m benchmarks.run_render --lengths 10,50,100,200,400 --output benchmarks/results/render.json
+    python -m benchmarks.run_render --page-size 0 --output benchmarks/results/render_sin_paginar.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import uuid
+
+from benchmarks import RESULTS_DIR
+from benchmarks.run_latency import summarize
+from benchmarks.run_load import APP_PATH
+
+
+def conversation_messages(length: int) -> list:
+    """Historial de `length` mensajes con la conversación de venta (respuestas con links e imágenes)."""
+    from benchmarks.stand_ins import SALES_CONVERSATION
+
+    messages = []
+    for index in range(length):
+        prompt, _, answer = SALES_CONVERSATION[(index // 2) % len(SALES_CONVERSATION)]
+        if index % 2 == 0:
+            messages.append({"role": "user", "content": prompt})
+        else:
+            messages.append({"role": "assistant", "content": answer})
+    return messages
+
+
+def count_elements(node) -> int:
+    """Elementos del árbol de la página (lo que se envía al navegador en cada rerun)."""
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def measure(length: int, reruns: int, timeout: float) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    app_test = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app_test.query_params["actor_id"] = f"render_{length:04d}"
+    app_test.session_state["session_id"] = str(uuid.uuid4())
+    app_test.session_state["messages"] = conversation_messages(length)
+
+    started = time.perf_counter()
+    app_test.run()
+    first = time.perf_counter() - started
+    if app_test.exception:
+        raise RuntimeError(app_test.exception[0].message)
+
+    samples = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app_test.run()
+        samples.append(time.perf_counter() - started)
+
+    return {
+        "messages": length,
+        "first_render_ms": round(first * 1000, 2),
+        "rerun": summarize(samples),
+        "elements": count_elements(app_test._tree.main),
+    }
+
+
+def run(args) -> dict:
+    from benchmarks.stand_ins import install_stand_ins, silence_streamlit, stand_in_options
+
+    import src.config
+
+    silence_streamlit()
+    stand_ins = install_stand_ins(**stand_in_options(args))
+    stand_ins.patch(src.config, "HISTORY_PAGE_SIZE", args.page_size)
+    lengths = [int(length) for length in args.lengths.split(",") if length.strip()]
+
+    report = []
+    try:
+        for length in lengths:
+            print(f"📜 {length} mensajes...", file=sys.stderr)
+            with contextlib.redirect_stdout(io.StringIO()):
+                report.append(measure(length, args.reruns, args.timeout))
+    finally:
+        stand_ins.uninstall()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "parameters": {"lengths": lengths, "reruns": args.reruns, "page_size": args.page_size},
+        "lengths": report,
+    }
+
+
+def print_report(results: dict):
+    page_size = results["parameters"]["page_size"]
+    print(f"\n📜 Rerun según largo del historial (página: {page_size or 'todo'})")
+    print(f"{'mensajes':>9}{'1er render':>12}{'rerun p50':>11}{'rerun p95':>11}{'elementos':>11}")
+    for length in results["lengths"]:
+        print(
+            f"{length['messages']:>9}{length['first_render_ms']:>10.1f}ms"
+            f"{length['rerun']['p50_ms']:>9.1f}ms{length['rerun']['p95_ms']:>9.1f}ms{length['elements']:>11}"
+        )
+
+
+def main(argv=None):
+    from benchmarks.stand_ins import add_stand_in_arguments
+    from src.config import HISTORY_PAGE_SIZE
+
+    parser = argparse.ArgumentParser(description="Tiempo de rerun de la app según el largo de la conversación")
+    parser.add_argument("--lengths", default="10,50,100,200", help="Largos de historial (mensajes), separados por coma")
+    parser.add_argument("--reruns", type=int, default=20, help="Reruns medidos por largo")
+    parser.add_argument("--page-size", type=int, default=HISTORY_PAGE_SIZE, help="HISTORY_PAGE_SIZE (0 = mostrar todo)")
+    parser.add_argument("--timeout", type=float, default=60, help="Segundos máximos por rerun")
+    add_stand_in_arguments(parser)
+    parser.add_argument(
+        "--output", default=os.path.join(RESULTS_DIR, "render_results.json"), help="Archivo JSON de resultados"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print_report(results)
+    print(f"\n✅ Resultados en {os.path.abspath(args.output)}")
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,700 @@
+"""
+Stand-ins
+=========
+Dobles locales de los servicios externos del agente, para medir latencia sin AWS.
+
+- LocalGatewayServer: servidor MCP streamable-HTTP con las tools del Gateway
+  (mismo prefijo `target___tool`), con latencia configurable por llamada.
+- ScriptedBedrockModel: modelo que responde a un guion (tool uses y texto) con
+  tiempo hasta el primer token y latencia por token configurables.
+- InMemoryAgentCoreMemory: data plane de AgentCore Memory en memoria
+  (eventos de la conversación y recuperación de LTM por namespace).
+- FakeSSM / FakeCognito: configuración del Gateway y token JWT.
+- LocalRespServer: servidor con protocolo Redis para el store de sesiones.
+- FakeImageCDN: imágenes de producto generadas localmente, con latencia.
+
+`install_stand_ins()` conecta los dobles en los puntos de extensión del código
+real (cliente SSM, cliente Cognito, create_model, create_session_manager,
+create_memory / get_control_client y fetch_image), así el benchmark ejecuta el
+mismo camino que la app.
+"""
+import asyncio
+import base64
+import contextlib
+import json
+import re
+import threading
+import time
+import unicodedata
+import uuid
+
+from strands.models import Model
+
+GATEWAY_TARGET = "jamar-tools"
+REGION = "us-east-1"
+MEMORY_ID = "benchmark-memory"
+CLIENT_ID = "benchmark-client"
+POOL_ID = "us-east-1_benchmark"
+
+# Tools que el system prompt le ofrece al agente vía Gateway
+GATEWAY_TOOLS = [
+    "buscar_productos", "obtener_detalle_producto", "recomendar_productos", "ver_categorias",
+    "buscar_en_coleccion", "obtener_preguntas_necesidades", "obtener_complementos", "obtener_menu_principal",
+    "obtener_politicas", "buscar_sucursal", "buscar_info_jamar", "explorar_articulos_ayuda", "leer_pagina_jamar",
+    "web_search", "consultar_pedido", "guardar_nombre_cliente", "guardar_ubicacion_cliente",
+    "guardar_contacto_notificacion", "info_credijamar", "obtener_pitch_credijamar", "iniciar_simulacion_credijamar",
+    "ofrecer_estudio_credito", "solicitar_datos_estudio", "procesar_estudio_credito", "manejar_objecion",
+    "obtener_cierre_venta", "obtener_despedida",
+]
+
+# Conversación de venta típica: (mensaje del cliente, pasos de tools, respuesta final)
+SALES_CONVERSATION = [
+    (
+        "Hola, busco un comedor de 6 puestos",
+        [[("obtener_preguntas_necesidades", {"categoria": "comedor"})]],
+        "¡Hola! Con gusto te ayudo con tu comedor de 6 puestos. ¿Qué presupuesto tienes en mente "
+        "y prefieres madera o vidrio?",
+    ),
+    (
+        "Mi presupuesto es hasta $800, me gusta la madera",
+        [[
+            ("buscar_productos", {"termino_busqueda": "comedor 6 puestos madera", "precio_maximo": 800}),
+            ("obtener_complementos", {"categoria": "comedor"}),
+        ]],
+        "Estas son mis recomendaciones:\n\n"
+        "1. **Comedor Nórdico 6 puestos** - $749\n"
+        "🔗 Ver producto: https://www.jamar.com.pa/products/comedor-nordico\n"
+        "🖼️ Imagen: https://cdn.jamar.com.pa/comedor-nordico.jpg\n\n"
+        "2. **Comedor Roble 6 puestos** - $699\n"
+        "🔗 Ver producto: https://www.jamar.com.pa/products/comedor-roble\n"
+        "🖼️ Imagen: https://cdn.jamar.com.pa/comedor-roble.jpg\n\n"
+        "¿Cuál te gusta más?",
+    ),
+    (
+        "Muéstrame el detalle del Comedor Nórdico",
+        [[("obtener_detalle_producto", {"nombre": "Comedor Nórdico 6 puestos"})]],
+        "El **Comedor Nórdico 6 puestos** es de madera de pino con acabado natural, mide 180x90 cm "
+        "e incluye 6 sillas tapizadas.\n"
+        "🔗 Ver producto: https://www.jamar.com.pa/products/comedor-nordico\n"
+        "🖼️ Imagen: https://cdn.jamar.com.pa/comedor-nordico.jpg",
+    ),
+    (
+        "¿Puedo pagarlo a cuotas?",
+        [[
+            ("obtener_pitch_credijamar", {"monto": 749}),
+            ("iniciar_simulacion_credijamar", {"monto": 749}),
+        ]],
+        "¡Claro! Con Credijamar puedes pagarlo en cuotas desde $35 quincenales. "
+        "¿Quieres que hagamos el estudio de crédito?",
+    ),
+    (
+        "Primero quiero verlo, ¿hay tienda en David?",
+        [
+            [("buscar_sucursal", {"ciudad": "David"})],
+            [("guardar_ubicacion_cliente", {"ciudad": "David"})],
+        ],
+        "Sí, tenemos tienda en David, Chiriquí: Plaza Terronal, local 12, abierta de 9:00 a 19:00.",
+    ),
+    (
+        "Gracias, eso es todo por hoy",
+        [[("obtener_despedida", {})]],
+        "¡Gracias a ti! Aquí estaré cuando quieras volver. 🛋️",
+    ),
+]
+
+
+# Respuestas del guion con tarjetas de producto activas (PRODUCT_CARDS_PROMPT en el system
+# prompt): el modelo solo presenta las tarjetas, sin copiar links, imágenes ni precios
+CARD_ANSWERS = {
+    "Mi presupuesto es hasta $800, me gusta la madera":
+        "Estas son mis recomendaciones en madera dentro de tu presupuesto: el [1] y el [2] son de 6 puestos. "
+        "¿Cuál te gusta más?",
+    "Muéstrame el detalle del Comedor Nórdico":
+        "El **Comedor Nórdico 6 puestos** [1] es de madera de pino con acabado natural, mide 180x90 cm "
+        "e incluye 6 sillas tapizadas.",
+}
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def make_jwt(lifetime: float = 3600) -> str:
+    """JWT sin firma con `exp` (el token manager solo decodifica el payload)."""
+    def encode(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'none'})}.{encode({'exp': int(time.time() + lifetime)})}.firma"
+
+
+# ============================================================================
+# GATEWAY (servidor MCP local)
+# ============================================================================
+
+def _tool_result(name: str, arguments: dict) -> str:
+    """Resultado de ejemplo de cada tool (con el formato de links e imágenes del Gateway)."""
+    if name in ("buscar_productos", "recomendar_productos", "buscar_en_coleccion"):
+        # Los primeros coinciden con los que recomienda el guion (mismas URLs de imagen)
+        slugs = ["comedor-nordico", "comedor-roble", "producto-3", "producto-4", "producto-5"]
+        lines = []
+        for index, slug in enumerate(slugs, start=1):
+            lines.append(
+                f"{index}. Producto {index} ({arguments.get('termino_busqueda', 'mueble')}) - ${500 + index * 50}\n"
+                f"🔗 Ver producto: https://www.jamar.com.pa/products/{slug}\n"
+                f"🖼️ Imagen: https://cdn.jamar.com.pa/{slug}.jpg"
+            )
+        return "\n\n".join(lines)
+    if name == "obtener_detalle_producto":
+        return (
+            f"{arguments.get('nombre', 'Producto')}: madera de pino, 180x90 cm, 6 sillas.\n"
+            "🔗 Ver producto: https://www.jamar.com.pa/products/comedor-nordico\n"
+            "🖼️ Imagen: https://cdn.jamar.com.pa/comedor-nordico.jpg"
+        )
+    # Tools con texto listo para el cliente (las que usan las rutas directas, ver src/core/intents.py)
+    if name == "obtener_menu_principal":
+        return (
+            "¡Con gusto! Esto es lo que puedo hacer por ti:\n"
+            "1️⃣ Buscar productos\n2️⃣ Consultar tu pedido\n3️⃣ Credijamar\n4️⃣ Sucursales\n5️⃣ Otra consulta"
+        )
+    if name == "obtener_politicas":
+        return f"📄 Política de {arguments.get('tipo', 'envios')}: aplica en todo el país, consulta condiciones en jamar.com.pa."
+    if name == "buscar_sucursal":
+        zona = arguments.get("zona") or arguments.get("ciudad") or "Panamá"
+        return f"🏬 Jamar {zona.title()}: Plaza Terronal, local 12, abierta de 9:00 a 19:00."
+    return json.dumps({"tool": name, "ok": True, "argumentos": arguments}, ensure_ascii=False)
+
+
+class LocalGatewayServer:
+    """
+    Servidor MCP streamable-HTTP local que imita al AgentCore Gateway.
+
+    Args:
+        tool_delay: Segundos de latencia de cada llamada a una tool
+        list_delay: Segundos de latencia de cada página de tools/list
+    """
+
+    def __init__(self, tool_delay: float = 0.05, list_delay: float = 0.02, tools=GATEWAY_TOOLS, target: str = GATEWAY_TARGET):
+        self.tool_delay = tool_delay
+        self.list_delay = list_delay
+        self.tool_names = [f"{target}___{name}" for name in tools]
+        self.calls = 0
+        self._server = None
+        self._thread = None
+        self.url = None
+
+    def _build_app(self):
+        import mcp.types as types
+        from mcp.server.lowlevel import Server
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.routing import Mount
+
+        server = Server("jamar-gateway-local")
+        tool_list = [
+            types.Tool(
+                name=name,
+                description=f"Tool {name.rsplit('___', 1)[-1]} del Gateway local",
+                inputSchema={"type": "object", "properties": {}, "additionalProperties": True},
+            )
+            for name in self.tool_names
+        ]
+
+        @server.list_tools()
+        async def list_tools():
+            await asyncio.sleep(self.list_delay)
+            return tool_list
+
+        @server.call_tool()
+        async def call_tool(name, arguments):
+            self.calls += 1
+            await asyncio.sleep(self.tool_delay)
+            return [types.TextContent(type="text", text=_tool_result(name.rsplit("___", 1)[-1], arguments or {}))]
+
+        manager = StreamableHTTPSessionManager(app=server, stateless=True)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with manager.run():
+                yield
+
+        return Starlette(routes=[Mount("/mcp", app=manager.handle_request)], lifespan=lifespan)
+
+    def start(self) -> str:
+        """Levanta el servidor en un hilo (puerto libre) y retorna su URL."""
+        import uvicorn
+
+        config = uvicorn.Config(self._build_app(), host="127.0.0.1", port=0, log_level="warning", access_log=False, lifespan="on")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True, name="local-gateway")
+        self._thread.start()
+
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("No se pudo iniciar el Gateway local")
+            time.sleep(0.01)
+
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/mcp"
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+
+# ============================================================================
+# MODELO
+# ============================================================================
+
+class ScriptedBedrockModel(Model):
+    """
+    Modelo que sigue un guion: para el último mensaje del cliente pide los
+    pasos de tools del guion y luego responde el texto final en streaming.
+
+    Args:
+        script: Lista de (mensaje, pasos de tools, respuesta) (ver SALES_CONVERSATION)
+        first_token_latency: Segundos hasta el primer evento de cada llamada
+        token_latency: Segundos entre tokens de texto
+    """
+
+    def __init__(self, script=SALES_CONVERSATION, first_token_latency: float = 0.3, token_latency: float = 0.01):
+        self.turns = {_normalize(prompt): (steps, answer) for prompt, steps, answer in script}
+        self.card_answers = {_normalize(prompt): answer for prompt, answer in CARD_ANSWERS.items()}
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.config = {"model_id": "scripted-bedrock-model"}
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("El modelo de benchmark no soporta structured output")
+        yield
+
+    def _plan(self, messages: list, tool_specs, cards: bool = False) -> tuple:
+        """Retorna (tool uses a pedir, o None, y texto final) según el guion."""
+        last_user = None
+        for index in range(len(messages) - 1, -1, -1):
+            message = messages[index]
+            if message["role"] == "user" and not any("toolResult" in block for block in message["content"]):
+                last_user = index
+                break
+
+        prompt = ""
+        if last_user is not None:
+            texts = [block["text"] for block in messages[last_user]["content"] if "text" in block]
+            prompt = texts[-1] if texts else ""
+        steps, answer = self.turns.get(_normalize(prompt), ([], f"Entendido: {prompt}"))
+        if cards:
+            answer = self.card_answers.get(_normalize(prompt), answer)
+
+        done = 0 if last_user is None else sum(
+            1 for message in messages[last_user + 1:]
+            if message["role"] == "assistant" and any("toolUse" in block for block in message["content"])
+        )
+        if done < len(steps):
+            available = {spec["name"].rsplit("___", 1)[-1]: spec["name"] for spec in tool_specs or []}
+            tool_uses = [(available[name], arguments) for name, arguments in steps[done] if name in available]
+            if tool_uses:
+                return tool_uses, None
+        return None, answer
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        cards = "TARJETAS DE PRODUCTO" in (system_prompt or "")
+        tool_uses, answer = self._plan(messages, tool_specs, cards)
+        input_tokens = sum(len(json.dumps(message["content"], ensure_ascii=False)) for message in messages) // 4
+        if system_prompt:
+            input_tokens += len(system_prompt) // 4
+
+        await asyncio.sleep(self.first_token_latency)
+        yield {"messageStart": {"role": "assistant"}}
+
+        if tool_uses:
+            for name, arguments in tool_uses:
+                yield {"contentBlockStart": {"start": {"toolUse": {"name": name, "toolUseId": f"tooluse_{uuid.uuid4().hex[:16]}"}}}}
+                yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(arguments, ensure_ascii=False)}}}}
+                yield {"contentBlockStop": {}}
+            output_tokens = 20 * len(tool_uses)
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            tokens = re.findall(r"\S+\s*", answer)
+            yield {"contentBlockStart": {"start": {}}}
+            for token in tokens:
+                await asyncio.sleep(self.token_latency)
+                yield {"contentBlockDelta": {"delta": {"text": token}}}
+            yield {"contentBlockStop": {}}
+            output_tokens = len(tokens)
+            yield {"messageStop": {"stopReason": "end_turn"}}
+
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+                "metrics": {"latencyMs": 0},
+            }
+        }
+
+
+# ============================================================================
+# AGENTCORE MEMORY
+# ============================================================================
+
+class InMemoryAgentCoreMemory:
+    """
+    Data plane de AgentCore Memory en memoria (API de boto3 `bedrock-agentcore`),
+    más GetMemory del control plane para verificar el ID.
+
+    Los mensajes del cliente se copian como registros de LTM en el namespace
+    de interacciones, como haría la estrategia semántica.
+
+    Args:
+        delay: Segundos de latencia de cada llamada
+    """
+
+    def __init__(self, delay: float = 0.03):
+        self.delay = delay
+        self.events = {}
+        self.records = {}
+        self.calls = {"create_event": 0, "list_events": 0, "retrieve_memory_records": 0, "get_memory": 0}
+        self._lock = threading.Lock()
+
+    def get_memory(self, memoryId, **kwargs):
+        # Control plane: verificación del ID de la memoria
+        self.calls["get_memory"] += 1
+        time.sleep(self.delay)
+        return {"memory": {"id": memoryId, "status": "ACTIVE"}}
+
+    def create_event(self, memoryId, actorId, sessionId, payload, eventTimestamp, **kwargs):
+        self.calls["create_event"] += 1
+        time.sleep(self.delay)
+        event = {
+            "memoryId": memoryId,
+            "actorId": actorId,
+            "sessionId": sessionId,
+            "eventId": f"evt-{uuid.uuid4().hex}",
+            "eventTimestamp": eventTimestamp,
+            "payload": payload,
+        }
+        with self._lock:
+            self.events.setdefault((actorId, sessionId), []).append(event)
+            for item in payload:
+                conversational = item.get("conversational")
+                if conversational and conversational.get("role") == "USER":
+                    self._extract(actorId, conversational["content"]["text"])
+        return {"event": event}
+
+    def _extract(self, actor_id: str, text: str):
+        # Llamado con el lock tomado
+        try:
+            message = json.loads(text)["message"]
+            text = " ".join(block["text"] for block in message["content"] if "text" in block)
+        except (ValueError, KeyError, TypeError):
+            pass
+        if text and not text.startswith("<"):
+            self.records.setdefault(f"shopify/customer/{actor_id}/interactions", []).append(text[:300])
+
+    def list_events(self, memoryId, actorId, sessionId, maxResults=100, nextToken=None, **kwargs):
+        self.calls["list_events"] += 1
+        time.sleep(self.delay)
+        with self._lock:
+            # La API retorna del más reciente al más antiguo
+            events = list(reversed(self.events.get((actorId, sessionId), [])))
+        start = int(nextToken or 0)
+        page = events[start:start + maxResults]
+        response = {"events": page}
+        if start + maxResults < len(events):
+            response["nextToken"] = str(start + maxResults)
+        return response
+
+    def get_event(self, memoryId, actorId, sessionId, eventId, **kwargs):
+        with self._lock:
+            for event in self.events.get((actorId, sessionId), []):
+                if event["eventId"] == eventId:
+                    return {"event": event}
+        return None
+
+    def retrieve_memory_records(self, memoryId, namespace, searchCriteria, **kwargs):
+        self.calls["retrieve_memory_records"] += 1
+        time.sleep(self.delay)
+        query = set(_normalize(searchCriteria.get("searchQuery", "")).split())
+        with self._lock:
+            records = list(self.records.get(namespace, []))
+        scored = []
+        for text in records:
+            words = set(_normalize(text).split())
+            score = len(query & words) / max(1, len(query | words))
+            scored.append({"content": {"text": text}, "score": round(score, 3), "namespaces": [namespace]})
+        scored.sort(key=lambda record: record["score"], reverse=True)
+        return {"memoryRecordSummaries": scored[:searchCriteria.get("topK", 10)]}
+
+
+class FakeBotoSession:
+    """boto3.Session cuyos clientes de AgentCore Memory son el doble en memoria."""
+
+    region_name = REGION
+
+    def __init__(self, data_plane: InMemoryAgentCoreMemory):
+        self.data_plane = data_plane
+
+    def client(self, service_name, region_name=None, config=None, **kwargs):
+        return self.data_plane
+
+
+# ============================================================================
+# SSM / COGNITO
+# ============================================================================
+
+class _FakePaginator:
+    def __init__(self, parameters: list):
+        self.parameters = parameters
+
+    def paginate(self, **kwargs):
+        yield {"Parameters": self.parameters}
+
+
+class FakeSSM:
+    """Cliente SSM con los parámetros de /jamar/agentcore/ apuntando al Gateway local."""
+
+    def __init__(self, gateway_url: str, delay: float = 0.03):
+        self.delay = delay
+        self.calls = 0
+        self.parameters = [
+            {"Name": "/jamar/agentcore/gateway_url", "Value": gateway_url},
+            {"Name": "/jamar/agentcore/cognito_client_id", "Value": CLIENT_ID},
+            {"Name": "/jamar/agentcore/cognito_pool_id", "Value": POOL_ID},
+            {"Name": "/jamar/agentcore/memory_id", "Value": MEMORY_ID},
+        ]
+
+    def get_paginator(self, operation_name):
+        self.calls += 1
+        time.sleep(self.delay)
+        return _FakePaginator(self.parameters)
+
+    def get_parameters(self, Names, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"Parameters": [parameter for parameter in self.parameters if parameter["Name"] in Names]}
+
+    def get_parameter(self, Name, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        for parameter in self.parameters:
+            if parameter["Name"] == Name:
+                return {"Parameter": parameter}
+        raise KeyError(Name)
+
+
+class FakeCognito:
+    """Cliente cognito-idp que entrega JWTs con `exp`."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+
+    def initiate_auth(self, AuthFlow, AuthParameters, ClientId, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"AuthenticationResult": {"AccessToken": make_jwt(), "RefreshToken": "refresh", "ExpiresIn": 3600}}
+
+
+# ============================================================================
+# SESSION STORE
+# ============================================================================
+
+class LocalRespServer:
+    """
+    Servidor local con protocolo Redis (RESP2) para el store de sesiones:
+    PING, AUTH, SELECT, GET, SET (con EX) y DEL, con expiración.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.data = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self.url = None
+
+    def start(self) -> str:
+        import socketserver
+
+        store = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    header = self.rfile.readline()
+                    if not header.startswith(b"*"):
+                        return
+                    args = []
+                    for _ in range(int(header[1:])):
+                        length = int(self.rfile.readline()[1:])
+                        args.append(self.rfile.read(length + 2)[:-2])
+                    self.wfile.write(store.execute(args))
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="local-resp").start()
+        self.url = f"redis://127.0.0.1:{self._server.server_address[1]}/0"
+        return self.url
+
+    def execute(self, args: list) -> bytes:
+        self.calls += 1
+        time.sleep(self.delay)
+        command = args[0].upper()
+        with self._lock:
+            if command in (b"PING", b"AUTH", b"SELECT"):
+                return b"+PONG\r\n" if command == b"PING" else b"+OK\r\n"
+            if command == b"SET":
+                ttl = int(args[4]) if len(args) > 4 and args[3].upper() == b"EX" else None
+                self.data[args[1]] = (args[2], time.monotonic() + ttl if ttl else None)
+                return b"+OK\r\n"
+            if command == b"GET":
+                value, expires_at = self.data.get(args[1], (None, None))
+                if value is None or (expires_at and time.monotonic() >= expires_at):
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(value), value)
+            if command == b"DEL":
+                deleted = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+                return b":%d\r\n" % deleted
+        return b"-ERR unknown command\r\n"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class FakeImageCDN:
+    """CDN de imágenes de productos: genera un JPEG por URL (reemplaza `images.fetch_image`)."""
+
+    def __init__(self, delay: float = 0.1, size: int = 1200):
+        self.delay = delay
+        self.size = size
+        self.calls = 0
+
+    def __call__(self, url: str, timeout: float = None) -> bytes:
+        import io
+        import zlib
+
+        from PIL import Image
+
+        self.calls += 1
+        time.sleep(self.delay)
+        color = zlib.crc32(url.encode()) & 0xFFFFFF
+        output = io.BytesIO()
+        Image.new("RGB", (self.size, self.size * 3 // 4), (color >> 16, (color >> 8) & 0xFF, color & 0xFF)).save(output, format="JPEG")
+        return output.getvalue()
+
+
+# ============================================================================
+# INSTALACIÓN
+# ============================================================================
+
+class StandIns:
+    """Dobles instalados; `uninstall()` restaura las funciones originales."""
+
+    def __init__(self, gateway, model_factory, memory, ssm, cognito):
+        self.gateway = gateway
+        self.model_factory = model_factory
+        self.memory = memory
+        self.ssm = ssm
+        self.cognito = cognito
+        self._patches = []
+
+    def patch(self, target, attribute: str, value):
+        self._patches.append((target, attribute, getattr(target, attribute)))
+        setattr(target, attribute, value)
+
+    def uninstall(self):
+        while self._patches:
+            target, attribute, original = self._patches.pop()
+            setattr(target, attribute, original)
+        self.gateway.stop()
+
+
+def add_stand_in_arguments(parser):
+    """Opciones de latencia de los dobles (compartidas por los benchmarks)."""
+    parser.add_argument("--tool-delay", type=float, default=0.05, help="Segundos por llamada a una tool del Gateway")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="Segundos hasta el primer token del modelo")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Segundos entre tokens del modelo")
+    parser.add_argument("--memory-delay", type=float, default=0.03, help="Segundos por llamada a AgentCore Memory")
+    parser.add_argument("--ssm-delay", type=float, default=0.03, help="Segundos por llamada a SSM")
+    parser.add_argument("--auth-delay", type=float, default=0.05, help="Segundos por llamada a Cognito")
+    parser.add_argument("--image-delay", type=float, default=0.1, help="Segundos por descarga de una imagen de producto")
+
+
+def stand_in_options(args) -> dict:
+    """Argumentos de `install_stand_ins` a partir de las opciones de `add_stand_in_arguments`."""
+    return {
+        "tool_delay": args.tool_delay,
+        "first_token_latency": args.model_latency,
+        "token_latency": args.token_latency,
+        "memory_delay": args.memory_delay,
+        "ssm_delay": args.ssm_delay,
+        "auth_delay": args.auth_delay,
+        "image_delay": args.image_delay,
+    }
+
+
+def silence_streamlit():
+    """Oculta las advertencias de Streamlit al ejecutar la app sin servidor."""
+    import logging
+
+    import streamlit  # noqa: F401 (registra sus loggers)
+
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def install_stand_ins(
+    tool_delay: float = 0.05,
+    first_token_latency: float = 0.3,
+    token_latency: float = 0.01,
+    memory_delay: float = 0.03,
+    ssm_delay: float = 0.03,
+    auth_delay: float = 0.05,
+    image_delay: float = 0.1,
+    script=SALES_CONVERSATION,
+) -> StandIns:
+    """
+    Levanta el Gateway local e instala los dobles en el código real.
+    """
+    import gateway.ssm_config as ssm_config
+    import gateway.token_manager as token_manager
+    import tempfile
+
+    from src.core import agent as agent_module
+    from src.core import images
+    from src.memory import manager as memory_manager
+    from src.memory.retrieval import CachedMemorySessionManager
+
+    gateway = LocalGatewayServer(tool_delay=tool_delay)
+    gateway.start()
+
+    memory = InMemoryAgentCoreMemory(delay=memory_delay)
+    ssm = FakeSSM(gateway.url, delay=ssm_delay)
+    cognito = FakeCognito(delay=auth_delay)
+    model_factory = lambda region: ScriptedBedrockModel(script, first_token_latency, token_latency)
+    stand_ins = StandIns(gateway, model_factory, memory, ssm, cognito)
+
+    stand_ins.patch(ssm_config, "get_ssm_client", lambda region=None: ssm)
+    stand_ins.patch(token_manager.CognitoTokenManager, "client", property(lambda manager: cognito))
+    stand_ins.patch(agent_module, "create_model", model_factory)
+    stand_ins.patch(
+        agent_module,
+        "create_session_manager",
+        lambda memory_config, region: CachedMemorySessionManager(memory_config, region, boto_session=FakeBotoSession(memory)),
+    )
+    stand_ins.patch(memory_manager, "create_memory", lambda region_name, memory_name=None: {"id": MEMORY_ID})
+    stand_ins.patch(memory_manager, "get_control_client", lambda region_name: memory)
+    # Imágenes de producto: CDN local y caché de miniaturas en una carpeta temporal
+    stand_ins.patch(images, "fetch_image", FakeImageCDN(delay=image_delay))
+    stand_ins.patch(images, "_cache", images.ImageCache(tempfile.mkdtemp(prefix="stand-in-images-")))
+    return stand_ins
@@ -0,0 +1,135 @@
+"""
+SSM Config
+==========
+Configuración del Gateway leída de SSM en lote y cacheada por proceso.
+
+Todo el árbol `/jamar/agentcore/` se lee con una sola llamada paginada a
+GetParametersByPath (o GetParameters si no hay permiso sobre el path), se
+guarda con TTL y se refresca en segundo plano al vencer.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import boto3
+
+SSM_CONFIG_PATH = "/jamar/agentcore/"
+SSM_CONFIG_TTL = float(os.getenv("SSM_CONFIG_TTL", "300"))
+
+# Parámetros conocidos (para GetParameters si no se puede leer el path completo)
+KNOWN_PARAMETERS = [
+    f"{SSM_CONFIG_PATH}gateway_url",
+    f"{SSM_CONFIG_PATH}cognito_client_id",
+    f"{SSM_CONFIG_PATH}cognito_pool_id",
+    f"{SSM_CONFIG_PATH}cognito_discovery_url",
+    f"{SSM_CONFIG_PATH}memory_id",
+]
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_ssm_client(region: str = None):
+    """Cliente SSM compartido por el proceso (uno por región)."""
+    with _clients_lock:
+        client = _clients.get(region)
+        if client is None:
+            client = boto3.client("ssm", region_name=region)
+            _clients[region] = client
+        return client
+
+
+class SSMConfigLoader:
+    """Caché TTL de todos los parámetros bajo un path de SSM."""
+
+    def __init__(self, region: str = None, path: str = SSM_CONFIG_PATH, ttl: float = SSM_CONFIG_TTL, client=None):
+        self.region = region
+        self.path = path
+        self.ttl = ttl
+        self._client = client
+        self._values: Optional[Dict[str, str]] = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_ssm_client(self.region)
+        return self._client
+
+    @property
+    def loaded(self) -> bool:
+        """True si ya hay valores en caché (la próxima lectura no llama a SSM)."""
+        return self._values is not None
+
+    def get_all(self) -> Dict[str, str]:
+        """
+        Retorna todos los parámetros {nombre completo: valor}.
+        Solo la primera lectura del proceso bloquea; luego se refresca en segundo plano.
+        """
+        with self._lock:
+            values = self._values
+            if values is not None and time.monotonic() - self._loaded_at > self.ttl and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+        if values is None:
+            return self.refresh()
+        return values
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Obtiene un parámetro por nombre completo o relativo al path."""
+        if not name.startswith("/"):
+            name = f"{self.path}{name}"
+        return self.get_all().get(name, default)
+
+    def refresh(self) -> Dict[str, str]:
+        """Lee de nuevo todos los parámetros del path."""
+        values = self._fetch()
+        with self._lock:
+            self._values = values
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
+        return values
+
+    def invalidate(self):
+        with self._lock:
+            self._values = None
+
+    def _fetch(self) -> Dict[str, str]:
+        try:
+            values = {}
+            paginator = self.client.get_paginator("get_parameters_by_path")
+            for page in paginator.paginate(Path=self.path, Recursive=True, WithDecryption=True):
+                for parameter in page.get("Parameters", []):
+                    values[parameter["Name"]] = parameter["Value"]
+            return values
+        except Exception as e:
+            # Sin permiso sobre el path: pedir los parámetros conocidos en una sola llamada
+            print(f"⚠️ No se pudo leer el path {self.path} de SSM ({e}), usando GetParameters")
+            response = self.client.get_parameters(Names=KNOWN_PARAMETERS, WithDecryption=True)
+            return {parameter["Name"]: parameter["Value"] for parameter in response.get("Parameters", [])}
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ No se pudo refrescar la configuración de SSM: {e}")
+            with self._lock:
+                self._refreshing = False
+
+
+_loaders = {}
+_loaders_lock = threading.Lock()
+
+
+def get_config_loader(region: str = None) -> SSMConfigLoader:
+    """Obtiene el cargador de configuración del proceso para una región."""
+    with _loaders_lock:
+        loader = _loaders.get(region)
+        if loader is None:
+            loader = SSMConfigLoader(region)
+            _loaders[region] = loader
+        return loader
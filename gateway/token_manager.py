@@ -0,0 +1,246 @@
+"""
+Token Manager
+=============
+Token de Cognito compartido por el proceso, con refresco antes de expirar.
+
+- El token se obtiene una vez (USER_PASSWORD_AUTH) y se reutiliza.
+- Se decodifica el `exp` del JWT y se refresca con REFRESH_TOKEN_AUTH antes
+  de que venza (en segundo plano, sin bloquear a quien lo usa).
+- Varios hilos que necesiten refrescar a la vez comparten un único refresco.
+- CognitoBearerAuth inyecta siempre el token vigente en cada request HTTP; en
+  el transporte async el refresco bloqueante corre en un hilo, sin detener el
+  event loop.
+"""
+import asyncio
+import base64
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import boto3
+import httpx
+
+# Usuario de servicio para el Gateway
+SERVICE_USERNAME = "test-gateway-user"
+SERVICE_PASSWORD = "Test123!@#"
+
+# Segundos antes del vencimiento en los que se refresca el token
+COGNITO_REFRESH_SKEW = float(os.getenv("COGNITO_REFRESH_SKEW", "300"))
+
+
+def decode_jwt_exp(token: str) -> Optional[float]:
+    """Retorna el `exp` (epoch) de un JWT sin validar la firma, o None."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except Exception:
+        return None
+
+
+class CognitoTokenManager:
+    """Caché del access token de Cognito con refresco proactivo single-flight."""
+
+    def __init__(
+        self,
+        client_id: str,
+        region: str = None,
+        username: str = SERVICE_USERNAME,
+        password: str = SERVICE_PASSWORD,
+        refresh_skew: float = COGNITO_REFRESH_SKEW,
+        client=None,
+    ):
+        self.client_id = client_id
+        self.region = region
+        self.username = username
+        self.password = password
+        self.refresh_skew = refresh_skew
+        self._client = client
+
+        self._access_token: Optional[str] = None
+        self._refresh_token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refreshing = False
+        self._cond = threading.Condition()
+        self._timer: Optional[threading.Timer] = None
+
+        self.authentications = 0
+        self.refreshes = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client("cognito-idp", region_name=self.region)
+        return self._client
+
+    def get_token(self) -> str:
+        """
+        Retorna un access token vigente.
+        Solo bloquea si no hay token o ya venció; si está por vencer se refresca en segundo plano.
+        """
+        return self.cached_token() or self._refresh()
+
+    def cached_token(self) -> Optional[str]:
+        """
+        Token vigente sin llamar a Cognito, o None si hay que autenticar.
+        Nunca bloquea: si está por vencer lanza el refresco en segundo plano.
+        """
+        with self._cond:
+            token = self._access_token
+            remaining = self._expires_at - time.time()
+            if token and remaining > 0:
+                if remaining <= self.refresh_skew and not self._refreshing:
+                    self._start_background_refresh()
+                return token
+        return None
+
+    def force_refresh(self, stale_token: str = None) -> str:
+        """
+        Refresca el token (p.ej. tras un 401). Si otro hilo ya lo reemplazó,
+        retorna el nuevo sin volver a llamar a Cognito.
+        """
+        with self._cond:
+            if stale_token and self._access_token and self._access_token != stale_token:
+                return self._access_token
+        return self._refresh(force=True)
+
+    # ------------------------------------------------------------------
+    # Refresco single-flight
+    # ------------------------------------------------------------------
+
+    def _refresh(self, force: bool = False) -> str:
+        with self._cond:
+            if self._refreshing:
+                # Otro hilo ya está refrescando: esperar su resultado
+                while self._refreshing:
+                    self._cond.wait()
+                if self._access_token and self._expires_at > time.time():
+                    return self._access_token
+                raise RuntimeError("No se pudo obtener token de Cognito")
+            if not force and self._access_token and self._expires_at - time.time() > self.refresh_skew:
+                return self._access_token
+            self._refreshing = True
+
+        try:
+            result = self._authenticate()
+            with self._cond:
+                self._store(result)
+                return self._access_token
+        finally:
+            with self._cond:
+                self._refreshing = False
+                self._cond.notify_all()
+
+    def _start_background_refresh(self):
+        # Llamado con el lock tomado
+        self._refreshing = True
+
+        def run():
+            try:
+                result = self._authenticate()
+                with self._cond:
+                    self._store(result)
+            except Exception as e:
+                print(f"⚠️ Error refrescando token de Cognito: {e}")
+            finally:
+                with self._cond:
+                    self._refreshing = False
+                    self._cond.notify_all()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _authenticate(self) -> dict:
+        """Usa el refresh token si existe; si falla, autentica con usuario y contraseña."""
+        if self._refresh_token:
+            try:
+                response = self.client.initiate_auth(
+                    AuthFlow="REFRESH_TOKEN_AUTH",
+                    AuthParameters={"REFRESH_TOKEN": self._refresh_token},
+                    ClientId=self.client_id,
+                )
+                self.refreshes += 1
+                return response["AuthenticationResult"]
+            except Exception as e:
+                print(f"⚠️ Refresh token rechazado, autenticando de nuevo: {e}")
+
+        response = self.client.initiate_auth(
+            AuthFlow="USER_PASSWORD_AUTH",
+            AuthParameters={
+                "USERNAME": self.username,
+                "PASSWORD": self.password,
+            },
+            ClientId=self.client_id,
+        )
+        self.authentications += 1
+        return response["AuthenticationResult"]
+
+    def _store(self, result: dict):
+        # Llamado con el lock tomado
+        token = result["AccessToken"]
+        self._access_token = token
+        # REFRESH_TOKEN_AUTH no devuelve un refresh token nuevo
+        self._refresh_token = result.get("RefreshToken") or self._refresh_token
+        self._expires_at = decode_jwt_exp(token) or time.time() + result.get("ExpiresIn", 3600)
+        self._schedule_proactive_refresh()
+
+    def _schedule_proactive_refresh(self):
+        # Llamado con el lock tomado
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = max(0.0, self._expires_at - self.refresh_skew - time.time())
+        self._timer = threading.Timer(delay, self._proactive_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _proactive_refresh(self):
+        with self._cond:
+            if self._refreshing:
+                return
+            self._start_background_refresh()
+
+
+class CognitoBearerAuth(httpx.Auth):
+    """Auth de httpx que lee el token vigente del manager en cada request."""
+
+    def __init__(self, token_manager: CognitoTokenManager):
+        self.token_manager = token_manager
+
+    def auth_flow(self, request):
+        token = self.token_manager.get_token()
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+
+        if response.status_code == 401:
+            # Token revocado o vencido antes de tiempo: reintentar una vez con uno nuevo
+            token = self.token_manager.force_refresh(stale_token=token)
+            request.headers["Authorization"] = f"Bearer {token}"
+            yield request
+
+    async def async_auth_flow(self, request):
+        # Igual que auth_flow, pero la llamada a Cognito (boto3, síncrona) corre
+        # en un hilo para no detener el event loop del transporte MCP
+        token = self.token_manager.cached_token() or await asyncio.to_thread(self.token_manager.get_token)
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+
+        if response.status_code == 401:
+            token = await asyncio.to_thread(self.token_manager.force_refresh, token)
+            request.headers["Authorization"] = f"Bearer {token}"
+            yield request
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(client_id: str, region: str = None) -> CognitoTokenManager:
+    """Obtiene el token manager del proceso para un app client de Cognito."""
+    with _managers_lock:
+        manager = _managers.get((client_id, region))
+        if manager is None:
+            manager = CognitoTokenManager(client_id, region)
+            _managers[(client_id, region)] = manager
+        return manager
@@ -6,13 +6,32 @@ Helpers para configurar AgentCore Gateway (basado en lab_helpers.utils)
 import os
 import json
 import boto3
-from typing import Optional, Dict
+from contextlib import contextmanager
+from typing import Callable, Optional, Dict
+
+from .ssm_config import SSM_CONFIG_PATH, get_config_loader, get_ssm_client
+from .token_manager import CognitoBearerAuth, get_token_manager
 
 
 def get_ssm_parameter(param_name: str, region: str = None) -> Optional[str]:
-    """Obtiene un parámetro de SSM."""
+    """
+    Obtiene un parámetro de SSM.
+    Los parámetros bajo /jamar/agentcore/ se leen de la caché del proceso (ver ssm_config.py);
+    si la lectura en lote falla, se piden uno por uno.
+    """
+    if param_name.startswith(SSM_CONFIG_PATH):
+        try:
+            value = get_config_loader(region).get(param_name)
+            if value is not None:
+                return value
+        except Exception as e:
+            print(f"⚠️ No se pudo leer la configuración de SSM en lote ({e}), leyendo {param_name}")
+    return _get_single_parameter(param_name, region)
+
+
+def _get_single_parameter(param_name: str, region: str = None) -> Optional[str]:
     try:
-        ssm = boto3.client("ssm", region_name=region)
+        ssm = get_ssm_client(region)
         response = ssm.get_parameter(Name=param_name, WithDecryption=True)
         return response["Parameter"]["Value"]
     except Exception as e:
@@ -20,16 +39,36 @@ def get_ssm_parameter(param_name: str, region: str = None) -> Optional[str]:
         return None
 
 
+def _get_config_values(region: str, *names: str) -> Dict[str, Optional[str]]:
+    """
+    Lee varios parámetros de /jamar/agentcore/ con una sola lectura en lote (cacheada por proceso).
+    Si el lote falla (sin permisos, throttling), cae a GetParameter por cada nombre.
+    """
+    try:
+        config = get_config_loader(region)
+        return {name: config.get(name) for name in names}
+    except Exception as e:
+        print(f"⚠️ No se pudo leer la configuración de SSM en lote ({e}), leyendo parámetro por parámetro")
+        return {name: _get_single_parameter(f"{SSM_CONFIG_PATH}{name}", region) for name in names}
+
+
+@contextmanager
+def _no_phase(name: str, **attributes):
+    yield
+
+
 def put_ssm_parameter(param_name: str, value: str, region: str = None) -> bool:
     """Guarda un parámetro en SSM."""
     try:
-        ssm = boto3.client("ssm", region_name=region)
+        ssm = get_ssm_client(region)
         ssm.put_parameter(
             Name=param_name,
             Value=value,
             Type="String",
             Overwrite=True
         )
+        if param_name.startswith(SSM_CONFIG_PATH):
+            get_config_loader(region).invalidate()
         return True
     except Exception as e:
         print(f"❌ Error guardando parámetro {param_name}: {e}")
@@ -45,30 +84,63 @@ def load_api_spec(file_path: str) -> list:
 def get_cognito_token(client_id: str, pool_id: str, region: str = None) -> Optional[str]:
     """
     Obtiene un token JWT de Cognito usando usuario de servicio.
+    El token se comparte en el proceso y se refresca antes de expirar (ver token_manager.py).
     """
     try:
-        cognito = boto3.client("cognito-idp", region_name=region)
-        
-        # Usuario de servicio para el Gateway
-        username = "test-gateway-user"
-        password = "Test123!@#"
-        
-        # Intentar autenticación
-        auth_response = cognito.initiate_auth(
-            AuthFlow="USER_PASSWORD_AUTH",
-            AuthParameters={
-                "USERNAME": username,
-                "PASSWORD": password,
-            },
-            ClientId=client_id,
-        )
-        
-        return auth_response["AuthenticationResult"]["AccessToken"]
+        return get_token_manager(client_id, region).get_token()
     except Exception as e:
         print(f"⚠️ Error obteniendo token de Cognito: {e}")
         return None
 
 
+def create_gateway_mcp_client(region: str = None, phase: Callable = None):
+    """
+    Crea un MCPClient (sin iniciar) apuntando al AgentCore Gateway.
+    Lee la URL y la configuración de Cognito desde SSM y obtiene el token.
+
+    Args:
+        region: Región de AWS
+        phase: Opcional, `phase(nombre, **atributos)` que retorna un context manager
+            para medir las fases "config" y "auth" (p.ej. src.observability.phases.phase)
+    """
+    from strands.tools.mcp import MCPClient
+    from mcp.client.streamable_http import streamablehttp_client
+    
+    phase = phase or _no_phase
+    
+    # Una sola lectura en lote de /jamar/agentcore/ (cacheada por proceso)
+    with phase("config", **{"ssm.cache_hit": get_config_loader(region).loaded}):
+        config = _get_config_values(region, "gateway_url", "cognito_client_id", "cognito_pool_id")
+    
+    gateway_url = config["gateway_url"]
+    if not gateway_url:
+        raise ValueError("Gateway URL no encontrada en SSM")
+    
+    # Obtener configuración de Cognito
+    client_id = config["cognito_client_id"]
+    pool_id = config["cognito_pool_id"]
+    
+    if not client_id or not pool_id:
+        raise ValueError("Cognito no configurado en SSM")
+    
+    # Obtener token real de Cognito (compartido por el proceso)
+    token_manager = get_token_manager(client_id, region)
+    with phase("auth", **{"cognito.cache_hit": token_manager.cached_token() is not None}):
+        bearer_token = get_cognito_token(client_id, pool_id, region)
+    if not bearer_token:
+        raise ValueError("No se pudo obtener token de Cognito")
+    
+    # Cada request HTTP lee el token vigente, así las sesiones largas no fallan al expirar
+    auth = CognitoBearerAuth(token_manager)
+    
+    return MCPClient(
+        lambda: streamablehttp_client(
+            gateway_url,
+            auth=auth,
+        )
+    )
+
+
 def get_or_create_cognito_pool(refresh_token: bool = False) -> Dict[str, str]:
     """
     Obtiene o crea configuración de Cognito.
@@ -77,9 +149,10 @@ def get_or_create_cognito_pool(refresh_token: bool = False) -> Dict[str, str]:
     # Obtener de SSM (si existen)
     region = boto3.session.Session().region_name
     
-    client_id = get_ssm_parameter("/jamar/agentcore/cognito_client_id", region)
-    discovery_url = get_ssm_parameter("/jamar/agentcore/cognito_discovery_url", region)
-    pool_id = get_ssm_parameter("/jamar/agentcore/cognito_pool_id", region)
+    config = _get_config_values(region, "cognito_client_id", "cognito_discovery_url", "cognito_pool_id")
+    client_id = config["cognito_client_id"]
+    discovery_url = config["cognito_discovery_url"]
+    pool_id = config["cognito_pool_id"]
     
     if not all([client_id, discovery_url, pool_id]):
         raise ValueError(
@@ -0,0 +1,42 @@
+"""
+Servidor
+========
+Arranque del contenedor: warm-up de los recursos compartidos y luego Streamlit
+en el mismo proceso.
+
+Streamlit no ejecuta app.py hasta que llega el primer navegador, así que el
+warm-up (imports, memoria, SSM, Cognito, sesiones MCP, catálogo de tools) se
+hace aquí, antes de abrir el puerto: el health check del contenedor no pasa
+(y no llega tráfico) hasta que la instancia está lista o vence WARMUP_TIMEOUT.
+
+Uso:
+    python serve.py --server.port=8080 --server.address=0.0.0.0
+"""
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+
+def main():
+    from src.config import WARMUP_ENABLED, WARMUP_TIMEOUT
+
+    if WARMUP_ENABLED:
+        from src.core.warmup import start_warmup
+
+        warmup = start_warmup(os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
+        if not warmup.wait(WARMUP_TIMEOUT):
+            print("⚠️ Warm-up incompleto; se inicia Streamlit igual (el primer turno completará lo pendiente)")
+
+    from streamlit.web import cli as stcli
+
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    sys.argv = ["streamlit", "run", app_path, *sys.argv[1:]]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Chat API
+========
+API HTTP del chat (ASGI, con respuestas en streaming SSE).
+La aplicación está en `src.api.server:app` (no se importa aquí para que
+`python -m src.api.server` cargue el módulo una sola vez).
+"""
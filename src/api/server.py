@@ -0,0 +1,285 @@
+"""
+Chat API
+========
+API HTTP asíncrona (ASGI) del chat, para canales sin Streamlit (WhatsApp,
+web, integraciones).
+
+Los turnos van al mismo motor que la UI (src/core/turns.py), con el mismo
+pool MCP, memoria, modelo y cachés del proceso. Un worker de la API no
+mantiene websockets ni un hilo de script por usuario: solo espera los
+eventos del turno en el event loop.
+
+Endpoints:
+    POST /v1/chat   {"actor_id": "...", "session_id": "...", "message": "...", "stream": true}
+                    Sin `session_id` se inicia una conversación nueva.
+                    `stream: true` (o `Accept: text/event-stream`) responde con SSE:
+                    session, text (deltas), tool, products (tarjetas de producto),
+                    done (texto final y tarjetas) o error.
+    GET  /health    Proceso vivo
+    GET  /ready     200 cuando terminó el warm-up (503 mientras tanto)
+
+Uso:
+    python -m src.api.server --port 8000 --workers 4
+    uvicorn src.api.server:app --port 8000 --workers 4
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+# Cargar variables de entorno antes de leer la configuración
+load_dotenv()
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse, StreamingResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from ..config import API_HEARTBEAT_SECONDS, API_KEY, API_TURN_TIMEOUT, WARMUP_ENABLED  # noqa: E402
+from ..core.streaming import DONE, ERROR, PRODUCTS, TEXT, TOOL  # noqa: E402
+from ..observability.tracing import init_tracing  # noqa: E402
+
+# Trazas OpenTelemetry (solo con TRACING_ENABLED=true)
+init_tracing()
+
+PUBLIC_PATHS = ("/health", "/ready")
+
+
+def get_region() -> str:
+    return os.getenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+# ============================================================================
+# TURNOS
+# ============================================================================
+
+def _submit(message: str, actor_id: str, session_id: str, first_turn: bool):
+    from ..core.turns import submit_chat_turn
+    from ..memory.manager import get_memory
+
+    region = get_region()
+    return submit_chat_turn(message, get_memory(region), region, actor_id, session_id, first_turn)
+
+
+async def turn_events(handle, heartbeat: float = API_HEARTBEAT_SECONDS, timeout: float = API_TURN_TIMEOUT):
+    """
+    Eventos (tipo, payload) del turno sin bloquear el event loop: el worker del
+    motor avisa al loop con cada evento nuevo. Genera None como heartbeat si
+    pasan `heartbeat` segundos sin eventos (p.ej. durante una tool lenta).
+
+    Raises:
+        TimeoutError: Si el turno no termina en `timeout` segundos
+    """
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+    listener = lambda: loop.call_soon_threadsafe(wakeup.set)
+    handle.add_listener(listener)
+    deadline = time.monotonic() + timeout
+    position = 0
+    try:
+        while True:
+            wakeup.clear()
+            events = handle.next_events(position, 0)
+            if not events:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    handle.cancel()
+                    raise TimeoutError(f"El turno no terminó en {timeout:.0f}s")
+                try:
+                    await asyncio.wait_for(wakeup.wait(), min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    yield None
+                continue
+            for event in events:
+                position += 1
+                yield event
+                if event[0] in (DONE, ERROR):
+                    return
+    finally:
+        handle.remove_listener(listener)
+
+
+def _final_text(handle, result) -> str:
+    from ..core.turns import EMPTY_ANSWER, get_response_text, store_answer
+
+    text = get_response_text(result)
+    if not (text and text.strip()):
+        # Con tarjetas de producto la respuesta puede ser solo las tarjetas
+        return "" if handle.products else EMPTY_ANSWER
+    store_answer(handle, text)
+    return text
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_turn(handle, actor_id: str, session_id: str):
+    yield _sse("session", {"actor_id": actor_id, "session_id": session_id, "turn_id": handle.id})
+    try:
+        async for event in turn_events(handle):
+            if event is None:
+                # Comentario SSE: mantiene viva la conexión en proxies y balanceadores
+                yield ": ping\n\n"
+                continue
+            kind, payload = event
+            if kind == TEXT:
+                yield _sse("text", {"delta": payload})
+            elif kind == TOOL:
+                yield _sse("tool", {"name": payload})
+            elif kind == PRODUCTS:
+                yield _sse("products", {"products": payload})
+            elif kind == DONE:
+                yield _sse("done", {"text": _final_text(handle, payload), "tools": handle.tools_used,
+                                    "products": handle.products})
+            elif kind == ERROR:
+                yield _sse("error", {"error": str(payload)})
+    except TimeoutError as e:
+        yield _sse("error", {"error": str(e)})
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+def _error(status: int, message: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status)
+
+
+async def chat(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return _error(400, "El cuerpo debe ser JSON")
+    if not isinstance(body, dict):
+        return _error(400, "El cuerpo debe ser un objeto JSON")
+
+    actor_id = body.get("actor_id")
+    message = body.get("message")
+    if not isinstance(actor_id, str) or not actor_id.strip():
+        return _error(400, "Falta 'actor_id'")
+    if not isinstance(message, str) or not message.strip():
+        return _error(400, "Falta 'message'")
+
+    # Sin session_id: conversación nueva (primer turno, puede responderse desde la caché)
+    session_id = body.get("session_id") or str(uuid.uuid4())
+    first_turn = not body.get("session_id")
+    stream = body.get("stream")
+    if stream is None:
+        stream = "text/event-stream" in request.headers.get("accept", "")
+
+    handle = await asyncio.to_thread(_submit, message, actor_id, session_id, first_turn)
+
+    if stream:
+        return StreamingResponse(
+            _stream_turn(handle, actor_id, session_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    try:
+        async for event in turn_events(handle):
+            if event is None:
+                continue
+            kind, payload = event
+            if kind == DONE:
+                return JSONResponse({
+                    "actor_id": actor_id,
+                    "session_id": session_id,
+                    "turn_id": handle.id,
+                    "text": _final_text(handle, payload),
+                    "tools": handle.tools_used,
+                    "products": handle.products,
+                })
+            if kind == ERROR:
+                return _error(500, str(payload))
+    except TimeoutError as e:
+        return _error(504, str(e))
+    return _error(500, "El turno terminó sin respuesta")
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def ready(request):
+    from ..core.warmup import get_warmup
+
+    warmup = get_warmup()
+    if warmup is None:
+        return JSONResponse({"ready": True, "warmup": None})
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+# ============================================================================
+# APLICACIÓN
+# ============================================================================
+
+class ApiKeyMiddleware:
+    """Exige `Authorization: Bearer <API_KEY>` o `X-API-Key` (si API_KEY está configurada)."""
+
+    def __init__(self, app, api_key: str):
+        self.app = app
+        self.api_key = api_key
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.api_key or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        provided = headers.get("x-api-key") or headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(provided.encode(), self.api_key.encode()):
+            await _error(401, "API key inválida")(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Cada worker prepara sus recursos compartidos en segundo plano (ver /ready)
+    if WARMUP_ENABLED:
+        from ..core.warmup import start_warmup
+
+        start_warmup(get_region())
+    yield
+
+
+def create_app(api_key: str = API_KEY) -> Starlette:
+    """Crea la aplicación ASGI del chat."""
+    from starlette.middleware import Middleware
+
+    return Starlette(
+        routes=[
+            Route("/v1/chat", chat, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+            Route("/ready", ready, methods=["GET"]),
+        ],
+        middleware=[Middleware(ApiKeyMiddleware, api_key=api_key)],
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API HTTP del chat (SSE)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Procesos worker (cada uno con sus propios pools y cachés)")
+    args = parser.parse_args(argv)
+
+    uvicorn.run("src.api.server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
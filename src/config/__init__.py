@@ -6,16 +6,136 @@ from .settings import (
     SYSTEM_PROMPT,
     DEFAULT_MODEL_ID,
     DEFAULT_TEMPERATURE,
+    PROMPT_CACHING,
     COUNTRY,
     CURRENCY,
     CURRENCY_SYMBOL,
+    MCP_POOL_SIZE,
+    MCP_POOL_ACQUIRE_TIMEOUT,
+    MCP_POOL_HEALTH_CHECK_INTERVAL,
+    MCP_POOL_MAX_SESSION_AGE,
+    TOOL_CATALOG_TTL,
+    AGENT_IDLE_TIMEOUT,
+    AGENT_REGISTRY_MAX_ENTRIES,
+    STREAM_RESPONSES,
+    ENGINE_MAX_CONCURRENCY,
+    TOOL_CACHE_ENABLED,
+    TOOL_CACHE_TTL,
+    TOOL_CACHE_MAX_ENTRIES,
+    TOOL_CACHE_TTLS,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_THRESHOLD,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_EXCLUDED_TERMS,
+    RESPONSE_CACHE_TOOLS,
+    TOOL_MAX_CONCURRENCY,
+    TOOL_TIMEOUT,
+    MEMORY_RETRIEVAL_CACHE_TTL,
+    MEMORY_ADAPTIVE_TOP_K,
+    MEMORY_MIN_TOP_K,
+    CONVERSATION_TOKEN_BUDGET,
+    CONVERSATION_KEEP_TURNS,
+    TRACING_ENABLED,
+    TRACING_EXPORTER,
+    TRACING_FILE,
+    TRACING_SERVICE_NAME,
+    WARMUP_ENABLED,
+    WARMUP_MCP_SESSIONS,
+    WARMUP_TIMEOUT,
+    WARMUP_STATUS_FILE,
+    MEMORY_ID,
+    MEMORY_ID_SSM_PARAMETER,
+    MEMORY_ID_CACHE_FILE,
+    API_KEY,
+    API_HEARTBEAT_SECONDS,
+    API_TURN_TIMEOUT,
+    SESSION_STORE,
+    SESSION_STORE_URL,
+    SESSION_STORE_TTL,
+    HISTORY_PAGE_SIZE,
+    IMAGE_CACHE_ENABLED,
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_MB,
+    IMAGE_THUMBNAIL_SIZE,
+    IMAGE_PREFETCH_WORKERS,
+    IMAGE_FETCH_TIMEOUT,
+    IMAGE_RENDER_TIMEOUT,
+    PRODUCT_CARDS_ENABLED,
+    PRODUCT_CARD_TOOLS,
+    PRODUCT_CARDS_MAX,
+    PRODUCT_CARDS_PROMPT,
+    INTENT_ROUTER_ENABLED,
+    INTENT_ROUTER_INTENTS,
+    INTENT_ROUTER_TIMEOUT,
+    SPECULATION_ENABLED,
 )
 
 __all__ = [
     "SYSTEM_PROMPT",
     "DEFAULT_MODEL_ID",
     "DEFAULT_TEMPERATURE",
+    "PROMPT_CACHING",
     "COUNTRY",
     "CURRENCY",
     "CURRENCY_SYMBOL",
+    "MCP_POOL_SIZE",
+    "MCP_POOL_ACQUIRE_TIMEOUT",
+    "MCP_POOL_HEALTH_CHECK_INTERVAL",
+    "MCP_POOL_MAX_SESSION_AGE",
+    "TOOL_CATALOG_TTL",
+    "AGENT_IDLE_TIMEOUT",
+    "AGENT_REGISTRY_MAX_ENTRIES",
+    "STREAM_RESPONSES",
+    "ENGINE_MAX_CONCURRENCY",
+    "TOOL_CACHE_ENABLED",
+    "TOOL_CACHE_TTL",
+    "TOOL_CACHE_MAX_ENTRIES",
+    "TOOL_CACHE_TTLS",
+    "RESPONSE_CACHE_ENABLED",
+    "RESPONSE_CACHE_THRESHOLD",
+    "RESPONSE_CACHE_TTL",
+    "RESPONSE_CACHE_MAX_ENTRIES",
+    "RESPONSE_CACHE_EXCLUDED_TERMS",
+    "RESPONSE_CACHE_TOOLS",
+    "TOOL_MAX_CONCURRENCY",
+    "TOOL_TIMEOUT",
+    "MEMORY_RETRIEVAL_CACHE_TTL",
+    "MEMORY_ADAPTIVE_TOP_K",
+    "MEMORY_MIN_TOP_K",
+    "CONVERSATION_TOKEN_BUDGET",
+    "CONVERSATION_KEEP_TURNS",
+    "TRACING_ENABLED",
+    "TRACING_EXPORTER",
+    "TRACING_FILE",
+    "TRACING_SERVICE_NAME",
+    "WARMUP_ENABLED",
+    "WARMUP_MCP_SESSIONS",
+    "WARMUP_TIMEOUT",
+    "WARMUP_STATUS_FILE",
+    "MEMORY_ID",
+    "MEMORY_ID_SSM_PARAMETER",
+    "MEMORY_ID_CACHE_FILE",
+    "API_KEY",
+    "API_HEARTBEAT_SECONDS",
+    "API_TURN_TIMEOUT",
+    "SESSION_STORE",
+    "SESSION_STORE_URL",
+    "SESSION_STORE_TTL",
+    "HISTORY_PAGE_SIZE",
+    "IMAGE_CACHE_ENABLED",
+    "IMAGE_CACHE_DIR",
+    "IMAGE_CACHE_MAX_MB",
+    "IMAGE_THUMBNAIL_SIZE",
+    "IMAGE_PREFETCH_WORKERS",
+    "IMAGE_FETCH_TIMEOUT",
+    "IMAGE_RENDER_TIMEOUT",
+    "PRODUCT_CARDS_ENABLED",
+    "PRODUCT_CARD_TOOLS",
+    "PRODUCT_CARDS_MAX",
+    "PRODUCT_CARDS_PROMPT",
+    "INTENT_ROUTER_ENABLED",
+    "INTENT_ROUTER_INTENTS",
+    "INTENT_ROUTER_TIMEOUT",
+    "SPECULATION_ENABLED",
 ]
@@ -2,6 +2,8 @@
 Configuración del Agente - Muebles Jamar Panamá
 ================================================
 """
+import os
+
 SYSTEM_PROMPT = """Eres "Jami", asistente de ventas de Muebles Jamar Panamá 🇵🇦
 
 ═══════════════════════════════════════════════════════════════
@@ -245,6 +247,169 @@ HANDOFF CONTADO: "quiero comprarlo de contado" → "Te conecto con un asesor 
 DEFAULT_MODEL_ID = "global.anthropic.claude-haiku-4-5-20251001-v1:0"
 DEFAULT_TEMPERATURE = 0.2
 
+# Cache points de Bedrock después de las tools y del system prompt
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "true").lower() == "true"
+
 COUNTRY = "Panamá"
 CURRENCY = "USD"
 CURRENCY_SYMBOL = "$"
+
+# Pool de sesiones MCP hacia el AgentCore Gateway (compartido por el proceso)
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+MCP_POOL_ACQUIRE_TIMEOUT = float(os.getenv("MCP_POOL_ACQUIRE_TIMEOUT", "30"))
+MCP_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_POOL_HEALTH_CHECK_INTERVAL", "60"))
+# Reciclar periódicamente las sesiones de larga duración
+MCP_POOL_MAX_SESSION_AGE = float(os.getenv("MCP_POOL_MAX_SESSION_AGE", "2700"))
+
+# Catálogo de tools del Gateway (segundos antes de refrescar en segundo plano)
+TOOL_CATALOG_TTL = float(os.getenv("TOOL_CATALOG_TTL", "300"))
+
+# Registro de agentes por conversación (reutilizados entre turnos)
+AGENT_IDLE_TIMEOUT = float(os.getenv("AGENT_IDLE_TIMEOUT", "1800"))
+AGENT_REGISTRY_MAX_ENTRIES = int(os.getenv("AGENT_REGISTRY_MAX_ENTRIES", "200"))
+
+# Mostrar la respuesta token a token en la UI (si es false, espera la respuesta completa)
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+
+# Motor de ejecución de turnos (máximo de turnos ejecutándose a la vez en el proceso).
+# Cada turno en curso ocupa una sesión del pool MCP, por eso el default es MCP_POOL_SIZE.
+ENGINE_MAX_CONCURRENCY = int(os.getenv("ENGINE_MAX_CONCURRENCY", str(MCP_POOL_SIZE)))
+
+# Caché de resultados de tools idempotentes del Gateway (datos que solo cambian con un despliegue)
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "3600"))
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "512"))
+# Tools cacheables y su TTL en segundos
+TOOL_CACHE_TTLS = {
+    "ver_categorias": TOOL_CACHE_TTL,
+    "obtener_politicas": TOOL_CACHE_TTL,
+    "buscar_sucursal": TOOL_CACHE_TTL,
+    "obtener_menu_principal": TOOL_CACHE_TTL,
+    "obtener_preguntas_necesidades": TOOL_CACHE_TTL,
+    "obtener_complementos": TOOL_CACHE_TTL,
+}
+
+# Caché de respuestas a preguntas frecuentes (solo el primer mensaje de la conversación)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+# Similitud mínima (0-1) entre el mensaje y una pregunta cacheada para reutilizar su respuesta
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.8"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+# Mensajes personales o de crédito que nunca se responden desde la caché
+RESPONSE_CACHE_EXCLUDED_TERMS = [
+    "pedido", "orden", "factura", "mi nombre", "me llamo", "cedula", "correo", "whatsapp",
+    "telefono", "direccion", "vivo en", "estudio", "aprobado", "aprobacion", "solicitud",
+    "simular", "simulacion", "cuota", "cuotas", "prestamo", "mi credito", "comprar", "asesor",
+]
+# Tools informativas: solo se cachean respuestas que usaron únicamente estas tools
+RESPONSE_CACHE_TOOLS = [
+    "obtener_politicas", "buscar_sucursal", "info_credijamar", "buscar_info_jamar",
+    "explorar_articulos_ayuda", "leer_pagina_jamar", "ver_categorias", "obtener_menu_principal",
+]
+
+# Tools pedidas en un mismo paso del modelo: máximo de llamadas simultáneas por turno y timeout por tool
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30"))
+
+# Recuperación de memoria de largo plazo: caché por cliente y consulta (segundos) y top_k adaptativo
+MEMORY_RETRIEVAL_CACHE_TTL = float(os.getenv("MEMORY_RETRIEVAL_CACHE_TTL", "60"))
+MEMORY_ADAPTIVE_TOP_K = os.getenv("MEMORY_ADAPTIVE_TOP_K", "true").lower() == "true"
+MEMORY_MIN_TOP_K = int(os.getenv("MEMORY_MIN_TOP_K", "3"))
+
+# Ventana de conversación: turnos recientes que se envían textuales (dentro de un presupuesto
+# de tokens estimados); los anteriores se compactan en un resumen con los datos del cliente
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "8000"))
+CONVERSATION_KEEP_TURNS = int(os.getenv("CONVERSATION_KEEP_TURNS", "6"))
+
+# Trazas OpenTelemetry de cada fase del turno (SSM, Cognito, MCP, tools, memoria, modelo).
+# Exportador: "otlp" (endpoint en OTEL_EXPORTER_OTLP_ENDPOINT), "console" o "file"
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "otlp").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "agente-jamar-streamlit")
+
+# Warm-up al iniciar el proceso: memoria, SSM, Cognito, sesiones MCP y catálogo de tools
+# se preparan en paralelo antes del primer turno
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_MCP_SESSIONS = int(os.getenv("WARMUP_MCP_SESSIONS", "1"))
+# Segundos que el primer turno espera a que termine el warm-up
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "60"))
+# Archivo JSON con el estado del warm-up (para probes de readiness); vacío = no se escribe
+WARMUP_STATUS_FILE = os.getenv("WARMUP_STATUS_FILE", "")
+
+# ID de la memoria AgentCore sin llamar al control plane al iniciar: se toma de MEMORY_ID,
+# del parámetro de SSM (relativo a /jamar/agentcore/) o del archivo local donde se guardó
+# la última vez; se verifica en segundo plano y solo si falta o no es válido se usa get_or_create
+MEMORY_ID = os.getenv("MEMORY_ID", "")
+MEMORY_ID_SSM_PARAMETER = os.getenv("MEMORY_ID_SSM_PARAMETER", "memory_id")
+# Vacío = no se guarda el ID en disco
+MEMORY_ID_CACHE_FILE = os.getenv("MEMORY_ID_CACHE_FILE", ".agentcore_memory.json")
+
+# API HTTP del chat (src/api): clave opcional (vacía = sin autenticación), segundos entre
+# heartbeats del stream SSE mientras el agente trabaja y tiempo máximo de un turno
+API_KEY = os.getenv("API_KEY", "")
+API_HEARTBEAT_SECONDS = float(os.getenv("API_HEARTBEAT_SECONDS", "15"))
+API_TURN_TIMEOUT = float(os.getenv("API_TURN_TIMEOUT", "180"))
+
+# Estado de la conversación (session_id e historial de la UI) fuera del proceso, para que
+# cualquier réplica pueda retomarla: "memory", "sqlite" o "redis"
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()
+# sqlite: ruta del archivo (default sessions.db); redis: redis://[:contraseña@]host:puerto/db
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "")
+# Segundos sin actividad tras los cuales expira una conversación guardada
+SESSION_STORE_TTL = float(os.getenv("SESSION_STORE_TTL", "86400"))
+
+# Historial del chat: mensajes que se muestran en cada rerun; los anteriores quedan detrás de
+# un botón "Ver mensajes anteriores" que carga otra página del mismo tamaño (0 = mostrar todos)
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+
+# Miniaturas de las imágenes de productos: se descargan en paralelo apenas aparecen en el
+# resultado de una tool y se guardan reducidas en una caché LRU en disco
+IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE_ENABLED", "true").lower() == "true"
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", ".image_cache")
+IMAGE_CACHE_MAX_MB = float(os.getenv("IMAGE_CACHE_MAX_MB", "200"))
+# Lado mayor de la miniatura (px)
+IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "480"))
+IMAGE_PREFETCH_WORKERS = int(os.getenv("IMAGE_PREFETCH_WORKERS", "8"))
+# Segundos máximos de una descarga, y de espera al mostrar una respuesta (luego se usa un placeholder)
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "10"))
+IMAGE_RENDER_TIMEOUT = float(os.getenv("IMAGE_RENDER_TIMEOUT", "2"))
+
+# Tarjetas de producto: los productos que retornan estas tools se muestran directamente como
+# tarjetas (nombre, precio, stock, link e imagen) y el modelo solo escribe una introducción breve
+PRODUCT_CARDS_ENABLED = os.getenv("PRODUCT_CARDS_ENABLED", "true").lower() == "true"
+PRODUCT_CARD_TOOLS = [
+    "buscar_productos", "recomendar_productos", "buscar_en_coleccion", "obtener_detalle_producto",
+    "obtener_complementos",
+]
+# Máximo de tarjetas por respuesta
+PRODUCT_CARDS_MAX = int(os.getenv("PRODUCT_CARDS_MAX", "6"))
+# Se agrega al final del SYSTEM_PROMPT cuando las tarjetas están activas (reemplaza el formato de productos)
+PRODUCT_CARDS_PROMPT = """
+═══════════════════════════════════════════════════════════════
+TARJETAS DE PRODUCTO (REEMPLAZA LA REGLA #3 Y EL FORMATO PRODUCTOS)
+═══════════════════════════════════════════════════════════════
+Los productos que retornan las herramientas se muestran AUTOMÁTICAMENTE al cliente como
+tarjetas numeradas [1], [2], ... con nombre, precio, stock, link e imagen, debajo de tu mensaje.
+- NO copies URLs, imágenes, precios ni stock de los productos
+- Escribe solo una introducción breve (1-3 frases) y refiérete a los productos por su número,
+  p.ej. "El [1] es el que mejor se ajusta a tu presupuesto"
+- Termina con una pregunta que ayude a avanzar la venta
+"""
+
+
+# Respuestas directas (sin el modelo) para saludos, menú, políticas y sucursales:
+# solo mensajes que son exactamente una de estas intenciones; el resto sigue al agente
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+INTENT_ROUTER_INTENTS = [
+    intent.strip()
+    for intent in os.getenv("INTENT_ROUTER_INTENTS", "saludo,menu,politicas,sucursal").split(",")
+    if intent.strip()
+]
+# Segundos máximos de la tool de una ruta directa antes de pasarle el turno al agente
+INTENT_ROUTER_TIMEOUT = float(os.getenv("INTENT_ROUTER_TIMEOUT", "5"))
+
+
+# Búsqueda de productos adelantada: al empezar un turno se estima la búsqueda que hará el modelo
+# (término y precio máximo) y se lanza en paralelo con la primera llamada a Bedrock
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "true").lower() == "true"
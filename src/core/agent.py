@@ -4,12 +4,25 @@ Agent Core - Versión simplificada para despliegue
 Solo usa AgentCore Gateway, no tools locales.
 """
 import uuid
+from contextlib import contextmanager
 from strands import Agent
 from strands.models import BedrockModel
 from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig, RetrievalConfig
 from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
 
-from ..config import SYSTEM_PROMPT, DEFAULT_MODEL_ID, DEFAULT_TEMPERATURE
+from ..config import (
+    SYSTEM_PROMPT, DEFAULT_MODEL_ID, DEFAULT_TEMPERATURE, PROMPT_CACHING, IMAGE_CACHE_ENABLED,
+    PRODUCT_CARDS_ENABLED, PRODUCT_CARDS_PROMPT,
+)
+from .tool_catalog import get_tool_catalog
+from .agent_registry import AgentEntry, get_agent_registry
+from .tool_executor import BoundedConcurrentToolExecutor
+from .conversation import RollingSummaryConversationManager
+from .images import ImagePrefetchHooks
+from .products import ProductCardHooks
+from ..memory.retrieval import CachedMemorySessionManager
+from ..observability.phases import PhaseHooks, phase
+from ..observability.tracing import hash_id
 
 
 class StreamingCallback:
@@ -54,17 +67,91 @@ def get_tool_name(tool):
     return None
 
 
-def create_agent_in_context(memory_id: str, region: str, actor_id: str, mcp_client, session_id: str = None):
+def create_model(region: str) -> BedrockModel:
     """
-    Crea el agente DENTRO de un contexto MCPClient activo.
-    IMPORTANTE: Esta función DEBE llamarse dentro de un bloque 'with mcp_client:'
+    Crea el modelo Bedrock del agente.
+    Con PROMPT_CACHING, agrega un cache point después de las definiciones de tools.
+    """
+    return BedrockModel(
+        model_id=DEFAULT_MODEL_ID,
+        temperature=DEFAULT_TEMPERATURE,
+        region_name=region,
+        cache_tools="default" if PROMPT_CACHING else None,
+    )
+
+
+def create_session_manager(memory_config: AgentCoreMemoryConfig, region: str) -> CachedMemorySessionManager:
+    """
+    Crea el session manager de AgentCore Memory de la conversación.
+    Recuperación de LTM en paralelo, cacheada por cliente y con top_k adaptativo.
+    """
+    return CachedMemorySessionManager(memory_config, region)
+
+
+def build_system_prompt():
+    """
+    System prompt del agente.
+    Con PROMPT_CACHING, agrega un cache point al final: Bedrock cachea el prefijo
+    tools + system prompt, que es idéntico en todas las llamadas al modelo.
+    Con PRODUCT_CARDS_ENABLED, agrega las instrucciones de las tarjetas de producto.
+    """
+    prompt = SYSTEM_PROMPT + PRODUCT_CARDS_PROMPT if PRODUCT_CARDS_ENABLED else SYSTEM_PROMPT
+    if not PROMPT_CACHING:
+        return prompt
+    return [
+        {"text": prompt},
+        {"cachePoint": {"type": "default"}},
+    ]
+
+
+def get_turn_usage(agent) -> dict:
+    """
+    Uso de tokens del último turno del agente (Strands reinicia el acumulado en
+    cada invocación), incluyendo lecturas y escrituras de la caché de prompts.
+    """
+    usage = agent.event_loop_metrics.accumulated_usage
+    input_tokens = usage.get("inputTokens", 0)
+    cache_read = usage.get("cacheReadInputTokens", 0)
+    cache_write = usage.get("cacheWriteInputTokens", 0)
+    prompt_tokens = input_tokens + cache_read + cache_write
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": usage.get("outputTokens", 0),
+        "cache_read_tokens": cache_read,
+        "cache_write_tokens": cache_write,
+        "cache_hit_ratio": cache_read / prompt_tokens if prompt_tokens else 0.0,
+    }
+
+
+def report_turn_usage(agent, actor_id: str) -> dict:
+    """Imprime el uso de tokens y de la caché de prompts del último turno."""
+    usage = get_turn_usage(agent)
+    print(
+        f"💾 Turno de {actor_id}: {usage['cache_read_tokens']} tokens leídos de caché (hit), "
+        f"{usage['cache_write_tokens']} escritos en caché (miss), "
+        f"{usage['input_tokens']} sin caché, {usage['output_tokens']} de salida "
+        f"({usage['cache_hit_ratio']:.0%} del prompt desde caché)"
+    )
+    return usage
+
+
+def create_agent_in_context(memory_id: str, region: str, actor_id: str, mcp_client, session_id: str = None, reuse: bool = True):
+    """
+    Crea el agente con un MCPClient cuya sesión ya está activa.
+    IMPORTANTE: El cliente debe estar iniciado (prestado del pool de sesiones,
+    ver src/core/mcp_pool.py, o dentro de un bloque 'with mcp_client:')
+    
+    Si la conversación (actor_id, session_id) ya tiene un agente vivo en el registro
+    (ver src/core/agent_registry.py), se reutiliza junto con su session manager y solo
+    se re-ligan sus tools a la sesión MCP recibida.
     
     Args:
         memory_id: ID de la memoria AgentCore
         region: Región de AWS
         actor_id: ID del actor/cliente
-        mcp_client: MCPClient que ya está dentro de un contexto activo
+        mcp_client: MCPClient con sesión activa (None: agente sin tools, solo para registrar mensajes)
         session_id: Session ID opcional para mantener contexto (si None, genera uno nuevo)
+        reuse: Si True, reutiliza/registra el agente de la conversación entre turnos
     
     Returns:
         tuple: (agente, session_id)
@@ -72,6 +159,17 @@ def create_agent_in_context(memory_id: str, region: str, actor_id: str, mcp_clie
     if session_id is None:
         session_id = str(uuid.uuid4())
     
+    catalog = get_tool_catalog()
+    registry = get_agent_registry()
+    
+    if reuse:
+        entry = registry.get(actor_id, session_id)
+        if entry is not None:
+            # Obtener tools del Gateway desde el catálogo (la sesión ya está activa)
+            if mcp_client is not None and not entry.is_bound_to(mcp_client, catalog.version):
+                entry.bind(mcp_client, catalog.get_tools(mcp_client), catalog.version)
+            return entry.agent, session_id
+    
     memory_config = AgentCoreMemoryConfig(
         memory_id=memory_id,
         session_id=session_id,
@@ -84,28 +182,127 @@ def create_agent_in_context(memory_id: str, region: str, actor_id: str, mcp_clie
         }
     )
     
-    model = BedrockModel(
-        model_id=DEFAULT_MODEL_ID,
-        temperature=DEFAULT_TEMPERATURE,
-        region_name=region,
-    )
+    model = create_model(region)
     
-    session_manager = AgentCoreMemorySessionManager(memory_config, region)
+    session_manager = create_session_manager(memory_config, region)
     
-    # Obtener tools del Gateway (ya estamos dentro del contexto)
-    gateway_tools = mcp_client.list_tools_sync()
+    # Obtener tools del Gateway desde el catálogo (la sesión ya está activa)
+    gateway_tools = catalog.get_tools(mcp_client) if mcp_client is not None else []
     
     # Crear agente con las tools del Gateway
     agente = Agent(
         model=model,
         session_manager=session_manager,
         tools=gateway_tools,
-        system_prompt=SYSTEM_PROMPT,
+        system_prompt=build_system_prompt(),
+        # Tools del mismo paso en paralelo (fan-out acotado, timeout por tool, orden estable)
+        tool_executor=BoundedConcurrentToolExecutor(),
+        # Últimos turnos textuales y los anteriores resumidos (presupuesto de tokens)
+        conversation_manager=RollingSummaryConversationManager(),
+        # Las imágenes de productos de cada resultado de tool se descargan mientras el modelo responde.
+        # Los hooks de fin de tool corren en orden inverso: la descarga ve el resultado antes de que
+        # las tarjetas de producto le quiten los links
+        hooks=[PhaseHooks()]
+        + ([ProductCardHooks()] if PRODUCT_CARDS_ENABLED else [])
+        + ([ImagePrefetchHooks()] if IMAGE_CACHE_ENABLED else []),
+        # Atributos de los spans de Strands (agente, modelo y tools)
+        trace_attributes={"actor.id_hash": hash_id(actor_id), "session.id_hash": hash_id(session_id)},
     )
     
+    if reuse:
+        registry.put(actor_id, session_id, AgentEntry(agente, session_manager, mcp_client, catalog.version))
+    
     return agente, session_id
 
 
+@contextmanager
+def agent_turn(memory_id: str, region: str, actor_id: str, session_id: str, callback_handler=None):
+    """
+    Prepara un turno: presta una sesión MCP del pool y entrega el agente de la
+    conversación listo para invocarse. Al salir del bloque devuelve la sesión.
+    
+    Uso:
+        with agent_turn(memory_id, region, actor_id, session_id) as agent:
+            response = agent(prompt)
+    
+    Args:
+        memory_id: ID de la memoria AgentCore
+        region: Región de AWS
+        actor_id: ID del actor/cliente
+        session_id: Session ID de la conversación
+        callback_handler: Callback de Strands opcional solo para este turno
+    """
+    from .mcp_pool import get_mcp_pool
+    
+    pool = get_mcp_pool(region)
+    try:
+        mcp_session = pool.acquire()
+    except Exception as e:
+        raise RuntimeError("MCPClient no disponible") from e
+    
+    # Crear y ejecutar agente mientras la sesión está prestada
+    try:
+        agent, _ = create_agent_in_context(
+            memory_id=memory_id,
+            region=region,
+            actor_id=actor_id,
+            mcp_client=mcp_session.client,
+            session_id=session_id,
+        )
+        
+        # El agente se reutiliza entre turnos: restaurar su callback al terminar
+        previous_callback = agent.callback_handler
+        if callback_handler is not None:
+            agent.callback_handler = callback_handler
+        try:
+            yield agent
+        finally:
+            agent.callback_handler = previous_callback
+        
+        # Reportar tokens del turno (incluye aciertos y fallos de la caché de prompts)
+        report_turn_usage(agent, actor_id)
+    finally:
+        pool.release(mcp_session)
+
+
+def record_exchange(memory_id: str, region: str, actor_id: str, session_id: str, messages: list):
+    """
+    Agrega mensajes ya respondidos (caché de respuestas, rutas directas) al
+    historial del agente de la conversación y a AgentCore Memory.
+    
+    No usa el modelo ni una sesión MCP del pool: no dispara la recuperación de
+    LTM (hooks de MessageAddedEvent) ni reporta uso de tokens. Si la conversación
+    no tiene agente vivo, se crea sin tools; se ligan en su próximo turno.
+    
+    Args:
+        memory_id: ID de la memoria AgentCore
+        region: Región de AWS
+        actor_id: ID del actor/cliente
+        session_id: Session ID de la conversación
+        messages: Mensajes de Strands a agregar, en orden
+    """
+    registry = get_agent_registry()
+    entry = registry.get(actor_id, session_id)
+    if entry is None:
+        create_agent_in_context(memory_id, region, actor_id, mcp_client=None, session_id=session_id)
+        entry = registry.get(actor_id, session_id)
+    
+    for message in messages:
+        entry.agent.messages.append(message)
+        entry.session_manager.append_message(message, entry.agent)
+
+
+def run_turn(prompt: str, memory_id: str, region: str, actor_id: str, session_id: str, callback_handler=None):
+    """
+    Ejecuta un turno completo de forma síncrona en el hilo actual (ver agent_turn).
+    
+    Returns:
+        AgentResult: Respuesta del agente
+    """
+    with agent_turn(memory_id, region, actor_id, session_id, callback_handler) as agent:
+        return agent(prompt)
+
+
 def create_agent(memory_id: str, region: str, actor_id: str = "customer_001", use_gateway: bool = True, mcp_client=None):
     """
     Crea el agente de ventas con memoria.
@@ -133,11 +330,7 @@ def create_agent(memory_id: str, region: str, actor_id: str = "customer_001", us
         }
     )
     
-    model = BedrockModel(
-        model_id=DEFAULT_MODEL_ID,
-        temperature=DEFAULT_TEMPERATURE,
-        region_name=region,
-    )
+    model = create_model(region)
     
     session_manager = AgentCoreMemorySessionManager(memory_config, region)
     
@@ -152,80 +345,37 @@ def create_agent(memory_id: str, region: str, actor_id: str = "customer_001", us
             if mcp_client is not None:
                 # Obtener las tools dentro del contexto (el cliente se inicializará automáticamente)
                 # NOTA: El cliente se cerrará después, pero se volverá a abrir cuando se ejecute el agente
-                # IMPORTANTE: El MCPClient DEBE estar dentro de un contexto 'with' para usar list_tools_sync()
+                # IMPORTANTE: El MCPClient DEBE estar dentro de un contexto 'with' para listar sus tools
                 try:
                     # Intentar usar el cliente dentro de un contexto
                     with mcp_client:
-                        gateway_tools = mcp_client.list_tools_sync()
+                        gateway_tools = get_tool_catalog().get_tools(mcp_client)
                         tools_list.extend(gateway_tools)
+                    get_tool_catalog().invalidate(mcp_client)
                 except Exception as ctx_error:
                     error_msg = str(ctx_error)
                     if "not running" in error_msg.lower() or "session" in error_msg.lower():
                         # Crear un cliente temporal solo para obtener las tools
-                        from strands.tools.mcp import MCPClient
-                        from mcp.client.streamable_http import streamablehttp_client
-                        import sys
-                        import os
-                        gateway_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "gateway")
-                        if gateway_path not in sys.path:
-                            sys.path.insert(0, gateway_path)
-                        from utils import get_ssm_parameter, get_cognito_token
-                        
-                        gateway_url = get_ssm_parameter("/jamar/agentcore/gateway_url", region)
-                        client_id = get_ssm_parameter("/jamar/agentcore/cognito_client_id", region)
-                        pool_id = get_ssm_parameter("/jamar/agentcore/cognito_pool_id", region)
-                        bearer_token = get_cognito_token(client_id, pool_id, region)
-                        
-                        temp_client = MCPClient(
-                            lambda: streamablehttp_client(
-                                gateway_url,
-                                headers={"Authorization": f"Bearer {bearer_token}"},
-                            )
-                        )
+                        from gateway.utils import create_gateway_mcp_client
+                        temp_client = create_gateway_mcp_client(region, phase=phase)
                         with temp_client:
-                            gateway_tools = temp_client.list_tools_sync()
+                            gateway_tools = get_tool_catalog().get_tools(temp_client)
                             tools_list.extend(gateway_tools)
+                        # El catálogo no debe retener el cliente temporal
+                        get_tool_catalog().invalidate(temp_client)
                 # NOTA: El cliente original se usará cuando se ejecute el agente dentro del contexto
             else:
-                # Crear nuevo cliente
-                from strands.tools.mcp import MCPClient
-                from mcp.client.streamable_http import streamablehttp_client
-                import sys
-                import os
-                # Agregar gateway al path
-                gateway_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "gateway")
-                if gateway_path not in sys.path:
-                    sys.path.insert(0, gateway_path)
-                from utils import get_ssm_parameter, get_cognito_token
-                
-                gateway_url = get_ssm_parameter("/jamar/agentcore/gateway_url", region)
-                if not gateway_url:
-                    raise ValueError("Gateway URL no encontrada en SSM")
-                
-                # Obtener configuración de Cognito
-                client_id = get_ssm_parameter("/jamar/agentcore/cognito_client_id", region)
-                pool_id = get_ssm_parameter("/jamar/agentcore/cognito_pool_id", region)
-                
-                if not client_id or not pool_id:
-                    raise ValueError("Cognito no configurado en SSM")
-                
-                # Obtener token real de Cognito
-                bearer_token = get_cognito_token(client_id, pool_id, region)
-                if not bearer_token:
-                    raise ValueError("No se pudo obtener token de Cognito")
-                
-                created_mcp_client = MCPClient(
-                    lambda: streamablehttp_client(
-                        gateway_url,
-                        headers={"Authorization": f"Bearer {bearer_token}"},
-                    )
-                )
+                # Crear nuevo cliente (configuración de SSM cacheada por proceso)
+                from gateway.utils import create_gateway_mcp_client
+                created_mcp_client = create_gateway_mcp_client(region, phase=phase)
                 
                 # Obtener tools dentro del contexto (el cliente se inicializará automáticamente)
                 # NOTA: El cliente se cerrará después, pero se volverá a abrir cuando se ejecute el agente
                 with created_mcp_client:
-                    gateway_tools = created_mcp_client.list_tools_sync()
+                    gateway_tools = get_tool_catalog().get_tools(created_mcp_client)
                     tools_list.extend(gateway_tools)
+                # El agente conserva sus tools; el catálogo no debe retener el cliente
+                get_tool_catalog().invalidate(created_mcp_client)
                 # NOTA: El cliente se cerrará aquí, pero se volverá a abrir cuando se ejecute el agente dentro del contexto
         
         except Exception as e:
@@ -242,7 +392,7 @@ def create_agent(memory_id: str, region: str, actor_id: str = "customer_001", us
             model=model,
             session_manager=session_manager,
             tools=tools_list,
-            system_prompt=SYSTEM_PROMPT,
+            system_prompt=build_system_prompt(),
         )
     except Exception as e:
         import traceback
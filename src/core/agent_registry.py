@@ -0,0 +1,125 @@
+"""
+Agent Registry
+==============
+Registro de agentes por conversación, compartido por el proceso.
+
+Mantiene vivos el Agent y su AgentCoreMemorySessionManager entre turnos de la
+misma conversación `(actor_id, session_id)`, para no volver a construir el
+modelo ni re-hidratar la sesión desde AgentCore Memory en cada mensaje.
+"""
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from ..config import AGENT_IDLE_TIMEOUT, AGENT_REGISTRY_MAX_ENTRIES
+
+
+class AgentEntry:
+    """Agente vivo de una conversación."""
+
+    def __init__(self, agent, session_manager, mcp_client, catalog_version: int):
+        self.agent = agent
+        self.session_manager = session_manager
+        self.catalog_version = catalog_version
+        self.last_used = time.monotonic()
+        # Referencia débil: el pool puede reemplazar la sesión en cualquier momento.
+        # Sin sesión (agente creado solo para registrar mensajes) las tools se ligan en el próximo turno
+        self._mcp_client_ref = weakref.ref(mcp_client) if mcp_client is not None else lambda: None
+
+    @property
+    def mcp_client(self):
+        return self._mcp_client_ref()
+
+    def is_bound_to(self, mcp_client, catalog_version: int) -> bool:
+        return self.mcp_client is mcp_client and self.catalog_version == catalog_version
+
+    def bind(self, mcp_client, tools, catalog_version: int):
+        """Re-liga las tools del agente a otra sesión MCP del pool."""
+        rebind_tools(self.agent, tools)
+        self._mcp_client_ref = weakref.ref(mcp_client)
+        self.catalog_version = catalog_version
+
+
+class AgentRegistry:
+    """
+    Registro LRU de agentes con expiración por inactividad.
+
+    Las entradas sin uso durante `idle_timeout` segundos se descartan, y nunca
+    se guardan más de `max_entries` conversaciones.
+    """
+
+    def __init__(self, idle_timeout: float = AGENT_IDLE_TIMEOUT, max_entries: int = AGENT_REGISTRY_MAX_ENTRIES):
+        self.idle_timeout = idle_timeout
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, actor_id: str, session_id: str):
+        """Retorna la entrada de la conversación o None si no existe o expiró."""
+        key = (actor_id, session_id)
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, actor_id: str, session_id: str, entry: AgentEntry):
+        """Registra el agente de una conversación (desplaza al menos usado si está lleno)."""
+        key = (actor_id, session_id)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, actor_id: str, session_id: str) -> bool:
+        """Descarta explícitamente el agente de una conversación."""
+        with self._lock:
+            return self._entries.pop((actor_id, session_id), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict_idle(self):
+        if not self.idle_timeout:
+            return
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if now - entry.last_used > self.idle_timeout]
+        for key in expired:
+            del self._entries[key]
+
+
+def rebind_tools(agent, tools):
+    """
+    Reemplaza las tools del agente por `tools` (mismos nombres, otra sesión MCP).
+    Quita las que ya no existen en el Gateway y registra las nuevas.
+    """
+    tool_registry = agent.tool_registry
+    new_names = {tool.tool_name for tool in tools}
+
+    for name in list(tool_registry.registry):
+        if name not in new_names:
+            del tool_registry.registry[name]
+            tool_registry.dynamic_tools.pop(name, None)
+
+    for tool in tools:
+        if tool.tool_name in tool_registry.registry:
+            tool_registry.replace(tool)
+        else:
+            tool_registry.register_tool(tool)
+
+
+_registry = AgentRegistry()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Obtiene el registro de agentes compartido por el proceso."""
+    return _registry
@@ -0,0 +1,279 @@
+"""
+Conversation
+============
+Ventana de conversación acotada por tokens con resumen acumulado.
+
+Las conversaciones de venta largas (listas de productos, pitch de Credijamar,
+datos del estudio de crédito) enviaban todo el historial en cada llamada al
+modelo. Este conversation manager conserva textuales los últimos turnos
+(dentro de un presupuesto de tokens) y compacta los anteriores en un resumen
+extractivo, sin llamar al modelo, con los datos que exige la REGLA #4 del
+system prompt: categoría, presupuesto, número de puestos, y además nombre,
+ubicación, productos vistos y monto a financiar.
+
+El resumen va como primer bloque del primer mensaje de usuario conservado.
+"""
+import json
+import re
+import unicodedata
+from typing import Optional
+
+from strands.agent.conversation_manager import ConversationManager
+from strands.hooks import BeforeModelCallEvent
+from strands.types.exceptions import ContextWindowOverflowException
+
+from ..config import CONVERSATION_TOKEN_BUDGET, CONVERSATION_KEEP_TURNS
+from .tool_cache import base_tool_name
+
+SUMMARY_TAG = "resumen_conversacion"
+# Mensaje de memoria de largo plazo inyectado por el session manager (no se persiste)
+USER_CONTEXT_PREFIX = "<user_context>"
+
+CATEGORIES = [
+    "comedor", "sofa cama", "sofa", "seccional", "modular", "poltrona", "sala", "colchon",
+    "base cama", "cama", "nochero", "comoda", "closet", "escritorio", "silla", "mesa de centro",
+    "mesa", "biblioteca", "centro de entretenimiento", "mueble de tv", "bar", "terraza",
+]
+
+_SEATS = re.compile(r"(\d{1,2})\s*(?:puestos?|personas?|sillas?|plazas?)")
+# Un monto solo cuenta como presupuesto junto a una palabra clave ("¿y el de $1.299?" es un precio)
+_BUDGET = re.compile(r"(?:presupuesto|hasta|maximo|no mas de|menos de)\D{0,15}?\$?\s?(\d[\d.,]*)")
+
+
+def estimate_tokens(message: dict) -> int:
+    """Estimación barata de tokens de un mensaje (~4 caracteres por token)."""
+    chars = 0
+    for block in message.get("content", []):
+        if "text" in block:
+            chars += len(block["text"])
+        elif "toolUse" in block:
+            chars += len(json.dumps(block["toolUse"].get("input", {}), ensure_ascii=False)) + 20
+        elif "toolResult" in block:
+            for item in block["toolResult"].get("content", []):
+                chars += len(item.get("text", "")) if "text" in item else len(json.dumps(item, default=str))
+    return chars // 4 + 1
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def _is_user_text(message: dict) -> bool:
+    return message.get("role") == "user" and not any("toolResult" in block for block in message.get("content", []))
+
+
+def _is_summary_block(block: dict) -> bool:
+    return block.get("text", "").startswith(f"<{SUMMARY_TAG}>")
+
+
+def _is_user_context(message: dict) -> bool:
+    content = message.get("content", [])
+    return message.get("role") == "assistant" and bool(content) and content[0].get("text", "").startswith(USER_CONTEXT_PREFIX)
+
+
+class RollingSummaryConversationManager(ConversationManager):
+    """
+    Conserva los últimos `keep_turns` turnos (o menos, si exceden `max_tokens`)
+    y resume los anteriores.
+    """
+
+    def __init__(self, max_tokens: int = CONVERSATION_TOKEN_BUDGET, keep_turns: int = CONVERSATION_KEEP_TURNS):
+        super().__init__()
+        self.max_tokens = max_tokens
+        self.keep_turns = max(1, keep_turns)
+        self.facts = {}
+        self.requests = []
+        self.summarized_turns = 0
+        # Tokens de los mensajes compactados (lo que se dejaría de enviar en cada llamada)
+        self.folded_tokens = 0
+        self._model_calls = 0
+
+    def register_hooks(self, registry, **kwargs) -> None:
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(BeforeModelCallEvent, self._on_before_model_call)
+
+    def _on_before_model_call(self, event) -> None:
+        self._model_calls += 1
+        # Tras restaurar la sesión el resumen aún no está en los mensajes
+        self._ensure_summary(event.agent.messages)
+
+    # ------------------------------------------------------------------
+    # Estado (persistido por el session manager)
+    # ------------------------------------------------------------------
+
+    def get_state(self) -> dict:
+        state = super().get_state()
+        state.update({
+            "facts": self.facts,
+            "requests": self.requests,
+            "summarized_turns": self.summarized_turns,
+            "folded_tokens": self.folded_tokens,
+        })
+        return state
+
+    def restore_from_session(self, state: dict) -> Optional[list]:
+        if state.get("__name__") != self.__class__.__name__:
+            # Conversación guardada con otro conversation manager (p.ej. el
+            # SlidingWindowConversationManager anterior): se conservan los mensajes
+            # que ya había descartado y se empieza sin resumen, en vez de fallar
+            print(f"⚠️ Estado de conversación de {state.get('__name__')}: se migra a {self.__class__.__name__}")
+            state = {
+                "__name__": self.__class__.__name__,
+                "removed_message_count": state.get("removed_message_count", 0),
+            }
+        result = super().restore_from_session(state)
+        self.facts = state.get("facts", {})
+        self.requests = state.get("requests", [])
+        self.summarized_turns = state.get("summarized_turns", 0)
+        self.folded_tokens = state.get("folded_tokens", 0)
+        return result
+
+    # ------------------------------------------------------------------
+    # Gestión
+    # ------------------------------------------------------------------
+
+    def apply_management(self, agent, **kwargs) -> None:
+        """Al final de cada turno: compactar si hay más turnos o tokens de los permitidos."""
+        model_calls, self._model_calls = self._model_calls, 0
+        self._compact(agent.messages, self.keep_turns)
+
+        if self.summarized_turns:
+            saved_per_call = max(0, self.folded_tokens - estimate_tokens({"content": [{"text": self.summary_text()}]}))
+            sent = sum(estimate_tokens(message) for message in agent.messages)
+            print(
+                f"✂️ Historial: {len(agent.messages)} mensajes (~{sent} tokens) + resumen de "
+                f"{self.summarized_turns} turnos; ~{saved_per_call * max(1, model_calls)} tokens ahorrados en el turno"
+            )
+
+    def reduce_context(self, agent, e: Optional[Exception] = None, **kwargs) -> None:
+        """Desborde de la ventana del modelo: dejar solo el último turno."""
+        if not self._compact(agent.messages, 1):
+            raise ContextWindowOverflowException("No se puede reducir más el historial") from e
+
+    def _compact(self, messages: list, keep_turns: int) -> bool:
+        turn_starts = [index for index, message in enumerate(messages) if _is_user_text(message)]
+        if len(turn_starts) <= 1:
+            return False
+
+        keep = min(keep_turns, len(turn_starts))
+        while keep > 1 and sum(estimate_tokens(message) for message in messages[turn_starts[-keep]:]) > self.max_tokens:
+            keep -= 1
+        cut = turn_starts[-keep]
+        if cut <= turn_starts[0]:
+            return False
+
+        folded = messages[:cut]
+        for message in folded:
+            if _is_user_text(message):
+                self.summarized_turns += 1
+            self._extract_facts(message)
+            content = [block for block in message.get("content", []) if not _is_summary_block(block)]
+            self.folded_tokens += estimate_tokens({"content": content})
+            # Los mensajes de memoria inyectados no están en la sesión persistida
+            if not _is_user_context(message):
+                self.removed_message_count += 1
+
+        messages[:] = messages[cut:]
+        self._ensure_summary(messages)
+        return True
+
+    def _ensure_summary(self, messages: list):
+        if not self.summarized_turns:
+            return
+        first_user = next((message for message in messages if _is_user_text(message)), None)
+        if first_user is None:
+            return
+        summary = {"text": self.summary_text()}
+        content = [block for block in first_user["content"] if not _is_summary_block(block)]
+        first_user["content"] = [summary] + content
+
+    # ------------------------------------------------------------------
+    # Resumen extractivo
+    # ------------------------------------------------------------------
+
+    def _extract_facts(self, message: dict):
+        for block in message.get("content", []):
+            if "toolUse" in block:
+                self._facts_from_tool(block["toolUse"])
+            elif "text" in block and _is_user_text(message) and not _is_summary_block(block):
+                self._facts_from_text(block["text"])
+
+    def _facts_from_text(self, text: str):
+        normalized = _normalize(text)
+        self._category_and_seats(normalized)
+        budget = _BUDGET.search(normalized)
+        if budget:
+            self.facts["presupuesto"] = budget.group(1)
+
+        snippet = " ".join(text.split())[:120]
+        if snippet:
+            self.requests = (self.requests + [snippet])[-3:]
+
+    def _facts_from_tool(self, tool_use: dict):
+        name = base_tool_name(tool_use.get("name", ""))
+        arguments = tool_use.get("input") or {}
+        if not isinstance(arguments, dict):
+            return
+
+        if name == "buscar_productos":
+            term = arguments.get("termino_busqueda") or arguments.get("termino")
+            if term:
+                self.facts["busqueda"] = term
+                self._category_and_seats(_normalize(term))
+            if arguments.get("precio_maximo"):
+                self.facts["presupuesto"] = str(arguments["precio_maximo"])
+        elif name in ("obtener_preguntas_necesidades", "obtener_complementos") and arguments.get("categoria"):
+            self.facts["categoria"] = arguments["categoria"]
+        elif name == "obtener_detalle_producto" and arguments.get("nombre"):
+            seen = [product for product in self.facts.get("productos_vistos", []) if product != arguments["nombre"]]
+            self.facts["productos_vistos"] = (seen + [arguments["nombre"]])[-5:]
+        elif name == "guardar_nombre_cliente" and arguments.get("nombre"):
+            self.facts["nombre"] = arguments["nombre"]
+        elif name == "guardar_ubicacion_cliente" and arguments.get("ciudad"):
+            self.facts["ubicacion"] = arguments["ciudad"]
+        elif name == "recomendar_productos" and arguments.get("presupuesto"):
+            self.facts["presupuesto"] = str(arguments["presupuesto"])
+
+        if arguments.get("monto") and name in (
+            "iniciar_simulacion_credijamar", "obtener_pitch_credijamar", "ofrecer_estudio_credito", "procesar_estudio_credito",
+        ):
+            self.facts["monto_financiar"] = str(arguments["monto"])
+
+    def _category_and_seats(self, normalized: str):
+        for category in CATEGORIES:
+            if category in normalized:
+                self.facts["categoria"] = category
+                break
+        seats = _SEATS.search(normalized)
+        if seats:
+            self.facts["puestos"] = seats.group(1)
+
+    def summary_text(self) -> str:
+        labels = [
+            ("categoria", "Categoría"),
+            ("puestos", "Puestos/personas"),
+            ("presupuesto", "Presupuesto"),
+            ("busqueda", "Última búsqueda"),
+            ("productos_vistos", "Productos vistos"),
+            ("monto_financiar", "Monto a financiar"),
+            ("nombre", "Nombre"),
+            ("ubicacion", "Ubicación"),
+        ]
+        lines = [
+            f"<{SUMMARY_TAG}>",
+            f"Resumen de {self.summarized_turns} turnos anteriores de esta conversación "
+            "(datos que el cliente YA dio, no volver a preguntarlos):",
+        ]
+        for key, label in labels:
+            value = self.facts.get(key)
+            if value:
+                if key == "presupuesto":
+                    value = f"{value} USD"
+                elif isinstance(value, list):
+                    value = ", ".join(value)
+                lines.append(f"- {label}: {value}")
+        if self.requests:
+            lines.append("- Últimos mensajes del cliente: " + " | ".join(f'"{request}"' for request in self.requests))
+        lines.append(f"</{SUMMARY_TAG}>")
+        return "\n".join(lines)
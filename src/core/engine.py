@@ -0,0 +1,360 @@
+"""
+Execution Engine
+================
+Motor de ejecución de turnos fuera del hilo del script de Streamlit.
+
+- Un pool de workers ejecuta `Agent.stream_async` (límite global de concurrencia).
+- Los turnos de una misma conversación se ejecutan en orden, uno a la vez.
+- Cada envío retorna un TurnHandle: la UI puede consumir sus eventos en vivo,
+  volver a engancharse tras un rerun (los eventos quedan guardados) o esperar
+  el resultado.
+"""
+import asyncio
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from strands.handlers.callback_handler import null_callback_handler
+
+from ..config import ENGINE_MAX_CONCURRENCY
+from ..memory.retrieval import has_customer_context
+from ..observability.tracing import hash_id, set_attributes, start_span
+from .products import SINK_KEY
+from .streaming import TEXT, TOOL, PRODUCTS, DONE, ERROR, EventTranslator
+
+
+class TurnCancelled(Exception):
+    """El turno fue cancelado antes de terminar."""
+
+
+class TurnHandle:
+    """Handle de un turno enviado al motor."""
+
+    def __init__(self, session_key, prompt: str):
+        self.id = uuid.uuid4().hex
+        self.session_key = session_key
+        self.prompt = prompt
+        # Si el turno recibió contexto de la memoria del cliente (respuesta personalizada)
+        self.personalized = False
+        # Si la respuesta salió sin el modelo (caché de respuestas o ruta directa)
+        self.direct = False
+        self._events = []
+        self._finished = False
+        self._cancelled = False
+        self._listeners = []
+        self._cond = threading.Condition()
+
+    # -- Lado productor (worker) -------------------------------------------
+
+    def publish(self, kind: str, payload):
+        with self._cond:
+            self._events.append((kind, payload))
+            if kind in (DONE, ERROR):
+                self._finished = True
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"⚠️ Error notificando un evento del turno: {e}")
+
+    # -- Lado consumidor (UI/API) ------------------------------------------
+
+    def events(self, start: int = 0, timeout: float = None):
+        """
+        Genera los eventos desde la posición `start` (0 = reproducir todo) hasta
+        DONE o ERROR, esperando los que aún no llegan.
+
+        Raises:
+            TimeoutError: Si no llega ningún evento nuevo en `timeout` segundos
+        """
+        position = start
+        while True:
+            pending = self.next_events(position, timeout)
+            if not pending:
+                raise TimeoutError("El turno no produjo eventos a tiempo")
+            for event in pending:
+                position += 1
+                yield event
+                if event[0] in (DONE, ERROR):
+                    return
+
+    def add_listener(self, listener):
+        """
+        Registra un callable sin argumentos que se llama (desde el worker) con
+        cada evento nuevo; permite esperar eventos sin bloquear un hilo.
+        """
+        with self._cond:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._cond:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def next_events(self, start: int = 0, timeout: float = None) -> list:
+        """
+        Retorna los eventos desde la posición `start`, esperando hasta `timeout`
+        segundos a que llegue al menos uno (lista vacía si no llega ninguno).
+        """
+        with self._cond:
+            if start >= len(self._events):
+                self._cond.wait_for(lambda: start < len(self._events), timeout)
+            return self._events[start:]
+
+    def result(self, timeout: float = None):
+        """Espera el final del turno y retorna el AgentResult (o lanza su error)."""
+        for kind, payload in self.events(timeout=timeout):
+            if kind == DONE:
+                return payload
+            if kind == ERROR:
+                raise payload
+
+    @property
+    def text(self) -> str:
+        """Texto generado hasta el momento."""
+        with self._cond:
+            return "".join(payload for kind, payload in self._events if kind == TEXT)
+
+    @property
+    def tools_used(self) -> list:
+        """Tools que el agente usó en el turno (en orden)."""
+        with self._cond:
+            return [payload for kind, payload in self._events if kind == TOOL]
+
+    @property
+    def products(self) -> list:
+        """Tarjetas de producto publicadas en el turno (en orden)."""
+        with self._cond:
+            return [product for kind, payload in self._events if kind == PRODUCTS for product in payload]
+
+    def done(self) -> bool:
+        with self._cond:
+            return self._finished
+
+    def cancel(self):
+        """Pide cancelar el turno (se detiene en el siguiente evento)."""
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+
+class _Job:
+    """Turno encolado en el motor."""
+
+    __slots__ = ("handle", "open_agent", "invocation_state", "answer", "record", "route")
+
+    def __init__(self, handle: TurnHandle, open_agent=None, invocation_state=None, answer=None, record=None, route=None):
+        self.handle = handle
+        self.open_agent = open_agent
+        self.invocation_state = invocation_state
+        # Respuesta ya entregada al enviar el turno: solo falta registrarla
+        self.answer = answer
+        self.record = record
+        self.route = route
+
+
+class AgentExecutionEngine:
+    """Pool de workers que ejecuta turnos con orden por conversación."""
+
+    def __init__(self, max_concurrency: int = ENGINE_MAX_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="agent-turn")
+        # session_key -> turnos en espera (la clave existe mientras la conversación tiene un turno activo)
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_key, prompt: str, open_agent, invocation_state: dict = None, route=None, record=None) -> TurnHandle:
+        """
+        Encola un turno.
+
+        Args:
+            session_key: Clave de la conversación (p.ej. (actor_id, session_id))
+            prompt: Mensaje del usuario
+            open_agent: Callable sin argumentos que retorna un context manager que
+                entrega el agente listo (p.ej. `lambda: agent_turn(...)`)
+            invocation_state: Estado opcional para la invocación de Strands
+            route: Callable opcional que se ejecuta en el worker antes del modelo
+                (p.ej. una ruta directa). Si retorna `(respuesta, tools)`, el turno
+                se responde sin el modelo y se registra con `record`; si retorna
+                None, sigue al agente.
+            record: Callable que agrega los mensajes del intercambio a la
+                conversación (ver submit_cached); requerido con `route`
+
+        Returns:
+            TurnHandle: Handle para consumir los eventos del turno
+        """
+        handle = TurnHandle(session_key, prompt)
+        self._enqueue(_Job(handle, open_agent, invocation_state, record=record, route=route))
+        return handle
+
+    def submit_cached(self, session_key, prompt: str, answer: str, record, tools=()) -> TurnHandle:
+        """
+        Entrega de inmediato una respuesta ya conocida (p.ej. de la caché de
+        respuestas) y encola solo su registro en la conversación del agente,
+        respetando el orden de los turnos.
+
+        Args:
+            record: Callable que recibe los mensajes del intercambio y los agrega
+                a la conversación (p.ej. `lambda messages: record_exchange(...)`)
+            tools: Tools que se usaron para obtener la respuesta, si hubo
+        """
+        handle = TurnHandle(session_key, prompt)
+        self._answer(handle, answer, tools)
+        self._enqueue(_Job(handle, answer=answer, record=record))
+        return handle
+
+    def _enqueue(self, job: _Job):
+        session_key = job.handle.session_key
+        with self._lock:
+            pending = self._sessions.get(session_key)
+            if pending is None:
+                self._sessions[session_key] = deque()
+                self._executor.submit(self._run, job)
+            else:
+                # Ya hay un turno de esta conversación en curso: esperar su turno
+                pending.append(job)
+
+    def pending_turns(self, session_key) -> int:
+        with self._lock:
+            pending = self._sessions.get(session_key)
+            return 0 if pending is None else len(pending)
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: _Job):
+        handle = job.handle
+        try:
+            answer = job.answer
+            if answer is None and job.route is not None and not handle.cancelled:
+                answer = self._route(job)
+            if answer is not None:
+                try:
+                    self._record(handle, job.record, answer)
+                except Exception as e:
+                    print(f"⚠️ No se pudo registrar la respuesta directa en la conversación: {e}")
+                return
+
+            try:
+                if handle.cancelled:
+                    raise TurnCancelled("Turno cancelado antes de empezar")
+                result = asyncio.run(self._drive(handle, job.open_agent, job.invocation_state))
+                handle.publish(DONE, result)
+            except Exception as e:
+                handle.publish(ERROR, e)
+        finally:
+            self._start_next(handle.session_key)
+
+    def _route(self, job: _Job):
+        """Ejecuta la ruta directa del turno; publica y retorna su respuesta, o None para seguir al agente."""
+        try:
+            routed = job.route()
+        except Exception as e:
+            print(f"⚠️ Ruta directa no disponible, se usa el agente: {type(e).__name__}: {e}")
+            return None
+        if routed is None:
+            return None
+        answer, tools = routed
+        self._answer(job.handle, answer, tools)
+        return answer
+
+    @staticmethod
+    def _answer(handle: TurnHandle, answer: str, tools=()):
+        """Publica una respuesta obtenida sin el modelo."""
+        handle.direct = True
+        for tool in tools:
+            handle.publish(TOOL, tool)
+        handle.publish(TEXT, answer)
+        handle.publish(DONE, answer)
+
+    def _start_next(self, session_key):
+        with self._lock:
+            pending = self._sessions.get(session_key)
+            if pending:
+                self._executor.submit(self._run, pending.popleft())
+            else:
+                self._sessions.pop(session_key, None)
+
+    async def _drive(self, handle: TurnHandle, open_agent, invocation_state):
+        with _turn_span(handle, cached=False):
+            result = await self._stream_turn(handle, open_agent, invocation_state)
+            if result is not None:
+                usage = result.metrics.accumulated_usage
+                set_attributes(**{
+                    "chat.tools": handle.tools_used,
+                    "gen_ai.usage.input_tokens": usage.get("inputTokens", 0),
+                    "gen_ai.usage.output_tokens": usage.get("outputTokens", 0),
+                    "gen_ai.usage.cache_read_input_tokens": usage.get("cacheReadInputTokens", 0),
+                    "gen_ai.usage.cache_write_input_tokens": usage.get("cacheWriteInputTokens", 0),
+                })
+            return result
+
+    async def _stream_turn(self, handle: TurnHandle, open_agent, invocation_state):
+        translator = EventTranslator()
+        result = None
+
+        # Los hooks de tarjetas de producto publican por este callback
+        invocation_state = {} if invocation_state is None else invocation_state
+        invocation_state[SINK_KEY] = lambda products: handle.publish(PRODUCTS, products)
+
+        with open_agent() as agent:
+            # Los eventos se publican desde aquí; evitar que el callback por defecto imprima
+            previous_callback = agent.callback_handler
+            agent.callback_handler = null_callback_handler
+            try:
+                stream = agent.stream_async(handle.prompt, invocation_state=invocation_state)
+                try:
+                    async for event in stream:
+                        if handle.cancelled:
+                            raise TurnCancelled("Turno cancelado")
+                        for kind, payload in translator.translate(event):
+                            handle.publish(kind, payload)
+                        if "result" in event:
+                            result = event["result"]
+                finally:
+                    await stream.aclose()
+            finally:
+                agent.callback_handler = previous_callback
+                handle.personalized = has_customer_context(agent.messages, handle.prompt)
+
+        return result
+
+    def _record(self, handle: TurnHandle, record, answer: str):
+        """Agrega el intercambio al historial del agente (y a su memoria vía el session manager)."""
+        with _turn_span(handle, cached=True):
+            record([
+                {"role": "user", "content": [{"text": handle.prompt}]},
+                {"role": "assistant", "content": [{"text": answer}]},
+            ])
+
+
+def _turn_span(handle: TurnHandle, cached: bool):
+    """Span raíz del turno (las fases, el modelo y las tools quedan como hijos)."""
+    actor_id, session_id = handle.session_key
+    return start_span(
+        "chat.turn",
+        **{
+            "actor.id_hash": hash_id(actor_id),
+            "session.id_hash": hash_id(session_id),
+            "chat.turn_id": handle.id,
+            "response_cache.hit": cached,
+        },
+    )
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AgentExecutionEngine:
+    """Obtiene el motor de ejecución compartido por el proceso."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AgentExecutionEngine()
+        return _engine
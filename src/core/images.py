@@ -0,0 +1,287 @@
+"""
+Product Images
+==============
+Miniaturas de las imágenes de productos, descargadas antes de mostrarlas.
+
+- Las URLs de imagen se detectan en el resultado de cada tool (hook del
+  agente) y se descargan en paralelo mientras el modelo sigue trabajando.
+- Cada imagen se reduce a una miniatura JPEG (Pillow) y se guarda en disco,
+  en una caché LRU acotada por tamaño y con clave por URL.
+- Al mostrar una respuesta, la UI lee los bytes ya cacheados; si una imagen
+  no llega a tiempo o no se pudo descargar, se muestra un placeholder.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from strands.hooks import AfterToolCallEvent, HookProvider
+
+from ..config import (
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_MB,
+    IMAGE_FETCH_TIMEOUT,
+    IMAGE_PREFETCH_WORKERS,
+    IMAGE_THUMBNAIL_SIZE,
+)
+
+# URLs de imagen en texto libre o JSON (el Gateway las entrega como "🖼️ Imagen: <url>")
+IMAGE_URL_PATTERN = re.compile(r"""https?://[^\s"'<>)]+?\.(?:jpe?g|png|webp|gif)(?:\?[^\s"'<>)]*)?""", re.IGNORECASE)
+# Descargas más grandes que esto se descartan
+MAX_DOWNLOAD_BYTES = 15 * 1024 * 1024
+# Segundos antes de reintentar una URL que falló
+FAILURE_TTL = 300
+THUMBNAIL_QUALITY = 85
+
+
+def find_image_urls(text: str) -> list:
+    """URLs de imagen de un texto, sin repetir y en orden."""
+    return list(dict.fromkeys(IMAGE_URL_PATTERN.findall(text or "")))
+
+
+def fetch_image(url: str, timeout: float = IMAGE_FETCH_TIMEOUT) -> bytes:
+    """Descarga una imagen (bytes originales)."""
+    import requests
+
+    with requests.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        data = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            data.extend(chunk)
+            if len(data) > MAX_DOWNLOAD_BYTES:
+                raise ValueError(f"Imagen de más de {MAX_DOWNLOAD_BYTES // (1024 * 1024)}MB")
+        return bytes(data)
+
+
+def make_thumbnail(data: bytes, size: int = IMAGE_THUMBNAIL_SIZE) -> bytes:
+    """Reduce la imagen a `size` px en su lado mayor y la codifica como JPEG."""
+    try:
+        from PIL import Image
+    except ImportError:
+        # Sin Pillow se guarda la imagen original
+        return data
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        if image.mode != "RGB":
+            # Transparencias sobre fondo blanco (JPEG no tiene canal alfa)
+            background = Image.new("RGB", image.size, "white")
+            rgba = image.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            image = background
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        return output.getvalue()
+
+
+_placeholder = None
+
+
+def placeholder_image(size: int = IMAGE_THUMBNAIL_SIZE):
+    """Imagen gris para las que no se pudieron cargar (None sin Pillow)."""
+    global _placeholder
+    if _placeholder is None:
+        try:
+            from PIL import Image
+
+            output = io.BytesIO()
+            Image.new("RGB", (size, size * 3 // 4), (238, 238, 238)).save(output, format="JPEG")
+            _placeholder = output.getvalue()
+        except ImportError:
+            return None
+    return _placeholder
+
+
+class ImageCache:
+    """
+    Caché LRU de miniaturas en disco con descargas en segundo plano.
+
+    Args:
+        directory: Carpeta de la caché
+        max_bytes: Tamaño máximo total de las miniaturas
+        thumbnail_size: Lado mayor de cada miniatura (px)
+        workers: Descargas simultáneas
+    """
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: int = int(IMAGE_CACHE_MAX_MB * 1024 * 1024),
+                 thumbnail_size: int = IMAGE_THUMBNAIL_SIZE, workers: int = IMAGE_PREFETCH_WORKERS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.thumbnail_size = thumbnail_size
+        self._executor = ThreadPoolExecutor(max(1, workers), thread_name_prefix="image-fetch")
+        # clave -> tamaño en bytes, de la menos a la más usada
+        self._index = OrderedDict()
+        self._total_bytes = 0
+        self._in_flight = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.jpg")
+
+    def _load_index(self):
+        # Miniaturas de ejecuciones anteriores, de la más antigua a la más reciente
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".jpg"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    # ------------------------------------------------------------------
+    # Descargas
+    # ------------------------------------------------------------------
+
+    def prefetch(self, urls) -> int:
+        """Programa la descarga de las URLs que no están en caché. Retorna cuántas se programaron."""
+        scheduled = 0
+        now = time.monotonic()
+        with self._lock:
+            for url in urls:
+                key = self.key(url)
+                if key in self._index or url in self._in_flight:
+                    continue
+                if now - self._failed.get(url, -FAILURE_TTL) < FAILURE_TTL:
+                    continue
+                self._in_flight[url] = self._executor.submit(self._download, url, key)
+                scheduled += 1
+        return scheduled
+
+    def _download(self, url: str, key: str):
+        try:
+            thumbnail = make_thumbnail(fetch_image(url), self.thumbnail_size)
+            path = self._path(key)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(thumbnail)
+            os.replace(temporary, path)
+            with self._lock:
+                self._total_bytes += len(thumbnail) - self._index.pop(key, 0)
+                self._index[key] = len(thumbnail)
+                self._evict()
+            return thumbnail
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar la imagen {url}: {type(e).__name__}: {e}")
+            with self._lock:
+                self._failed[url] = time.monotonic()
+            return None
+        finally:
+            with self._lock:
+                self._in_flight.pop(url, None)
+
+    def _evict(self):
+        # Llamar con el lock tomado
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def _read(self, key: str):
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            with self._lock:
+                self._total_bytes -= self._index.pop(key, 0)
+            return None
+
+    def get_many(self, urls, timeout: float) -> dict:
+        """
+        Miniaturas de varias URLs {url: bytes o None}, esperando como máximo
+        `timeout` segundos en total por las que aún se están descargando.
+        """
+        urls = list(dict.fromkeys(urls))
+        self.prefetch(urls)
+        deadline = time.monotonic() + timeout
+        images = {}
+        for url in urls:
+            data = self._read(self.key(url))
+            if data is None:
+                with self._lock:
+                    future = self._in_flight.get(url)
+                if future is not None:
+                    try:
+                        data = future.result(max(0.0, deadline - time.monotonic()))
+                    except Exception:
+                        data = None
+                else:
+                    # Pudo terminar de descargarse entre la lectura y la consulta
+                    data = self._read(self.key(url))
+            with self._lock:
+                if data is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            images[url] = data
+        return images
+
+    def get(self, url: str, timeout: float) -> bytes:
+        return self.get_many([url], timeout)[url]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "in_flight": len(self._in_flight),
+                "failed": len(self._failed),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ImagePrefetchHooks(HookProvider):
+    """Hooks del agente que descargan las imágenes que aparecen en el resultado de cada tool."""
+
+    def register_hooks(self, registry, **kwargs):
+        registry.add_callback(AfterToolCallEvent, self._after_tool_call)
+
+    def _after_tool_call(self, event):
+        result = event.result or {}
+        text = "\n".join(
+            str(item.get("text") or item.get("json") or "")
+            for item in result.get("content", [])
+            if isinstance(item, dict)
+        )
+        urls = find_image_urls(text)
+        if urls:
+            get_image_cache().prefetch(urls)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    """Obtiene la caché de imágenes compartida por el proceso."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache()
+        return _cache
@@ -0,0 +1,189 @@
+"""
+Intent Router
+=============
+Respuestas directas, sin pasar por el modelo, para los turnos simples más
+comunes: saludos, el menú ("qué puedes hacer"), políticas y sucursales.
+
+- Un clasificador local (expresiones regulares sobre el mensaje normalizado)
+  solo reconoce mensajes que son exactamente una de estas intenciones; un
+  mensaje con cualquier otra cosa ("hola, busco un comedor") sigue al agente.
+  "opciones" y "ayuda" sueltas solo se enrutan en el primer mensaje.
+- La respuesta sale de la tool del Gateway correspondiente (con la caché de
+  tools) o de una plantilla, y el turno se registra igual en la conversación
+  del agente y en AgentCore Memory.
+- La tool se llama en el worker del motor, en orden con los turnos anteriores
+  de la conversación (ver `route` en `AgentExecutionEngine.submit`).
+- Si la tool falla, tarda más de INTENT_ROUTER_TIMEOUT o retorna datos que no
+  son texto para el cliente (JSON), el mismo turno sigue al agente.
+- Las despedidas no se enrutan: `obtener_despedida` se personaliza con el
+  nombre del cliente y si compró, datos que solo tiene el agente.
+"""
+import random
+import re
+import uuid
+from datetime import timedelta
+
+from ..config import INTENT_ROUTER_INTENTS, INTENT_ROUTER_TIMEOUT
+from ..observability.phases import TOOLS, phase
+from .response_cache import normalize_prompt
+from .tool_cache import base_tool_name, get_tool_cache
+
+GREETING = "saludo"
+MENU = "menu"
+POLICIES = "politicas"
+STORES = "sucursal"
+
+GREETING_ANSWERS = (
+    "¡Hola! 😊 ¿En qué puedo ayudarte?",
+    "¡Hola! ¿Buscas algún mueble o tienes alguna duda?",
+    "¡Hola! Bienvenido a Jamar 🛋️ ¿Qué estás buscando hoy?",
+)
+
+# Tipo de política (obtener_politicas) según la palabra del mensaje
+POLICY_TYPES = {
+    "envio": "envios", "envios": "envios", "entrega": "envios", "entregas": "envios",
+    "garantia": "garantia", "garantias": "garantia",
+    "devolucion": "devoluciones", "devoluciones": "devoluciones", "cambio": "devoluciones", "cambios": "devoluciones",
+    "pago": "pagos", "pagos": "pagos",
+}
+
+# Cada patrón debe cubrir el mensaje completo (normalizado: minúsculas, sin tildes ni signos)
+PATTERNS = {
+    GREETING: re.compile(
+        r"(hola+|holi|hey|buenas|buen dia|buenos dias|buenas tardes|buenas noches|saludos)"
+        r"( (que tal|como estas|como esta|como vas))?"
+    ),
+    MENU: re.compile(
+        r"(hola )?(que (puedes|puedo|sabes) hacer( aqui)?|que (opciones|servicios) (hay|tienes|ofreces)"
+        r"|(ver |mostrar |muestrame (el )?)?(el )?menu( principal)?|en que me (puedes|podrias) ayudar)"
+    ),
+    POLICIES: re.compile(
+        r"((cual|cuales|como) (es|son) )?(la |las |su |sus )?(politica|politicas|condiciones)"
+        r"( de)? (?P<tipo>" + "|".join(POLICY_TYPES) + r")"
+    ),
+    STORES: re.compile(
+        r"((donde|en donde) (queda|quedan|esta|estan|hay) |(hay|tienen|tienes) )?"
+        r"(la |las |una |alguna |algunas |sus )?(tienda|tiendas|sucursal|sucursales)"
+        r"( (en|de|cerca de|por) (?P<zona>[a-z ]{2,40}?))?"
+    ),
+}
+
+# Palabras sueltas que solo piden el menú al abrir la conversación; más adelante
+# suelen responder al agente ("¿quieres ver opciones?" -> "opciones")
+FIRST_TURN_PATTERNS = {
+    MENU: re.compile(r"(hola )?(opciones|ayuda)"),
+}
+
+# Tool del Gateway que responde cada intención (el saludo usa una plantilla)
+INTENT_TOOLS = {
+    MENU: "obtener_menu_principal",
+    POLICIES: "obtener_politicas",
+    STORES: "buscar_sucursal",
+}
+
+
+class RoutedIntent:
+    """Intención reconocida y los argumentos de su tool."""
+
+    __slots__ = ("name", "arguments")
+
+    def __init__(self, name: str, arguments: dict):
+        self.name = name
+        self.arguments = arguments
+
+    @property
+    def tool(self):
+        return INTENT_TOOLS.get(self.name)
+
+
+def _original_words(prompt: str, fragment: str) -> str:
+    """Palabras del mensaje original (con tildes y mayúsculas) que corresponden a un fragmento normalizado."""
+    words = re.findall(r"\w+", prompt)
+    normalized = [normalize_prompt(word) for word in words]
+    target = fragment.split()
+    for start in range(len(words) - len(target) + 1):
+        if normalized[start:start + len(target)] == target:
+            return " ".join(words[start:start + len(target)])
+    return fragment
+
+
+def classify_intent(prompt: str, intents=INTENT_ROUTER_INTENTS, first_turn: bool = True):
+    """
+    Intención del mensaje si es exactamente una de las rutas directas, o None.
+    Con `first_turn=False` no se enrutan las palabras sueltas de FIRST_TURN_PATTERNS.
+    """
+    text = normalize_prompt(prompt)
+    if not text or len(text) > 80:
+        return None
+    for name, pattern in PATTERNS.items():
+        if name not in intents:
+            continue
+        match = pattern.fullmatch(text)
+        if match is None and first_turn and name in FIRST_TURN_PATTERNS:
+            match = FIRST_TURN_PATTERNS[name].fullmatch(text)
+        if match is None:
+            continue
+        arguments = {}
+        if name == POLICIES:
+            arguments["tipo"] = POLICY_TYPES[match.group("tipo")]
+        elif name == STORES and match.group("zona"):
+            arguments["zona"] = _original_words(prompt, match.group("zona").strip())
+        return RoutedIntent(name, arguments)
+    return None
+
+
+def _result_text(result: dict):
+    """Texto de un resultado de tool para mostrarlo tal cual, o None si no sirve."""
+    if not result or result.get("status") != "success":
+        return None
+    text = "\n".join(item["text"] for item in result.get("content", []) if isinstance(item, dict) and item.get("text"))
+    text = text.strip()
+    # Datos estructurados: necesitan que el modelo los redacte
+    if not text or text[:1] in ("[", "{"):
+        return None
+    return text
+
+
+def call_gateway_tool(tool: str, arguments: dict, region: str, timeout: float = INTENT_ROUTER_TIMEOUT):
+    """
+    Llama una tool del Gateway fuera del agente, con una sesión del pool MCP
+    y la caché de tools. Retorna el resultado (ToolResult) o None.
+    """
+    from .mcp_pool import get_mcp_pool
+    from .tool_catalog import get_tool_catalog
+
+    cache = get_tool_cache()
+    cached = cache.get(tool, arguments) if cache.is_cacheable(tool) else None
+    if cached is not None:
+        return cached
+
+    with get_mcp_pool(region).session(timeout) as mcp_client:
+        gateway_tool = next(
+            (item for item in get_tool_catalog().get_tools(mcp_client) if base_tool_name(item.tool_name) == tool),
+            None,
+        )
+        if gateway_tool is None:
+            return None
+        # El nombre en el Gateway (`target___tool`), sin los wrappers de la tool (caché, especulación)
+        while hasattr(gateway_tool, "tool"):
+            gateway_tool = gateway_tool.tool
+        name = gateway_tool.mcp_tool.name
+        with phase(TOOLS):
+            result = mcp_client.call_tool_sync(
+                f"tooluse_{uuid.uuid4().hex[:16]}", name, arguments, read_timeout_seconds=timedelta(seconds=timeout)
+            )
+
+    if result.get("status") == "success":
+        cache.put(tool, arguments, result)
+    return result
+
+
+def route_answer(intent: RoutedIntent, region: str):
+    """Respuesta directa de la intención, o None para que el turno siga al agente."""
+    if intent.tool is None:
+        return random.choice(GREETING_ANSWERS)
+    try:
+        return _result_text(call_gateway_tool(intent.tool, intent.arguments, region))
+    except Exception as e:
+        print(f"⚠️ Ruta directa '{intent.name}' no disponible, se usa el agente: {type(e).__name__}: {e}")
+        return None
@@ -0,0 +1,279 @@
+"""
+MCP Session Pool
+================
+Pool de sesiones MCP persistentes hacia el AgentCore Gateway.
+
+Cada sesión es un MCPClient ya iniciado (hilo de fondo + conexión HTTP abiertos)
+que se presta a un turno y se devuelve al terminar, en lugar de abrir y cerrar
+la conexión en cada mensaje.
+"""
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from ..observability.phases import MCP_CONNECT, phase
+from ..config import (
+    MCP_POOL_SIZE,
+    MCP_POOL_ACQUIRE_TIMEOUT,
+    MCP_POOL_HEALTH_CHECK_INTERVAL,
+    MCP_POOL_MAX_SESSION_AGE,
+)
+
+
+class PooledSession:
+    """Sesión MCP iniciada que pertenece al pool."""
+
+    def __init__(self, client):
+        self.client = client
+        self.created_at = time.monotonic()
+        self.last_checked = self.created_at
+        self.last_used = self.created_at
+        self.uses = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class MCPSessionPool:
+    """
+    Pool thread-safe de sesiones MCP de larga duración.
+
+    - Crea sesiones de forma perezosa hasta `size`.
+    - Verifica la salud de la sesión al prestarla (hilo vivo y, cada
+      `health_check_interval` segundos, un round trip al Gateway).
+    - Reconecta las sesiones caídas, viejas o que fallaron durante un turno.
+    """
+
+    def __init__(
+        self,
+        client_factory,
+        size: int = MCP_POOL_SIZE,
+        acquire_timeout: float = MCP_POOL_ACQUIRE_TIMEOUT,
+        health_check_interval: float = MCP_POOL_HEALTH_CHECK_INTERVAL,
+        max_session_age: float = MCP_POOL_MAX_SESSION_AGE,
+    ):
+        """
+        Args:
+            client_factory: Callable que retorna un MCPClient nuevo (sin iniciar)
+            size: Número máximo de sesiones abiertas
+            acquire_timeout: Segundos máximos esperando una sesión libre
+            health_check_interval: Segundos entre verificaciones contra el Gateway
+            max_session_age: Segundos tras los cuales una sesión se recicla
+        """
+        self._client_factory = client_factory
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.max_session_age = max_session_age
+
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.connects = 0
+        self.reconnects = 0
+
+    # ------------------------------------------------------------------
+    # Préstamo y devolución
+    # ------------------------------------------------------------------
+
+    def acquire(self, timeout: float = None) -> PooledSession:
+        """
+        Presta una sesión sana del pool (bloquea si todas están en uso).
+
+        Raises:
+            TimeoutError: Si no se libera ninguna sesión a tiempo
+            RuntimeError: Si el pool está cerrado
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        session = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("El pool de sesiones MCP está cerrado")
+                if self._idle:
+                    # LIFO: reutilizar la sesión usada más recientemente
+                    session = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    # Reservar el cupo y conectar fuera del lock
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No hay sesiones MCP libres tras {timeout:g}s (pool de {self.size})"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if session is None:
+                session = self._connect()
+            elif not self._is_healthy(session):
+                session = self._reconnect(session)
+        except Exception:
+            self._forget_slot()
+            raise
+
+        session.last_used = time.monotonic()
+        session.uses += 1
+        return session
+
+    def release(self, session: PooledSession, discard: bool = False):
+        """Devuelve una sesión al pool; si está dañada se cierra y se libera su cupo."""
+        if discard or not self._is_alive(session) or self._closed:
+            self._close_quietly(session)
+            self._forget_slot()
+            return
+
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """
+        Presta un MCPClient activo durante el bloque `with`.
+
+        Uso:
+            with pool.session() as mcp_client:
+                tools = mcp_client.list_tools_sync()
+        """
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled.client
+        finally:
+            self.release(pooled)
+
+    def prewarm(self, count: int = 1) -> int:
+        """
+        Abre en paralelo sesiones hasta tener `count` (sin pasar del tamaño del pool)
+        y las deja libres para los primeros turnos.
+
+        Returns:
+            int: Sesiones abiertas o reutilizadas
+        """
+        count = min(count, self.size)
+        if count <= 0:
+            return 0
+        sessions = []
+        try:
+            with ThreadPoolExecutor(count, thread_name_prefix="mcp-prewarm") as executor:
+                futures = [executor.submit(self.acquire) for _ in range(count)]
+                errors = []
+                for future in futures:
+                    try:
+                        sessions.append(future.result())
+                    except Exception as e:
+                        errors.append(e)
+            if not sessions and errors:
+                raise errors[0]
+        finally:
+            for session in sessions:
+                self.release(session)
+        return len(sessions)
+
+    def close(self):
+        """Cierra todas las sesiones libres y rechaza nuevos préstamos."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for session in idle:
+            self._close_quietly(session)
+
+    def stats(self) -> dict:
+        """Estado actual del pool (para diagnóstico)."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._total,
+                "idle": len(self._idle),
+                "in_use": self._total - len(self._idle),
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+            }
+
+    # ------------------------------------------------------------------
+    # Conexión y salud
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> PooledSession:
+        client = self._client_factory()
+        with phase(MCP_CONNECT, **{"mcp.reconnects": self.reconnects}):
+            client.start()
+        self.connects += 1
+        return PooledSession(client)
+
+    def _reconnect(self, session: PooledSession) -> PooledSession:
+        self._close_quietly(session)
+        self.reconnects += 1
+        return self._connect()
+
+    def _is_alive(self, session: PooledSession) -> bool:
+        is_active = getattr(session.client, "_is_session_active", None)
+        return bool(is_active()) if is_active else True
+
+    def _is_healthy(self, session: PooledSession) -> bool:
+        if not self._is_alive(session):
+            return False
+        if self.max_session_age and session.age > self.max_session_age:
+            return False
+
+        now = time.monotonic()
+        if now - session.last_checked < self.health_check_interval:
+            return True
+
+        # Round trip liviano para detectar conexiones cortadas por el servidor
+        try:
+            session.client.list_tools_sync()
+        except Exception as e:
+            print(f"⚠️ Sesión MCP no responde, reconectando: {e}")
+            return False
+        session.last_checked = now
+        return True
+
+    def _close_quietly(self, session: PooledSession):
+        from .tool_catalog import get_tool_catalog
+
+        # Las tools del catálogo retienen al cliente: descartarlas con la sesión
+        get_tool_catalog().invalidate(session.client)
+        try:
+            session.client.stop(None, None, None)
+        except Exception:
+            pass
+
+    def _forget_slot(self):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_mcp_pool(region: str) -> MCPSessionPool:
+    """Obtiene (o crea) el pool de sesiones MCP del proceso para una región."""
+    with _pools_lock:
+        pool = _pools.get(region)
+        if pool is None:
+            from gateway.utils import create_gateway_mcp_client
+
+            pool = MCPSessionPool(lambda: create_gateway_mcp_client(region, phase=phase))
+            _pools[region] = pool
+        return pool
+
+
+@atexit.register
+def _close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
@@ -0,0 +1,221 @@
+"""
+Product Cards
+=============
+Productos de las tools del Gateway mostrados directamente como tarjetas.
+
+Antes el modelo copiaba nombre, precio, stock, URL e imagen de cada producto
+en su respuesta (tokens de salida, lo más lento de la generación, y URLs que
+podían quedar mal copiadas) y la UI los volvía a extraer con regex.
+
+Con las tarjetas activas:
+- Un hook del agente toma el resultado de las tools de productos y extrae los
+  productos (texto del Gateway o JSON) como datos estructurados.
+- Los productos se publican como un evento del turno (PRODUCTS) y la UI/API
+  los dibuja como tarjetas numeradas.
+- Al modelo le llega el resultado sin URLs ni imágenes, con la numeración de
+  las tarjetas, y escribe solo una introducción breve (PRODUCT_CARDS_PROMPT).
+"""
+import json
+import re
+
+from strands.hooks import AfterToolCallEvent, HookProvider
+
+from ..config import PRODUCT_CARD_TOOLS, PRODUCT_CARDS_MAX
+from .images import IMAGE_URL_PATTERN
+from .rendering import IMAGE_PATTERN, PRODUCT_URL_PATTERN
+from .tool_cache import base_tool_name
+
+# Clave de invocation_state con los productos del turno y el callback que los publica
+PRODUCTS_KEY = "product_cards"
+SINK_KEY = "product_sink"
+
+PRODUCT_PAGE_PATTERN = re.compile(r"https?://[^\s\"'<>)]+/products/[^\s\"'<>)]+")
+PRICE_PATTERN = re.compile(r"\$\s?([\d][\d.,]*)")
+STOCK_PATTERN = re.compile(r"Stock:\s*([^|\n]+)", re.IGNORECASE)
+ITEM_START_PATTERN = re.compile(r"^\s*(?:\d+[.)]|[-•*])\s+")
+
+# Campos equivalentes en resultados JSON
+NAME_FIELDS = ("title", "name", "nombre", "titulo")
+PRICE_FIELDS = ("price", "precio")
+STOCK_FIELDS = ("stock", "inventario", "inventory", "disponible")
+URL_FIELDS = ("url", "link", "product_url", "enlace")
+IMAGE_FIELDS = ("image", "imagen", "image_url", "featured_image", "img")
+LIST_FIELDS = ("productos", "products", "items", "results", "resultados")
+
+
+def _first(data: dict, fields: tuple):
+    for field in fields:
+        value = data.get(field)
+        if isinstance(value, dict):
+            value = value.get("url") or value.get("src")
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _product(name, price, stock, url, image) -> dict:
+    return {
+        "name": str(name).strip() if name else "Producto",
+        "price": str(price).strip() if price not in (None, "") else None,
+        "stock": str(stock).strip() if stock not in (None, "") else None,
+        "url": url,
+        "image": image,
+    }
+
+
+def _products_from_json(data) -> list:
+    if isinstance(data, dict):
+        for field in LIST_FIELDS:
+            if isinstance(data.get(field), list):
+                return _products_from_json(data[field])
+        data = [data]
+    if not isinstance(data, list):
+        return []
+
+    products = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        url = _first(item, URL_FIELDS)
+        if not url:
+            continue
+        price = _first(item, PRICE_FIELDS)
+        if isinstance(price, (int, float)):
+            price = f"${price:,.0f}" if float(price).is_integer() else f"${price:,.2f}"
+        products.append(_product(_first(item, NAME_FIELDS), price, _first(item, STOCK_FIELDS), url, _first(item, IMAGE_FIELDS)))
+    return products
+
+
+def _blocks(text: str) -> list:
+    """Divide el texto en bloques por producto (líneas en blanco o ítems numerados)."""
+    blocks, current = [], []
+    for line in text.splitlines():
+        if not line.strip() or (ITEM_START_PATTERN.match(line) and current):
+            if current:
+                blocks.append(current)
+            current = [line] if line.strip() else []
+        else:
+            current.append(line)
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def _products_from_text(text: str) -> list:
+    products = []
+    for block in _blocks(text):
+        joined = "\n".join(block)
+        url_match = PRODUCT_URL_PATTERN.search(joined) or PRODUCT_PAGE_PATTERN.search(joined)
+        if not url_match:
+            continue
+        url = url_match.group(1) if url_match.groups() else url_match.group(0)
+        image_match = IMAGE_PATTERN.search(joined) or IMAGE_URL_PATTERN.search(joined)
+        image = None
+        if image_match:
+            image = image_match.group(1) if image_match.groups() else image_match.group(0)
+
+        # Nombre: primera línea, sin numeración, negritas ni lo que sigue al precio/separador
+        name = ITEM_START_PATTERN.sub("", block[0]).replace("**", "")
+        name = re.split(r"\s[|–-]\s|:\s|\s💰|🔗", name)[0].strip(" :")
+        price = PRICE_PATTERN.search(joined)
+        stock = STOCK_PATTERN.search(joined)
+        products.append(_product(name, f"${price.group(1)}" if price else None, stock.group(1) if stock else None, url, image))
+    return products
+
+
+def parse_products(text: str) -> list:
+    """
+    Productos de un resultado de tool: dicts con name, price, stock, url e image.
+    Acepta el texto del Gateway ("🔗 Ver producto: ..." / "🖼️ Imagen: ...") o JSON.
+    """
+    stripped = (text or "").strip()
+    if stripped[:1] in ("[", "{"):
+        try:
+            return _products_from_json(json.loads(stripped))
+        except ValueError:
+            pass
+    return _products_from_text(stripped)
+
+
+def strip_product_links(text: str) -> str:
+    """Quita del texto las líneas de URL e imagen de los productos (ya están en las tarjetas)."""
+    text = PRODUCT_URL_PATTERN.sub("", text)
+    text = IMAGE_PATTERN.sub("", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _strip_json_links(data):
+    if isinstance(data, list):
+        return [_strip_json_links(item) for item in data]
+    if isinstance(data, dict):
+        return {
+            key: _strip_json_links(value)
+            for key, value in data.items()
+            if key not in URL_FIELDS + IMAGE_FIELDS
+        }
+    return data
+
+
+class ProductCardHooks(HookProvider):
+    """
+    Hooks del agente que capturan los productos de las tools de productos,
+    los publican como tarjetas y le pasan al modelo el resultado sin links.
+    """
+
+    def __init__(self, tools=PRODUCT_CARD_TOOLS, max_cards: int = PRODUCT_CARDS_MAX):
+        self.tools = set(tools)
+        self.max_cards = max_cards
+
+    def register_hooks(self, registry, **kwargs):
+        registry.add_callback(AfterToolCallEvent, self._after_tool_call)
+
+    def _after_tool_call(self, event):
+        result = event.result
+        if not result or result.get("status") != "success":
+            return
+        if base_tool_name(event.tool_use["name"]) not in self.tools:
+            return
+
+        cards = event.invocation_state.setdefault(PRODUCTS_KEY, [])
+        known = {card["url"] for card in cards}
+        captured = []
+        content = []
+        changed = False
+        for item in result.get("content", []):
+            text = item.get("text") if isinstance(item, dict) else None
+            products = parse_products(text) if text else []
+            if not products:
+                content.append(item)
+                continue
+            changed = True
+
+            references = []
+            for product in products:
+                if product["url"] in known:
+                    references.append(next(card["number"] for card in cards if card["url"] == product["url"]))
+                    continue
+                if len(cards) >= self.max_cards:
+                    continue
+                product["number"] = len(cards) + 1
+                cards.append(product)
+                known.add(product["url"])
+                captured.append(product)
+                references.append(product["number"])
+
+            if text.strip()[:1] in ("[", "{"):
+                try:
+                    text = json.dumps(_strip_json_links(json.loads(text)), ensure_ascii=False)
+                except ValueError:
+                    text = strip_product_links(text)
+            else:
+                text = strip_product_links(text)
+            shown = ", ".join(f"[{number}]" for number in references) or "ninguna (límite de tarjetas)"
+            content.append({"text": f"{text}\n\n(Tarjetas mostradas al cliente: {shown}. No copies sus links, imágenes ni precios.)"})
+
+        if not changed:
+            return
+        event.result = {**result, "content": content}
+
+        sink = event.invocation_state.get(SINK_KEY)
+        if captured and sink is not None:
+            sink(captured)
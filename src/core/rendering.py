@@ -0,0 +1,48 @@
+"""
+Rendering
+=========
+Modelo de render de las respuestas del agente, calculado una sola vez.
+
+Cada rerun de Streamlit vuelve a dibujar el historial; en lugar de volver a
+buscar con regex los links de producto y las imágenes de cada mensaje, el
+resultado (markdown con links clickeables + lista de imágenes) se guarda en
+el propio mensaje la primera vez que se muestra.
+"""
+import re
+
+PRODUCT_URL_PATTERN = re.compile(r"🔗 Ver producto: (https?://[^\s]+)")
+IMAGE_PATTERN = re.compile(r"🖼️ Imagen: (https?://[^\s]+)")
+# Imágenes que se muestran por respuesta
+MAX_IMAGES = 3
+# Clave del modelo de render dentro del dict del mensaje (no se guarda en el store de sesiones)
+RENDER_KEY = "render"
+
+
+class RenderModel:
+    """Respuesta lista para dibujar: markdown, links de producto e imágenes."""
+
+    __slots__ = ("source", "markdown", "links", "images")
+
+    def __init__(self, source: str, markdown: str, links: tuple, images: tuple):
+        self.source = source
+        self.markdown = markdown
+        self.links = links
+        self.images = images
+
+
+def build_render_model(text: str) -> RenderModel:
+    """Extrae links e imágenes y deja el markdown listo (links clickeables, sin líneas de imagen)."""
+    links = tuple(PRODUCT_URL_PATTERN.findall(text))
+    images = tuple(IMAGE_PATTERN.findall(text))[:MAX_IMAGES]
+    markdown = PRODUCT_URL_PATTERN.sub(r"🔗 [Ver producto](\1)", text)
+    markdown = IMAGE_PATTERN.sub("", markdown)
+    return RenderModel(text, markdown, links, images)
+
+
+def message_render_model(message: dict) -> RenderModel:
+    """Modelo de render de un mensaje del historial (se calcula en el primer render)."""
+    model = message.get(RENDER_KEY)
+    if model is None or model.source is not message["content"]:
+        model = build_render_model(message["content"])
+        message[RENDER_KEY] = model
+    return model
@@ -0,0 +1,193 @@
+"""
+Response Cache
+==============
+Caché de respuestas para preguntas frecuentes redactadas de forma distinta
+(costos de envío, garantía, horarios, condiciones de Credijamar).
+
+- Solo aplica al primer mensaje de una conversación.
+- La similitud se estima localmente con MinHash sobre n-gramas de caracteres
+  del texto normalizado (sin servicios de embeddings).
+- Se responde desde la caché solo si la similitud supera el umbral.
+- Se excluyen los mensajes personales o de crédito (pedidos, montos, datos
+  del cliente, estudio de crédito) y las respuestas que usaron tools que no
+  son informativas.
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from ..config import (
+    RESPONSE_CACHE_THRESHOLD,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_EXCLUDED_TERMS,
+    RESPONSE_CACHE_TOOLS,
+)
+from .tool_cache import base_tool_name
+
+NGRAM_SIZE = 3
+NUM_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _permutations(count: int) -> list:
+    """Coeficientes (a, b) deterministas para las permutaciones de MinHash."""
+    coefficients = []
+    for i in range(count):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+        coefficients.append((a, b))
+    return coefficients
+
+
+_PERMUTATIONS = _permutations(NUM_PERMUTATIONS)
+
+
+def normalize_prompt(text: str) -> str:
+    """Minúsculas, sin tildes, sin signos de puntuación ni espacios repetidos."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def minhash_signature(text: str) -> tuple:
+    """Firma MinHash de los n-gramas de caracteres de un texto normalizado."""
+    padded = f" {text} "
+    shingles = {padded[i:i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1))}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in shingles
+    ]
+    return tuple(
+        min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(signature_a: tuple, signature_b: tuple) -> float:
+    """Estimación de la similitud de Jaccard entre dos firmas."""
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
+
+
+class _CachedResponse:
+    def __init__(self, prompt: str, signature: tuple, answer: str, expires_at: float):
+        self.prompt = prompt
+        self.signature = signature
+        self.answer = answer
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Respuestas a preguntas frecuentes indexadas por firma MinHash del prompt."""
+
+    def __init__(
+        self,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        excluded_terms=RESPONSE_CACHE_EXCLUDED_TERMS,
+        allowed_tools=RESPONSE_CACHE_TOOLS,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.excluded_terms = [normalize_prompt(term) for term in excluded_terms]
+        self.allowed_tools = set(allowed_tools)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def is_excluded(self, prompt: str) -> bool:
+        """True si el mensaje es personal o de crédito (o trae cifras: montos, pedidos, cédulas)."""
+        normalized = normalize_prompt(prompt)
+        if not normalized or re.search(r"\d", normalized):
+            return True
+        padded = f" {normalized} "
+        return any(f" {term} " in padded for term in self.excluded_terms)
+
+    def lookup(self, prompt: str):
+        """
+        Busca una respuesta para un mensaje parecido.
+
+        Returns:
+            tuple: (respuesta, similitud) o None si no hay una suficientemente parecida
+        """
+        if self.is_excluded(prompt):
+            return None
+
+        normalized = normalize_prompt(prompt)
+        signature = minhash_signature(normalized)
+        now = time.monotonic()
+        best, best_score = None, 0.0
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.expires_at <= now:
+                    del self._entries[key]
+                    continue
+                score = 1.0 if key == normalized else similarity(signature, entry.signature)
+                if score > best_score:
+                    best, best_score = key, score
+
+            if best is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best)
+                self.hits += 1
+                return self._entries[best].answer, best_score
+            self.misses += 1
+            return None
+
+    def store(self, prompt: str, answer: str, tools_used=()) -> bool:
+        """
+        Guarda la respuesta del primer turno si es cacheable.
+
+        Returns:
+            bool: True si se guardó
+        """
+        if not answer or not answer.strip() or self.is_excluded(prompt):
+            return False
+        # Solo respuestas respaldadas por tools informativas (no saludos personalizados por la memoria)
+        if not tools_used or any(base_tool_name(tool) not in self.allowed_tools for tool in tools_used):
+            return False
+
+        normalized = normalize_prompt(prompt)
+        entry = _CachedResponse(prompt, minhash_signature(normalized), answer, time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[normalized] = entry
+            self._entries.move_to_end(normalized)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Obtiene la caché de respuestas compartida por el proceso."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
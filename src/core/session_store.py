@@ -0,0 +1,344 @@
+"""
+Session Store
+=============
+Estado de la conversación fuera del proceso de Streamlit.
+
+`st.session_state` vive en un solo proceso: con varias réplicas (App Runner)
+un usuario que llega a otra instancia perdía su conversación. El store guarda,
+por `actor_id` (que viaja en la URL), el `session_id` de la conversación y el
+historial de la UI, así cualquier réplica puede retomarla. El historial del
+agente lo restaura AgentCore Memory a partir del mismo `session_id`.
+
+Backends (SESSION_STORE):
+- memory: diccionario del proceso (una sola réplica)
+- sqlite: archivo SQLite (réplicas en la misma máquina o volumen compartido)
+- redis:  cualquier servidor con protocolo Redis (RESP), con un cliente mínimo
+          sin dependencias extra
+
+Los estados se guardan como JSON compacto (comprimido con zlib si es grande)
+y expiran tras SESSION_STORE_TTL segundos sin actividad.
+"""
+import json
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+from ..config import SESSION_STORE, SESSION_STORE_TTL, SESSION_STORE_URL
+
+# Estados más grandes que esto se comprimen
+COMPRESS_MIN_BYTES = 1024
+# Mensajes del historial de la UI que se conservan por conversación
+MAX_STORED_MESSAGES = 200
+DEFAULT_SQLITE_PATH = "sessions.db"
+KEY_PREFIX = "jamar:session:"
+
+
+def encode_state(state: dict) -> bytes:
+    """Serializa un estado como JSON compacto (zlib si supera COMPRESS_MIN_BYTES)."""
+    raw = json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(raw)
+    return b"j" + raw
+
+
+def decode_state(data: bytes) -> dict:
+    if data[:1] == b"z":
+        return json.loads(zlib.decompress(data[1:]))
+    return json.loads(data[1:])
+
+
+class SessionStore:
+    """Interfaz común: estados (dict) por clave con expiración."""
+
+    def __init__(self, ttl: float = SESSION_STORE_TTL):
+        self.ttl = ttl
+
+    def get(self, key: str):
+        """Estado guardado para la clave, o None si no existe o expiró."""
+        data = self._get(key)
+        return None if data is None else decode_state(data)
+
+    def put(self, key: str, state: dict):
+        """Guarda el estado (renueva su expiración)."""
+        self._put(key, encode_state(state))
+
+    def delete(self, key: str):
+        self._delete(key)
+
+    def close(self):
+        pass
+
+    def _get(self, key: str):
+        raise NotImplementedError
+
+    def _put(self, key: str, data: bytes):
+        raise NotImplementedError
+
+    def _delete(self, key: str):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Store del proceso (LRU con expiración)."""
+
+    def __init__(self, ttl: float = SESSION_STORE_TTL, max_entries: int = 10000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            return data
+
+    def _put(self, key: str, data: bytes):
+        with self._lock:
+            self._entries[key] = (data, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store en un archivo SQLite (WAL, una conexión por hilo)."""
+
+    # Cada cuántas escrituras se borran las filas expiradas
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, ttl: float = SESSION_STORE_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        # Hilo -> conexión, para que close() las cierre todas
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # check_same_thread=False solo para poder cerrarla desde close(); cada hilo usa la suya
+            connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._local.connection = connection
+            with self._lock:
+                # Cerrar las conexiones de hilos que ya terminaron
+                for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = connection
+        return connection
+
+    def _get(self, key: str):
+        row = self._connection().execute(
+            "SELECT value FROM sessions WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def _put(self, key: str, data: bytes):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, time.time() + self.ttl),
+            )
+            with self._lock:
+                self._writes += 1
+                purge = self._writes % self.PURGE_EVERY == 0
+            if purge:
+                connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+    def _delete(self, key: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def close(self):
+        """Cierra las conexiones de todos los hilos (los siguientes accesos abren nuevas)."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
+
+
+class RespError(Exception):
+    """Error retornado por el servidor Redis."""
+
+
+class RespConnection:
+    """Conexión con protocolo RESP2 (solo lo necesario para GET/SET/DEL)."""
+
+    def __init__(self, host: str, port: int, password: str = None, username: str = None, db: int = 0,
+                 use_ssl: bool = False, timeout: float = 5):
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        if use_ssl:
+            import ssl
+
+            self._socket = ssl.create_default_context().wrap_socket(self._socket, server_hostname=host)
+        self._reader = self._socket.makefile("rb")
+        if password:
+            self.command("AUTH", *([username] if username else []), password)
+        if db:
+            self.command("SELECT", str(db))
+
+    def command(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            value = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(value), value))
+        self._socket.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Conexión cerrada por el servidor Redis")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RespError(f"Respuesta RESP inesperada: {line!r}")
+
+    def close(self):
+        try:
+            self._reader.close()
+            self._socket.close()
+        except OSError:
+            pass
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store en Redis (o compatible: Valkey, ElastiCache, MemoryDB) con un pool
+    pequeño de conexiones RESP. La expiración la aplica el servidor (SET EX).
+
+    URL: redis://[[usuario]:contraseña@]host[:puerto][/db] (rediss:// para TLS)
+    """
+
+    def __init__(self, url: str, ttl: float = SESSION_STORE_TTL, max_idle: int = 8):
+        super().__init__(ttl)
+        parsed = urlparse(url)
+        self._options = {
+            "host": parsed.hostname or "localhost",
+            "port": parsed.port or 6379,
+            "username": unquote(parsed.username) if parsed.username else None,
+            "password": unquote(parsed.password) if parsed.password else None,
+            "db": int(parsed.path.lstrip("/") or 0),
+            "use_ssl": parsed.scheme == "rediss",
+        }
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _command(self, *args):
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        # Una conexión del pool puede haberse cerrado: se reintenta una vez con una nueva
+        for attempt in range(2):
+            if connection is None:
+                connection = RespConnection(**self._options)
+            try:
+                reply = connection.command(*args)
+                break
+            except RespError:
+                self._release(connection)
+                raise
+            except OSError:
+                connection.close()
+                connection = None
+                if attempt:
+                    raise
+        self._release(connection)
+        return reply
+
+    def _release(self, connection: RespConnection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _get(self, key: str):
+        return self._command("GET", KEY_PREFIX + key)
+
+    def _put(self, key: str, data: bytes):
+        self._command("SET", KEY_PREFIX + key, data, "EX", max(1, int(self.ttl)))
+
+    def _delete(self, key: str):
+        self._command("DEL", KEY_PREFIX + key)
+
+    def ping(self) -> bool:
+        return self._command("PING") == "PONG"
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+def create_session_store(kind: str = SESSION_STORE, url: str = SESSION_STORE_URL, ttl: float = SESSION_STORE_TTL) -> SessionStore:
+    """Crea el store configurado (memory, sqlite o redis)."""
+    if kind == "sqlite":
+        return SQLiteSessionStore(url or DEFAULT_SQLITE_PATH, ttl)
+    if kind == "redis":
+        return RedisSessionStore(url or "redis://localhost:6379/0", ttl)
+    if kind != "memory":
+        print(f"⚠️ SESSION_STORE desconocido ({kind}), usando memory")
+    return MemorySessionStore(ttl)
+
+
+def conversation_state(session_id: str, messages: list) -> dict:
+    """Estado de una conversación tal como se guarda en el store."""
+    return {
+        "session_id": session_id,
+        "messages": [
+            {"role": message["role"], "content": message["content"],
+             **({"products": message["products"]} if message.get("products") else {})}
+            for message in messages[-MAX_STORED_MESSAGES:]
+        ],
+        "updated_at": time.time(),
+    }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Obtiene el store de sesiones compartido por el proceso."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_session_store()
+        return _store
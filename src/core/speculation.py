@@ -0,0 +1,354 @@
+"""
+Speculation
+===========
+Búsqueda de productos adelantada mientras el modelo piensa.
+
+En la mayoría de los turnos de productos lo primero que hace el modelo es
+llamar `buscar_productos` con un término tomado casi textual del mensaje
+(REGLA #2 del prompt). Al empezar el turno:
+
+- Se estima localmente el término (categoría + atributos como "6 puestos" o
+  "madera", completando con los mensajes anteriores si el mensaje solo trae
+  detalles) y el `precio_maximo`.
+- Con la sesión MCP del propio turno se lanza esa llamada al Gateway en
+  paralelo con la primera llamada a Bedrock.
+- Si el modelo pide la misma búsqueda (mismos argumentos normalizados), la
+  tool entrega el resultado adelantado sin volver a llamar al Gateway.
+- Si no la pide, la llamada se cancela al terminar el turno; los aciertos,
+  fallos y llamadas descartadas quedan en las métricas del proceso.
+"""
+import asyncio
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from contextlib import contextmanager
+
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool
+
+from ..config import SPECULATION_ENABLED
+from ..observability.tracing import set_attributes
+from .response_cache import normalize_prompt
+from .tool_cache import base_tool_name, normalize_arguments
+
+# Clave de invocation_state con la especulación del turno
+SPECULATION_KEY = "speculation"
+SEARCH_TOOL = "buscar_productos"
+# Nombres posibles del argumento del término en el esquema de la tool (el primero es el default)
+TERM_ARGUMENTS = ("termino_busqueda", "termino", "query", "busqueda")
+PRICE_ARGUMENT = "precio_maximo"
+# Mensajes anteriores del cliente que se miran para completar la búsqueda
+HISTORY_MESSAGES = 3
+
+# Categoría (texto normalizado, singular o plural) -> término que usa el modelo (ver REGLA #2)
+CATEGORIES = {
+    "centro de entretenimiento": "centro de entretenimiento", "centros de entretenimiento": "centro de entretenimiento",
+    "mesa de centro": "mesa de centro", "mesas de centro": "mesa de centro",
+    "mueble de tv": "mueble de tv", "muebles de tv": "mueble de tv",
+    "comedor": "comedor", "comedores": "comedor",
+    "sofacama": "sofacama", "sofacamas": "sofacama",
+    "sofa": "sofá", "sofas": "sofá", "seccional": "seccional", "seccionales": "seccional",
+    "sala": "sala", "salas": "sala", "poltrona": "poltrona", "poltronas": "poltrona",
+    "cama": "cama", "camas": "cama", "colchon": "colchón", "colchones": "colchón",
+    "litera": "litera", "literas": "litera", "cabecero": "cabecero", "cabeceros": "cabecero",
+    "nochero": "nochero", "nocheros": "nochero", "comoda": "cómoda", "comodas": "cómoda",
+    "closet": "closet", "closets": "closet", "ropero": "ropero", "roperos": "ropero",
+    "escritorio": "escritorio", "escritorios": "escritorio",
+    "silla": "silla", "sillas": "silla", "mesa": "mesa", "mesas": "mesa",
+    "bufe": "bufé", "bife": "bife", "vitrina": "vitrina", "vitrinas": "vitrina",
+}
+# Atributos que el modelo suele agregar al término, en el orden en que aparecen
+ATTRIBUTE_WORDS = (
+    "madera", "vidrio", "tela", "cuero", "metal", "marmol", "microfibra",
+    "sencilla", "semidoble", "doble", "queen", "king",
+    "gris", "negro", "blanco", "beige", "cafe", "azul", "verde",
+    "moderno", "clasico", "rustico", "nordico", "esquinero", "reclinable",
+)
+# Mensajes que piden otra tool (detalle, pedidos, crédito, tiendas, políticas): no se especula
+SKIP_WORDS = (
+    "detalle", "detalles", "pedido", "orden", "cuota", "cuotas", "credito", "credijamar", "simular",
+    "estudio", "tienda", "tiendas", "sucursal", "sucursales", "envio", "envios", "garantia",
+    "politica", "politicas", "devolucion",
+)
+
+CATEGORY_PATTERN = re.compile(r"\b(" + "|".join(sorted(CATEGORIES, key=len, reverse=True)) + r")\b")
+ATTRIBUTE_PATTERN = re.compile(
+    r"\b(\d+) (puestos|personas|plazas|cajones|puertas|cuerpos)\b|\b(" + "|".join(ATTRIBUTE_WORDS) + r")\b"
+)
+SKIP_PATTERN = re.compile(r"\b(" + "|".join(SKIP_WORDS) + r")\b")
+PRICE_PATTERN = re.compile(
+    r"(?:hasta|maximo|max|menos de|no mas de|tope de|presupuesto(?: es)?(?: de)?(?: hasta)?(?: unos)?)"
+    r"\s*(?:de\s*)?(?:usd\s*|b/\.\s*)?\$?\s*(\d[\d.,]*)"
+)
+
+
+def _fold(text: str) -> str:
+    """Minúsculas y sin tildes (conserva $, puntos y comas para los montos)."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def _price(text: str):
+    match = PRICE_PATTERN.search(_fold(text))
+    if not match:
+        return None
+    # Separadores de miles ("1,200" / "1.200")
+    amount = re.sub(r"[.,](?=\d{3}\b)", "", match.group(1)).replace(",", ".").rstrip(".")
+    try:
+        value = float(amount)
+    except ValueError:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def _attributes(text: str) -> list:
+    return [
+        f"{match.group(1)} {match.group(2)}" if match.group(1) else match.group(3)
+        for match in ATTRIBUTE_PATTERN.finditer(text)
+    ]
+
+
+def guess_search(prompt: str, history=()):
+    """
+    Término y precio máximo probables de la primera búsqueda del turno, o None.
+
+    Args:
+        prompt: Mensaje del cliente
+        history: Mensajes anteriores del cliente (del más antiguo al más reciente)
+
+    Returns:
+        tuple: (término, precio máximo o None)
+    """
+    text = normalize_prompt(prompt)
+    if not text or SKIP_PATTERN.search(text):
+        return None
+    category = CATEGORY_PATTERN.search(text)
+    attributes = _attributes(text)
+    price = _price(prompt)
+
+    if category is None:
+        # Solo detalles ("mi presupuesto es 800", "me gusta la madera"): completar con la categoría anterior
+        if not attributes and price is None:
+            return None
+        for previous in reversed(list(history)[-HISTORY_MESSAGES:]):
+            previous_text = normalize_prompt(previous)
+            category = CATEGORY_PATTERN.search(previous_text)
+            attributes = _attributes(previous_text) + attributes
+            if price is None:
+                price = _price(previous)
+            if category is not None:
+                break
+        if category is None:
+            return None
+
+    words = [CATEGORIES[category.group(1)]]
+    for attribute in attributes:
+        if attribute not in words:
+            words.append(attribute)
+    return " ".join(words), price
+
+
+def _user_texts(messages: list) -> list:
+    """Textos de los últimos mensajes del cliente en el historial del agente (sin resultados de tools)."""
+    texts = []
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        text = " ".join(block["text"] for block in message.get("content", []) if "text" in block)
+        if text:
+            texts.append(text)
+            if len(texts) == HISTORY_MESSAGES:
+                break
+    return list(reversed(texts))
+
+
+def _search_arguments(tool: AgentTool, term: str, price):
+    """Argumentos de la búsqueda según el esquema de la tool (None si no los reconoce)."""
+    schema = tool.tool_spec.get("inputSchema", {})
+    properties = (schema.get("json", schema) or {}).get("properties") or {}
+    if not properties:
+        arguments = {TERM_ARGUMENTS[0]: term}
+    else:
+        name = next((name for name in TERM_ARGUMENTS if name in properties), None)
+        if name is None:
+            return None
+        arguments = {name: term}
+    if price is not None and (not properties or PRICE_ARGUMENT in properties):
+        arguments[PRICE_ARGUMENT] = price
+    return arguments
+
+
+class SpeculationMetrics:
+    """Contadores del proceso: especulaciones lanzadas, aciertos, fallos y descartadas."""
+
+    OUTCOMES = ("hits", "misses", "unused", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.counts = {outcome: 0 for outcome in self.OUTCOMES}
+        self.saved_seconds = 0.0
+
+    def record_start(self):
+        with self._lock:
+            self.started += 1
+
+    def record(self, outcome: str, saved_seconds: float = 0.0):
+        with self._lock:
+            self.counts[outcome] += 1
+            self.saved_seconds += saved_seconds
+
+    def metrics(self) -> dict:
+        with self._lock:
+            hits = self.counts["hits"]
+            return {
+                "started": self.started,
+                **self.counts,
+                # misses: el modelo buscó otra cosa; unused: no buscó
+                "hit_rate": hits / self.started if self.started else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.started = 0
+            self.counts = {outcome: 0 for outcome in self.OUTCOMES}
+            self.saved_seconds = 0.0
+
+
+_metrics = SpeculationMetrics()
+
+
+def get_speculation_metrics() -> SpeculationMetrics:
+    """Obtiene las métricas de especulación del proceso."""
+    return _metrics
+
+
+class Speculation:
+    """Búsqueda adelantada de un turno (se lanza al abrir el agente, ver speculative_turn)."""
+
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+        self.arguments = None
+        self.claimed = False
+        self.mismatched = False
+        self.started_at = None
+        self.finished_at = None
+        self._task = None
+
+    def start(self, agent):
+        """Lanza la búsqueda con la tool del agente (en el event loop del turno)."""
+        tool = next(
+            (item for name, item in agent.tool_registry.registry.items() if base_tool_name(name) == SEARCH_TOOL),
+            None,
+        )
+        guess = guess_search(self.prompt, _user_texts(agent.messages))
+        if tool is None or guess is None:
+            return
+        arguments = _search_arguments(tool, *guess)
+        if arguments is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self.arguments = arguments
+        self.started_at = time.perf_counter()
+        # Sin el wrapper especulativo: la tool del Gateway directamente
+        self._task = loop.create_task(self._run(getattr(tool, "tool", tool), arguments))
+        _metrics.record_start()
+
+    async def _run(self, tool: AgentTool, arguments: dict):
+        tool_use = {"toolUseId": f"speculative_{uuid.uuid4().hex[:16]}", "name": tool.tool_name, "input": arguments}
+        result = None
+        try:
+            async for event in tool.stream(tool_use, {}):
+                if isinstance(event, ToolResultEvent):
+                    result = event.tool_result
+        except Exception as e:
+            print(f"⚠️ Búsqueda adelantada fallida: {type(e).__name__}: {e}")
+        self.finished_at = time.perf_counter()
+        return result
+
+    async def claim(self, tool_use):
+        """Resultado adelantado si la llamada del modelo coincide con la búsqueda, o None."""
+        if self._task is None or self.claimed:
+            return None
+        if normalize_arguments(tool_use.get("input")) != normalize_arguments(self.arguments):
+            self.mismatched = True
+            return None
+
+        self.claimed = True
+        claimed_at = time.perf_counter()
+        result = await self._task
+        if not result or result.get("status") != "success":
+            _metrics.record("failed")
+            return None
+        # Lo que ya llevaba la llamada cuando el modelo la pidió
+        _metrics.record("hits", min(self.finished_at, claimed_at) - self.started_at)
+        return result
+
+    def finish(self):
+        """Cierra el turno: cancela y cuenta la búsqueda si el modelo no la usó."""
+        if self._task is None or self.claimed:
+            return
+        if not self._task.done():
+            self._task.cancel()
+        _metrics.record("misses" if self.mismatched else "unused")
+
+
+@contextmanager
+def speculative_turn(open_agent, speculation: Speculation):
+    """
+    Envuelve `open_agent` (ver AgentExecutionEngine.submit): al entregar el
+    agente lanza la búsqueda adelantada y al terminar el turno la descarta si
+    no se usó, antes de devolver la sesión MCP al pool.
+    """
+    with open_agent() as agent:
+        speculation.start(agent)
+        try:
+            yield agent
+        finally:
+            speculation.finish()
+
+
+class SpeculativeTool(AgentTool):
+    """Envuelve la tool de búsqueda y entrega el resultado adelantado cuando coincide."""
+
+    def __init__(self, tool: AgentTool):
+        super().__init__()
+        self.tool = tool
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        speculation = invocation_state.get(SPECULATION_KEY)
+        result = await speculation.claim(tool_use) if speculation is not None else None
+        # Atributo del span de la tool que abre Strands
+        set_attributes(**{"tool.speculative_hit": result is not None})
+        if result is not None:
+            yield ToolResultEvent({**result, "toolUseId": tool_use["toolUseId"]})
+            return
+
+        async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+            yield event
+
+
+def wrap_speculative(tool: AgentTool) -> AgentTool:
+    """Envuelve la tool de búsqueda de productos para que pueda usar la búsqueda adelantada."""
+    if SPECULATION_ENABLED and base_tool_name(tool.tool_name) == SEARCH_TOOL:
+        return SpeculativeTool(tool)
+    return tool
@@ -0,0 +1,40 @@
+"""
+Streaming
+=========
+Eventos de un turno publicados hacia la UI (o cualquier otro consumidor).
+
+Los eventos de Strands (dicts del callback o de `Agent.stream_async`) se
+traducen a tuplas (tipo, payload) simples.
+"""
+
+# Tipos de evento publicados
+TEXT = "text"      # delta de texto del modelo
+TOOL = "tool"      # el modelo empezó a usar una tool
+PRODUCTS = "products"  # tarjetas de producto de una tool (payload: lista de productos)
+DONE = "done"      # turno terminado (payload: AgentResult)
+ERROR = "error"    # el turno falló (payload: excepción)
+
+
+class EventTranslator:
+    """Traduce eventos de Strands a (tipo, payload), anunciando cada tool una sola vez."""
+
+    def __init__(self):
+        self.announced_tools = set()
+
+    def translate(self, event: dict) -> list:
+        translated = []
+
+        # Texto del streaming (respuesta del agente)
+        if event.get("data"):
+            translated.append((TEXT, event["data"]))
+
+        # current_tool_use llega por cada delta del input de la tool
+        tool_use = event.get("current_tool_use")
+        if tool_use and tool_use.get("name"):
+            tool_use_id = tool_use.get("toolUseId") or tool_use["name"]
+            if tool_use_id not in self.announced_tools:
+                self.announced_tools.add(tool_use_id)
+                translated.append((TOOL, tool_use["name"]))
+
+        return translated
+
@@ -0,0 +1,155 @@
+"""
+Tool Cache
+==========
+Caché en proceso de resultados de tools idempotentes del Gateway.
+
+Algunas tools (categorías, políticas, sucursales, menú, preguntas y
+complementos por categoría) devuelven datos que solo cambian con un despliegue.
+Sus resultados se guardan en un LRU acotado, por tool y argumentos
+normalizados, con un TTL por tool; la lista de tools cacheables es explícita.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool
+
+from ..config import TOOL_CACHE_ENABLED, TOOL_CACHE_TTLS, TOOL_CACHE_MAX_ENTRIES
+from ..observability.tracing import set_attributes
+
+
+def base_tool_name(tool_name: str) -> str:
+    """Nombre de la tool sin el prefijo del target del Gateway (`target___tool`)."""
+    return tool_name.rsplit("___", 1)[-1]
+
+
+def normalize_arguments(arguments) -> str:
+    """Clave estable para los argumentos: sin mayúsculas, espacios extra ni valores vacíos."""
+
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items() if item not in (None, "")}
+        if isinstance(value, list):
+            return [normalize(item) for item in value]
+        return value
+
+    return json.dumps(normalize(arguments or {}), sort_keys=True, ensure_ascii=False)
+
+
+class ToolResultCache:
+    """LRU acotado de resultados de tools con TTL por tool y métricas de aciertos."""
+
+    def __init__(self, ttls: dict = None, max_entries: int = TOOL_CACHE_MAX_ENTRIES):
+        self.ttls = dict(TOOL_CACHE_TTLS if ttls is None else ttls)
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return base_tool_name(tool_name) in self.ttls
+
+    def get(self, tool_name: str, arguments):
+        """Retorna el resultado cacheado (sin toolUseId) o None."""
+        name = base_tool_name(tool_name)
+        key = (name, normalize_arguments(arguments))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits[name] = self._hits.get(name, 0) + 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._misses[name] = self._misses.get(name, 0) + 1
+            return None
+
+    def put(self, tool_name: str, arguments, result: dict):
+        name = base_tool_name(tool_name)
+        ttl = self.ttls.get(name)
+        if not ttl:
+            return
+        stored = {field: value for field, value in result.items() if field != "toolUseId"}
+        key = (name, normalize_arguments(arguments))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        """Aciertos, fallos y tasa de aciertos por tool y en total."""
+        with self._lock:
+            names = set(self._hits) | set(self._misses)
+            per_tool = {}
+            for name in sorted(names):
+                hits, misses = self._hits.get(name, 0), self._misses.get(name, 0)
+                per_tool[name] = {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)}
+            hits, misses = sum(self._hits.values()), sum(self._misses.values())
+            return {
+                "entries": len(self._entries),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "tools": per_tool,
+            }
+
+
+class CachedTool(AgentTool):
+    """Envuelve una tool del Gateway y responde desde la caché cuando puede."""
+
+    def __init__(self, tool: AgentTool, cache: ToolResultCache):
+        super().__init__()
+        self.tool = tool
+        self.cache = cache
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        arguments = tool_use.get("input")
+        cached = self.cache.get(self.tool_name, arguments)
+        # Atributo del span de la tool que abre Strands
+        set_attributes(**{"tool.cache_hit": cached is not None})
+        if cached is not None:
+            yield ToolResultEvent({**cached, "toolUseId": tool_use["toolUseId"]})
+            return
+
+        async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+            # Guardar antes de entregar: el executor deja de consumir tras el resultado
+            if isinstance(event, ToolResultEvent) and event.tool_result.get("status") == "success":
+                self.cache.put(self.tool_name, arguments, event.tool_result)
+            yield event
+
+
+_cache = ToolResultCache()
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Obtiene la caché de resultados de tools compartida por el proceso."""
+    return _cache
+
+
+def wrap_cacheable(tool: AgentTool) -> AgentTool:
+    """Envuelve la tool con la caché si está en la lista de tools cacheables."""
+    if TOOL_CACHE_ENABLED and _cache.is_cacheable(tool.tool_name):
+        return CachedTool(tool, _cache)
+    return tool
@@ -0,0 +1,154 @@
+"""
+Tool Catalog
+============
+Caché del catálogo de tools del AgentCore Gateway, compartido por el proceso.
+
+Las tools MCP quedan ligadas al MCPClient que las listó, por eso el catálogo
+guarda una entrada por cliente (sesión del pool). Las tools retienen a su
+cliente, así que la entrada se descarta explícitamente (`invalidate`) cuando
+el pool cierra o reemplaza la sesión. La huella (hash de nombres,
+descripciones y esquemas) permite detectar cuándo cambió el Gateway: si la
+huella es la misma, se conservan las tools ya construidas. Las tools
+idempotentes se entregan envueltas con la caché de resultados y la búsqueda
+de productos con la búsqueda adelantada (ver speculation.py).
+"""
+import hashlib
+import json
+import threading
+import time
+
+from ..config import TOOL_CATALOG_TTL
+from ..observability.phases import TOOL_LISTING, phase
+from ..observability.tracing import set_attributes
+from .speculation import wrap_speculative
+from .tool_cache import wrap_cacheable
+
+
+def tools_fingerprint(tools) -> str:
+    """Hash estable de los nombres y esquemas de una lista de tools."""
+    specs = sorted(
+        (
+            {
+                "name": spec.get("name"),
+                "description": spec.get("description"),
+                "inputSchema": spec.get("inputSchema"),
+            }
+            for spec in (tool.tool_spec for tool in tools)
+        ),
+        key=lambda spec: spec["name"] or "",
+    )
+    payload = json.dumps(specs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _CatalogEntry:
+    def __init__(self, tools, fingerprint: str):
+        self.tools = tools
+        self.fingerprint = fingerprint
+        self.loaded_at = time.monotonic()
+        self.refreshing = False
+
+
+class ToolCatalog:
+    """
+    Catálogo de tools del Gateway con TTL y detección de cambios.
+
+    - La primera lectura por cliente lista las tools (un round trip).
+    - Mientras la entrada está vigente no hay round trips.
+    - Al vencer el TTL se devuelve la lista vigente y se refresca en segundo plano.
+    """
+
+    def __init__(self, ttl: float = TOOL_CATALOG_TTL):
+        self.ttl = ttl
+        self.fingerprint = None
+        # Se incrementa cada vez que cambia el conjunto de tools del Gateway
+        self.version = 0
+        # MCPClient -> _CatalogEntry (ver invalidate)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_tools(self, mcp_client) -> list:
+        """
+        Retorna las tools del Gateway ligadas a `mcp_client` (sesión activa).
+        """
+        with self._lock:
+            entry = self._entries.get(mcp_client)
+            stale = entry is not None and time.monotonic() - entry.loaded_at > self.ttl
+            if stale and not entry.refreshing:
+                entry.refreshing = True
+                threading.Thread(
+                    target=self._refresh_in_background, args=(mcp_client,), daemon=True
+                ).start()
+
+        if entry is None:
+            return self.refresh(mcp_client)
+        return entry.tools
+
+    def refresh(self, mcp_client) -> list:
+        """Lista las tools del Gateway y actualiza la entrada si cambiaron."""
+        return self._refresh(mcp_client)
+
+    def _refresh(self, mcp_client, keep_missing: bool = True) -> list:
+        with phase(TOOL_LISTING):
+            tools = _list_all_tools(mcp_client)
+            set_attributes(**{"mcp.tools": len(tools)})
+        fingerprint = tools_fingerprint(tools)
+
+        with self._lock:
+            entry = self._entries.get(mcp_client)
+            if entry is not None and entry.fingerprint == fingerprint:
+                # Sin cambios: conservar las tools ya construidas
+                entry.loaded_at = time.monotonic()
+                entry.refreshing = False
+                return entry.tools
+            if entry is None and not keep_missing:
+                # La sesión se cerró mientras se listaba: no volver a retener su cliente
+                return tools
+
+            if fingerprint != self.fingerprint:
+                if self.fingerprint is not None:
+                    print(f"🔄 El catálogo de tools del Gateway cambió ({len(tools)} tools)")
+                self.fingerprint = fingerprint
+                self.version += 1
+
+            tools = [wrap_speculative(wrap_cacheable(tool)) for tool in tools]
+            self._entries[mcp_client] = _CatalogEntry(tools, fingerprint)
+            return tools
+
+    def invalidate(self, mcp_client=None):
+        """Descarta la entrada de un cliente (o todas) para forzar un nuevo listado."""
+        with self._lock:
+            if mcp_client is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(mcp_client, None)
+
+    def _refresh_in_background(self, mcp_client):
+        try:
+            self._refresh(mcp_client, keep_missing=False)
+        except Exception as e:
+            print(f"⚠️ No se pudo refrescar el catálogo de tools: {e}")
+            with self._lock:
+                entry = self._entries.get(mcp_client)
+                if entry is not None:
+                    entry.refreshing = False
+
+
+def _list_all_tools(mcp_client) -> list:
+    """Lista todas las páginas de tools del Gateway."""
+    tools = []
+    pagination_token = None
+    while True:
+        page = mcp_client.list_tools_sync(pagination_token=pagination_token)
+        tools.extend(page)
+        pagination_token = getattr(page, "pagination_token", None)
+        if not pagination_token:
+            return tools
+
+
+_catalog = ToolCatalog()
+
+
+def get_tool_catalog() -> ToolCatalog:
+    """Obtiene el catálogo de tools compartido por el proceso."""
+    return _catalog
@@ -0,0 +1,146 @@
+"""
+Tool Executor
+=============
+Ejecución concurrente de las tools que el modelo pide en un mismo paso.
+
+- Las llamadas al Gateway de un paso corren en paralelo, con un máximo de
+  llamadas simultáneas por turno y un timeout por tool.
+- Los resultados se entregan al modelo en el orden en que los pidió (no en
+  el orden en que terminaron), para que el historial sea determinista.
+- Cada llamada queda en una traza del turno (`invocation_state["tool_trace"]`)
+  con sus tiempos relativos, para ver qué llamadas se solaparon.
+"""
+import asyncio
+import time
+
+from strands.tools.executors import ConcurrentToolExecutor
+from strands.tools.executors._executor import ToolExecutor
+from strands.types._events import ToolResultEvent
+
+from ..config import TOOL_MAX_CONCURRENCY, TOOL_TIMEOUT
+from ..observability.phases import TOOLS, record_phase
+
+
+def overlapping_calls(trace: list) -> list:
+    """Pares de llamadas (por nombre) de un mismo paso que se ejecutaron a la vez."""
+    pairs = []
+    for i, first in enumerate(trace):
+        for second in trace[i + 1:]:
+            if first["step"] == second["step"] and first["start"] < second["end"] and second["start"] < first["end"]:
+                pairs.append((first["tool"], second["tool"]))
+    return pairs
+
+
+class BoundedConcurrentToolExecutor(ConcurrentToolExecutor):
+    """ConcurrentToolExecutor con fan-out acotado, timeout por tool, orden estable y traza."""
+
+    def __init__(self, max_concurrency: int = TOOL_MAX_CONCURRENCY, tool_timeout: float = TOOL_TIMEOUT):
+        super().__init__()
+        self.max_concurrency = max(1, max_concurrency)
+        self.tool_timeout = tool_timeout
+
+    async def _execute(
+        self,
+        agent,
+        tool_uses,
+        tool_results,
+        cycle_trace,
+        cycle_span,
+        invocation_state,
+        structured_output_context=None,
+    ):
+        # Estado del turno: límite de concurrencia compartido por todos sus pasos y la traza
+        if "tool_semaphore" not in invocation_state:
+            invocation_state["tool_semaphore"] = asyncio.Semaphore(self.max_concurrency)
+            invocation_state["tool_trace_origin"] = time.perf_counter()
+        trace = invocation_state.setdefault("tool_trace", [])
+        invocation_state["tool_step"] = invocation_state.get("tool_step", 0) + 1
+        step_start = len(trace)
+        started = time.perf_counter()
+
+        async for event in super()._execute(
+            agent, tool_uses, tool_results, cycle_trace, cycle_span, invocation_state, structured_output_context
+        ):
+            yield event
+
+        # Entregar los resultados en el orden de los tool_use del modelo
+        order = {tool_use["toolUseId"]: position for position, tool_use in enumerate(tool_uses)}
+        tool_results.sort(key=lambda result: order.get(result["toolUseId"], len(order)))
+        record_phase(TOOLS, time.perf_counter() - started, calls=len(tool_uses))
+
+        step_trace = trace[step_start:]
+        if len(step_trace) > 1:
+            calls = " ‖ ".join(
+                f"{call['tool']} ({call['start'] * 1000:.0f}-{call['end'] * 1000:.0f}ms, {call['status']})"
+                for call in step_trace
+            )
+            print(f"🔧 Paso {invocation_state['tool_step']}: {calls}")
+
+    async def _task(
+        self,
+        agent,
+        tool_use,
+        tool_results,
+        cycle_trace,
+        cycle_span,
+        invocation_state,
+        task_id,
+        task_queue,
+        task_event,
+        stop_event,
+        structured_output_context,
+    ):
+        origin = invocation_state["tool_trace_origin"]
+        record = {
+            "step": invocation_state["tool_step"],
+            "tool": tool_use["name"],
+            "toolUseId": tool_use["toolUseId"],
+            "queued": time.perf_counter() - origin,
+            "start": None,
+            "end": None,
+            "status": "success",
+        }
+        invocation_state["tool_trace"].append(record)
+
+        try:
+            async with invocation_state["tool_semaphore"]:
+                record["start"] = time.perf_counter() - origin
+                events = ToolExecutor._stream_with_trace(
+                    agent, tool_use, tool_results, cycle_trace, cycle_span, invocation_state, structured_output_context
+                )
+                # El timeout cubre solo a la tool: el tiempo esperando a que el consumidor tome
+                # cada evento (task_event) corre el plazo. timeout_at (y no wait_for) mantiene el
+                # generador en esta misma task, donde vive el contexto del span de la tool.
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + self.tool_timeout
+                try:
+                    while True:
+                        try:
+                            async with asyncio.timeout_at(deadline):
+                                event = await anext(events)
+                        except StopAsyncIteration:
+                            break
+                        if isinstance(event, ToolResultEvent):
+                            record["status"] = event.tool_result.get("status", "success")
+                        handed_off = loop.time()
+                        task_queue.put_nowait((task_id, event))
+                        await task_event.wait()
+                        task_event.clear()
+                        deadline += loop.time() - handed_off
+                except TimeoutError:
+                    await events.aclose()
+                    record["status"] = "timeout"
+                    print(f"⚠️ La tool {tool_use['name']} superó el timeout de {self.tool_timeout:g}s")
+                    if not any(result["toolUseId"] == tool_use["toolUseId"] for result in tool_results):
+                        result = {
+                            "toolUseId": tool_use["toolUseId"],
+                            "status": "error",
+                            "content": [{"text": f"La herramienta {tool_use['name']} no respondió a tiempo."}],
+                        }
+                        tool_results.append(result)
+                        task_queue.put_nowait((task_id, ToolResultEvent(result)))
+                        await task_event.wait()
+                        task_event.clear()
+        finally:
+            record["end"] = time.perf_counter() - origin
+            task_queue.put_nowait((task_id, stop_event))
@@ -0,0 +1,198 @@
+"""
+Chat Turns
+==========
+Turnos del chat independientes del canal (Streamlit, API HTTP).
+
+Ambos canales envían los turnos al mismo motor, con la misma caché de
+respuestas, pool MCP, memoria y modelo del proceso; solo cambia cómo se
+obtienen `actor_id` / `session_id` y cómo se muestra la respuesta.
+"""
+from ..config import INTENT_ROUTER_ENABLED, RESPONSE_CACHE_ENABLED, SPECULATION_ENABLED
+
+EMPTY_ANSWER = "Lo siento, no pude generar una respuesta. Por favor intenta de nuevo."
+
+
+def submit_chat_turn(prompt: str, memory: dict, region: str, actor_id: str, session_id: str, first_turn: bool):
+    """
+    Envía un turno al motor de ejecución y retorna su handle. Los turnos de una
+    misma conversación se ejecutan en orden.
+
+    Si la caché de respuestas está activa y es el primer mensaje de la
+    conversación, una pregunta frecuente casi idéntica a una ya respondida se
+    contesta desde la caché (el intercambio igual queda en la conversación).
+    Los saludos, el menú, las políticas y las sucursales se contestan sin el
+    modelo (ver src/core/intents.py): la tool se llama en el worker del motor,
+    nunca en el hilo de quien envía el turno.
+
+    Args:
+        prompt: Mensaje del cliente
+        memory: Memoria del proceso (`get_memory`); el ID se lee al abrir el agente
+        region: Región de AWS
+        actor_id: ID del cliente
+        session_id: ID de la conversación
+        first_turn: Si es el primer mensaje de la conversación
+
+    Returns:
+        TurnHandle: Handle para consumir los eventos del turno
+    """
+    from .agent import agent_turn, record_exchange
+    from .engine import get_engine
+
+    open_agent = lambda: agent_turn(memory["id"], region, actor_id, session_id)
+    record = lambda messages: record_exchange(memory["id"], region, actor_id, session_id, messages)
+
+    if RESPONSE_CACHE_ENABLED and first_turn:
+        from .response_cache import get_response_cache
+
+        cached = get_response_cache().lookup(prompt)
+        if cached is not None:
+            answer, score = cached
+            print(f"⚡ Respuesta desde caché para {actor_id} (similitud {score:.2f})")
+            return get_engine().submit_cached((actor_id, session_id), prompt, answer, record)
+
+    route = None
+    if INTENT_ROUTER_ENABLED:
+        from .intents import classify_intent, route_answer
+
+        intent = classify_intent(prompt, first_turn=first_turn)
+        if intent is not None:
+            # Se resuelve en el worker, en orden con los turnos anteriores; si falla, el mismo turno sigue al agente
+            def route():
+                answer = route_answer(intent, region)
+                if answer is None:
+                    return None
+                print(f"⚡ Respuesta directa ({intent.name}) para {actor_id}")
+                return answer, [intent.tool] if intent.tool else []
+
+    if SPECULATION_ENABLED and route is None:
+        # Búsqueda de productos probable, en paralelo con la primera llamada al modelo
+        # (los mensajes de las rutas directas nunca son búsquedas)
+        from .speculation import SPECULATION_KEY, Speculation, speculative_turn
+
+        speculation = Speculation(prompt)
+        handle = get_engine().submit(
+            (actor_id, session_id), prompt, lambda: speculative_turn(open_agent, speculation),
+            {SPECULATION_KEY: speculation},
+        )
+    else:
+        handle = get_engine().submit((actor_id, session_id), prompt, open_agent, route=route, record=record)
+    # Candidata a guardarse en la caché de respuestas al terminar (ver store_answer)
+    handle.faq_candidate = RESPONSE_CACHE_ENABLED and first_turn
+    return handle
+
+
+def store_answer(handle, answer: str):
+    """Guarda la respuesta final en la caché de respuestas si el turno es candidato."""
+    # Las respuestas con tarjetas de producto dependen de ellas: no se cachean solas.
+    # Las que recibieron memoria del cliente pueden llevar su nombre o sus compras:
+    # servirlas a otro cliente filtraría sus datos
+    # Las respuestas directas ya salieron de una caché o de una plantilla
+    if (answer and getattr(handle, "faq_candidate", False) and not handle.direct
+            and not handle.products and not handle.personalized):
+        from .response_cache import get_response_cache
+
+        get_response_cache().store(handle.prompt, answer, handle.tools_used)
+
+
+def get_response_text(response) -> str:
+    """Extrae texto de la respuesta del agente."""
+    try:
+        # Si es string directo
+        if isinstance(response, str):
+            return response
+        
+        texts = []
+        
+        # 1. Intentar obtener del message.content
+        if hasattr(response, 'message'):
+            msg = response.message
+            
+            # Si message es un diccionario
+            if isinstance(msg, dict):
+                content = msg.get('content', [])
+                if isinstance(content, list):
+                    for item in content:
+                        if isinstance(item, dict) and 'text' in item:
+                            texts.append(item['text'])
+                        elif isinstance(item, str):
+                            texts.append(item)
+                elif isinstance(content, str):
+                    texts.append(content)
+            
+            # Si message tiene atributo content (objeto)
+            elif hasattr(msg, 'content'):
+                content = msg.content
+                if isinstance(content, list):
+                    for item in content:
+                        if isinstance(item, dict) and 'text' in item:
+                            texts.append(item['text'])
+                        elif isinstance(item, str):
+                            texts.append(item)
+                elif isinstance(content, str):
+                    texts.append(content)
+            
+            # Si message es string
+            elif isinstance(msg, str):
+                texts.append(msg)
+        
+        # 2. Buscar en tool_results (incluso si ya hay textos, pueden ser complementarios)
+        if hasattr(response, 'tool_results'):
+            tool_results = response.tool_results
+            if tool_results:
+                for tool_result in tool_results:
+                    # Si tool_result es un diccionario
+                    if isinstance(tool_result, dict):
+                        if 'result' in tool_result:
+                            result = tool_result['result']
+                            if isinstance(result, str) and result.strip():
+                                texts.append(result)
+                            elif isinstance(result, dict):
+                                if 'content' in result:
+                                    texts.append(str(result['content']))
+                                elif 'text' in result:
+                                    texts.append(str(result['text']))
+                                else:
+                                    texts.append(str(result))
+                        # Buscar directamente en el diccionario
+                        elif 'content' in tool_result:
+                            texts.append(str(tool_result['content']))
+                        elif 'text' in tool_result:
+                            texts.append(str(tool_result['text']))
+                    # Si tool_result es un objeto
+                    elif hasattr(tool_result, 'result'):
+                        result = tool_result.result
+                        if isinstance(result, str) and result.strip():
+                            texts.append(result)
+                        elif isinstance(result, dict):
+                            if 'content' in result:
+                                texts.append(str(result['content']))
+                            elif 'text' in result:
+                                texts.append(str(result['text']))
+                            else:
+                                texts.append(str(result))
+                    # Si tool_result es string directo
+                    elif isinstance(tool_result, str) and tool_result.strip():
+                        texts.append(tool_result)
+        
+        # 3. Si aún no hay texto, buscar en structured_output
+        if not texts and hasattr(response, 'structured_output'):
+            so = response.structured_output
+            if so:
+                if isinstance(so, str):
+                    texts.append(so)
+                elif isinstance(so, dict):
+                    texts.append(str(so))
+        
+        # 4. Si hay textos, unirlos
+        if texts:
+            return '\n'.join(texts)
+        
+        # 5. Último recurso - convertir todo a string y buscar texto útil
+        response_str = str(response)
+        if len(response_str) > 50:  # Si tiene contenido significativo
+            return response_str
+        
+        return "Lo siento, no pude procesar la respuesta. Por favor intenta de nuevo."
+        
+    except Exception as e:
+        return f"Error extrayendo respuesta: {e}"
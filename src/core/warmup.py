@@ -0,0 +1,242 @@
+"""
+Warm-up
+=======
+Preparación de los recursos compartidos del proceso antes del primer turno.
+
+Tras un deploy o un scale-out, el primer usuario de cada instancia pagaba todo
+a la vez: imports pesados, la memoria AgentCore (control plane), SSM, Cognito,
+la conexión MCP y el listado de tools. El warm-up lo hace al iniciar el
+proceso, en paralelo donde no hay dependencias:
+
+    imports  ‖  memoria  ‖  config (SSM) → auth (Cognito) → conexión MCP → listado de tools
+
+El estado (listo / pasos con su duración y error) se consulta con
+`get_warmup().status()`, se registra en el log y, si se configura
+WARMUP_STATUS_FILE, se escribe en un archivo para un probe de readiness:
+
+    python -m src.core.warmup --check    # exit 0 si el warm-up terminó bien
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config import WARMUP_MCP_SESSIONS, WARMUP_STATUS_FILE
+
+PENDING = "pending"
+RUNNING = "running"
+OK = "ok"
+FAILED = "error"
+SKIPPED = "skipped"
+
+STEPS = ("imports", "memory", "config", "auth", "mcp_connect", "tool_listing")
+
+
+class Warmup:
+    """Warm-up del proceso para una región (se ejecuta una sola vez)."""
+
+    def __init__(self, region: str, mcp_sessions: int = WARMUP_MCP_SESSIONS, status_file: str = WARMUP_STATUS_FILE):
+        self.region = region
+        self.mcp_sessions = mcp_sessions
+        self.status_file = status_file
+        self.steps = {name: {"status": PENDING, "seconds": None, "error": None} for name in STEPS}
+        self.started_at = None
+        self.total_seconds = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Inicia el warm-up en segundo plano (idempotente)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, daemon=True, name="warmup")
+            self._thread.start()
+
+    def run(self):
+        self.started_at = time.time()
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(3, thread_name_prefix="warmup") as executor:
+                futures = [
+                    executor.submit(self._step, "imports", self._imports),
+                    executor.submit(self._step, "memory", self._memory),
+                    executor.submit(self._gateway),
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            self.total_seconds = time.perf_counter() - started
+            self._done.set()
+            self._report()
+
+    def _step(self, name: str, function) -> bool:
+        with self._lock:
+            self.steps[name]["status"] = RUNNING
+        started = time.perf_counter()
+        try:
+            function()
+            status, error = OK, None
+        except Exception as e:
+            status, error = FAILED, f"{type(e).__name__}: {e}"
+        with self._lock:
+            self.steps[name].update(status=status, seconds=round(time.perf_counter() - started, 3), error=error)
+        return status == OK
+
+    def _gateway(self):
+        # Cada paso depende del anterior; si uno falla, el resto queda para el primer turno
+        chain = [
+            ("config", self._config),
+            ("auth", self._auth),
+            ("mcp_connect", self._mcp_connect),
+            ("tool_listing", self._tool_listing),
+        ]
+        for index, (name, function) in enumerate(chain):
+            if not self._step(name, function):
+                with self._lock:
+                    for skipped, _ in chain[index + 1:]:
+                        self.steps[skipped]["status"] = SKIPPED
+                return
+
+    # ------------------------------------------------------------------
+    # Pasos
+    # ------------------------------------------------------------------
+
+    def _imports(self):
+        import strands  # noqa: F401
+        import bedrock_agentcore.memory.integrations.strands.session_manager  # noqa: F401
+        from . import agent  # noqa: F401
+        from .engine import get_engine
+
+        get_engine()
+
+    def _memory(self):
+        from ..memory.manager import get_memory
+
+        get_memory(self.region)
+
+    def _config(self):
+        from gateway.ssm_config import get_config_loader
+
+        values = get_config_loader(self.region).get_all()
+        if not values:
+            raise ValueError("Sin parámetros de /jamar/agentcore/ en SSM")
+
+    def _auth(self):
+        from gateway.ssm_config import get_config_loader
+        from gateway.token_manager import get_token_manager
+
+        client_id = get_config_loader(self.region).get("cognito_client_id")
+        if not client_id:
+            raise ValueError("Cognito no configurado en SSM")
+        get_token_manager(client_id, self.region).get_token()
+
+    def _mcp_connect(self):
+        from .mcp_pool import get_mcp_pool
+
+        get_mcp_pool(self.region).prewarm(self.mcp_sessions)
+
+    def _tool_listing(self):
+        from .mcp_pool import get_mcp_pool
+        from .tool_catalog import get_tool_catalog
+
+        with get_mcp_pool(self.region).session() as mcp_client:
+            tools = get_tool_catalog().get_tools(mcp_client)
+        if not tools:
+            raise ValueError("El Gateway no retornó tools")
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def ready(self) -> bool:
+        """Terminó y todos los pasos salieron bien."""
+        with self._lock:
+            return self.done and all(step["status"] == OK for step in self.steps.values())
+
+    def wait(self, timeout: float = None) -> bool:
+        """Espera a que termine el warm-up. Retorna `ready`."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self) -> dict:
+        with self._lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+        return {
+            "ready": self.ready,
+            "done": self.done,
+            "region": self.region,
+            "started_at": self.started_at,
+            "total_seconds": round(self.total_seconds, 3) if self.total_seconds is not None else None,
+            "steps": steps,
+        }
+
+    def _report(self):
+        status = self.status()
+        details = ", ".join(
+            f"{name} {step['seconds']:.2f}s" if step["status"] == OK else f"{name} {step['status']}"
+            for name, step in status["steps"].items()
+        )
+        if status["ready"]:
+            print(f"🔥 Warm-up listo en {status['total_seconds']:.2f}s ({details})")
+        else:
+            failed = [f"{name}: {step['error']}" for name, step in status["steps"].items() if step["error"]]
+            print(f"⚠️ Warm-up incompleto en {status['total_seconds']:.2f}s ({details}) - {'; '.join(failed)}")
+
+        if self.status_file:
+            try:
+                with open(self.status_file, "w", encoding="utf-8") as f:
+                    json.dump(status, f, indent=2)
+            except OSError as e:
+                print(f"⚠️ No se pudo escribir el estado del warm-up en {self.status_file}: {e}")
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def start_warmup(region: str) -> Warmup:
+    """Inicia (una sola vez por proceso) el warm-up en segundo plano."""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup(region)
+            _warmup.start()
+        return _warmup
+
+
+def get_warmup():
+    """Warm-up del proceso, o None si no se inició."""
+    return _warmup
+
+
+def check_status_file(path: str = WARMUP_STATUS_FILE) -> bool:
+    """True si el archivo de estado indica que el warm-up terminó bien."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return bool(json.load(f).get("ready"))
+    except (OSError, ValueError):
+        return False
+
+
+if __name__ == "__main__":
+    # Probe de readiness: python -m src.core.warmup --check
+    if "--check" in sys.argv:
+        sys.exit(0 if WARMUP_STATUS_FILE and check_status_file() else 1)
+    # Sin --check: ejecutar el warm-up en primer plano y mostrar su estado
+    warmup = Warmup(os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
+    warmup.run()
+    print(json.dumps(warmup.status(), indent=2))
+    sys.exit(0 if warmup.ready else 1)
@@ -3,6 +3,7 @@ Memory Management
 =================
 Gestión de memoria para el agente.
 """
-from .manager import create_memory
+from .manager import create_memory, get_memory
+from .retrieval import CachedMemorySessionManager, get_retrieval_cache
 
-__all__ = ["create_memory"]
+__all__ = ["create_memory", "get_memory", "CachedMemorySessionManager", "get_retrieval_cache"]
@@ -2,12 +2,30 @@
 Memory Manager
 ==============
 Gestión de memoria AgentCore para el agente.
+
+`get_or_create_memory` lista (y puede esperar) memorias en el control plane,
+así que al iniciar el proceso el ID se resuelve primero sin llamarlo:
+
+    MEMORY_ID  →  parámetro de SSM  →  archivo local (MEMORY_ID_CACHE_FILE)
+
+El ID resuelto se verifica en segundo plano con GetMemory; solo si falta o no
+es válido se usa `create_memory` (get_or_create).
 """
 import contextlib
+import json
+import threading
 from io import StringIO
+
+import boto3
+from botocore.exceptions import ClientError
 from bedrock_agentcore_starter_toolkit.operations.memory.manager import MemoryManager as BaseMemoryManager
 from bedrock_agentcore.memory.constants import StrategyType
 
+from ..config import MEMORY_ID, MEMORY_ID_CACHE_FILE, MEMORY_ID_SSM_PARAMETER
+
+# Estados con los que el ID guardado ya no sirve
+INVALID_MEMORY_STATUSES = ("FAILED", "DELETING")
+
 
 def create_memory(region_name: str, memory_name: str = "ShopifySalesAgentMemory"):
     """
@@ -44,3 +62,133 @@ def create_memory(region_name: str, memory_name: str = "ShopifySalesAgentMemory"
         )
     
     return memory
+
+
+def get_control_client(region_name: str):
+    """Cliente del control plane de AgentCore (GetMemory para verificar el ID)."""
+    return boto3.client("bedrock-agentcore-control", region_name=region_name)
+
+
+def _cache_key(region_name: str, memory_name: str) -> str:
+    return f"{region_name}/{memory_name}"
+
+
+def _read_cached_memory_id(region_name: str, memory_name: str):
+    if not MEMORY_ID_CACHE_FILE:
+        return None
+    try:
+        with open(MEMORY_ID_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f).get(_cache_key(region_name, memory_name))
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_cached_memory_id(region_name: str, memory_name: str, memory_id):
+    if not MEMORY_ID_CACHE_FILE:
+        return
+    try:
+        try:
+            with open(MEMORY_ID_CACHE_FILE, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+        cached[_cache_key(region_name, memory_name)] = memory_id
+        with open(MEMORY_ID_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cached, f, indent=2)
+    except (OSError, AttributeError) as e:
+        print(f"⚠️ No se pudo guardar el ID de memoria en {MEMORY_ID_CACHE_FILE}: {e}")
+
+
+def resolve_memory_id(region_name: str, memory_name: str = "ShopifySalesAgentMemory"):
+    """
+    Resuelve el ID de la memoria sin llamar al control plane.
+
+    Returns:
+        tuple: (memory_id, origen) con origen "env", "ssm" o "cache"; (None, None) si no hay ID
+    """
+    if MEMORY_ID:
+        return MEMORY_ID, "env"
+
+    if MEMORY_ID_SSM_PARAMETER:
+        try:
+            from gateway.ssm_config import get_config_loader
+
+            memory_id = get_config_loader(region_name).get(MEMORY_ID_SSM_PARAMETER)
+            if memory_id:
+                return memory_id, "ssm"
+        except Exception as e:
+            print(f"⚠️ No se pudo leer el ID de memoria de SSM: {e}")
+
+    memory_id = _read_cached_memory_id(region_name, memory_name)
+    if memory_id:
+        return memory_id, "cache"
+    return None, None
+
+
+def verify_memory_id(region_name: str, memory_id: str) -> bool:
+    """
+    Verifica el ID con GetMemory. Retorna False solo si la memoria no existe o
+    no es utilizable; los errores transitorios (red, throttling) no la invalidan.
+    """
+    try:
+        response = get_control_client(region_name).get_memory(memoryId=memory_id)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code", "")
+        if code in ("ResourceNotFoundException", "ValidationException"):
+            return False
+        print(f"⚠️ No se pudo verificar la memoria {memory_id}: {e}")
+        return True
+    except Exception as e:
+        print(f"⚠️ No se pudo verificar la memoria {memory_id}: {e}")
+        return True
+    return response.get("memory", {}).get("status") not in INVALID_MEMORY_STATUSES
+
+
+def _verify_in_background(region_name: str, memory_name: str, memory: dict, source: str):
+    memory_id = memory["id"]
+    if verify_memory_id(region_name, memory_id):
+        return
+
+    print(f"⚠️ La memoria {memory_id} ({source}) no es válida, usando get_or_create")
+    try:
+        created = create_memory(region_name, memory_name)
+    except Exception as e:
+        print(f"❌ Error creando la memoria {memory_name}: {e}")
+        return
+    _write_cached_memory_id(region_name, memory_name, created["id"])
+    # Se actualiza el mismo dict que ya tienen la app y el warm-up
+    memory["id"] = created["id"]
+
+
+_memories = {}
+_memories_lock = threading.Lock()
+
+
+def get_memory(region_name: str, memory_name: str = "ShopifySalesAgentMemory"):
+    """
+    Memoria del proceso: se resuelve una sola vez por región
+    (la comparten la app y el warm-up).
+
+    Con un ID conocido (`resolve_memory_id`) no se espera al control plane:
+    se retorna de inmediato y se verifica en segundo plano.
+    """
+    with _memories_lock:
+        memory = _memories.get((region_name, memory_name))
+        if memory is not None:
+            return memory
+
+        memory_id, source = resolve_memory_id(region_name, memory_name)
+        if memory_id:
+            memory = {"id": memory_id}
+            threading.Thread(
+                target=_verify_in_background,
+                args=(region_name, memory_name, memory, source),
+                daemon=True,
+                name="memory-verify",
+            ).start()
+            print(f"🧠 Memoria {memory_id} (ID desde {source})")
+        else:
+            memory = create_memory(region_name, memory_name)
+            _write_cached_memory_id(region_name, memory_name, memory["id"])
+        _memories[(region_name, memory_name)] = memory
+        return memory
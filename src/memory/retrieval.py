@@ -0,0 +1,253 @@
+"""
+Memory Retrieval
+================
+Recuperación de memoria de largo plazo (LTM) por cliente, con caché y top_k adaptativo.
+
+- Los namespaces (interactions, preferences) se consultan en paralelo en un
+  pool de hilos compartido por el proceso (no uno nuevo por mensaje).
+- Los resultados se cachean por (cliente, namespace, consulta normalizada):
+  un mensaje repetido (o que solo cambia en tildes, mayúsculas o signos) no
+  vuelve a consultar la memoria. Cualquier evento escrito para el cliente, de
+  cualquier conversación, invalida sus entradas; el TTL es corto.
+- Si el contexto recuperado es el mismo que ya está en el historial del
+  agente, no se vuelve a agregar.
+- Si los puntajes recientes de un namespace quedan bajo su `relevance_score`,
+  se pide un `top_k` menor (y vuelve a crecer cuando todos son relevantes).
+  Los registros bajo el umbral se descartan.
+- Se reporta la latencia de cada recuperación.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from bedrock_agentcore.memory.integrations.strands.session_manager import AgentCoreMemorySessionManager
+
+from ..config import MEMORY_RETRIEVAL_CACHE_TTL, MEMORY_ADAPTIVE_TOP_K, MEMORY_MIN_TOP_K
+from ..observability.phases import MEMORY_RETRIEVAL, phase
+from ..observability.tracing import set_attributes
+
+# Entradas de caché por cliente y clientes/namespaces con top_k adaptativo guardados
+MAX_ENTRIES_PER_ACTOR = 32
+MAX_TRACKED_NAMESPACES = 2000
+
+# Marca del mensaje con el contexto de LTM que se agrega al historial del agente
+CONTEXT_TAG = "<user_context>"
+
+
+class RetrievalCache:
+    """Resultados de LTM por (cliente, namespace, consulta) con TTL e invalidación por escritura."""
+
+    def __init__(self, ttl: float = MEMORY_RETRIEVAL_CACHE_TTL):
+        self.ttl = ttl
+        # actor_id -> OrderedDict[(namespace, consulta normalizada)] = (creado, registros)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, actor_id: str, namespace: str, query: str):
+        key = (namespace, query)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries.get(actor_id)
+            entry = entries.get(key) if entries else None
+            if entry is not None and now - entry[0] <= self.ttl:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, actor_id: str, namespace: str, query: str, items: list):
+        key = (namespace, query)
+        with self._lock:
+            entries = self._entries.setdefault(actor_id, OrderedDict())
+            entries[key] = (time.monotonic(), items)
+            entries.move_to_end(key)
+            while len(entries) > MAX_ENTRIES_PER_ACTOR:
+                entries.popitem(last=False)
+
+    def record_write(self, actor_id: str):
+        """Registra que se escribieron eventos del cliente en la memoria (invalida sus entradas)."""
+        self.invalidate(actor_id)
+
+    def invalidate(self, actor_id: str = None):
+        with self._lock:
+            if actor_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(actor_id, None)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "actors": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def reset_metrics(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class AdaptiveTopK:
+    """top_k por (cliente, namespace) ajustado según los puntajes de las últimas recuperaciones."""
+
+    def __init__(self, min_top_k: int = MEMORY_MIN_TOP_K):
+        self.min_top_k = max(1, min_top_k)
+        self._current = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, actor_id: str, namespace: str, configured: int) -> int:
+        with self._lock:
+            return min(configured, self._current.get((actor_id, namespace), configured))
+
+    def observe(self, actor_id: str, namespace: str, requested: int, configured: int, scores: list, threshold: float):
+        """Ajusta el próximo top_k con los puntajes obtenidos."""
+        relevant = sum(1 for score in scores if score >= threshold)
+        if relevant >= requested:
+            # Todos relevantes: puede haber más, volver a crecer
+            next_top_k = min(configured, requested * 2)
+        else:
+            next_top_k = min(configured, max(self.min_top_k, relevant + 2))
+        with self._lock:
+            key = (actor_id, namespace)
+            self._current[key] = next_top_k
+            self._current.move_to_end(key)
+            while len(self._current) > MAX_TRACKED_NAMESPACES:
+                self._current.popitem(last=False)
+
+
+_cache = RetrievalCache()
+_top_k = AdaptiveTopK()
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="memory-retrieval")
+
+
+def _latest_context(messages: list):
+    """Texto del último mensaje de contexto de LTM en el historial, o None."""
+    for message in reversed(messages):
+        for item in message.get("content", []):
+            if isinstance(item, dict) and CONTEXT_TAG in item.get("text", ""):
+                return item["text"]
+    return None
+
+
+def has_customer_context(messages: list, prompt: str) -> bool:
+    """
+    True si el agente tenía contexto de LTM del cliente al responder `prompt`
+    (la respuesta puede estar personalizada: nombre, compras, preferencias).
+    El contexto agregado en un turno anterior sigue en el historial y cuenta.
+    """
+    return _latest_context(messages) is not None
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Obtiene la caché de recuperación de memoria compartida por el proceso."""
+    return _cache
+
+
+class CachedMemorySessionManager(AgentCoreMemorySessionManager):
+    """AgentCoreMemorySessionManager con recuperación de LTM cacheada, paralela y adaptativa."""
+
+    def create_message(self, session_id, agent_id, session_message, **kwargs):
+        event = super().create_message(session_id, agent_id, session_message, **kwargs)
+        _cache.record_write(self.config.actor_id)
+        return event
+
+    def retrieve_customer_context(self, event) -> None:
+        messages = event.agent.messages
+        if not messages or messages[-1].get("role") != "user" or "toolResult" in messages[-1].get("content")[0]:
+            return None
+        if not self.config.retrieval_config:
+            return None
+
+        user_query = messages[-1]["content"][0]["text"]
+        started = time.perf_counter()
+
+        with phase(MEMORY_RETRIEVAL):
+            futures = [
+                (namespace, _executor.submit(self._retrieve_namespace, namespace, retrieval_config, user_query))
+                for namespace, retrieval_config in self.config.retrieval_config.items()
+            ]
+
+            # Orden fijo de los namespaces (contexto estable entre turnos)
+            all_context = []
+            details = []
+            for namespace, future in futures:
+                label = namespace.rstrip("/").rsplit("/", 1)[-1]
+                try:
+                    items, source = future.result()
+                    all_context.extend(items)
+                    details.append(f"{label}: {len(items)} ({source})")
+                    set_attributes(**{f"memory.{label}.records": len(items), f"memory.{label}.source": source})
+                except Exception as e:
+                    print(f"⚠️ Error recuperando memoria de {label}: {e}")
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"🧠 Memoria de {self.config.actor_id}: {len(all_context)} registros en {elapsed_ms:.0f}ms ({', '.join(details)})")
+
+        if all_context:
+            context_text = "\n".join(all_context)
+            context = f"{CONTEXT_TAG}{context_text}</user_context>"
+            # El mismo contexto del turno anterior sigue en el historial: no repetirlo
+            if context == _latest_context(messages[:-1]):
+                return None
+            event.agent.messages.append({
+                "role": "assistant",
+                "content": [{"text": context}],
+            })
+
+    def _retrieve_namespace(self, namespace: str, retrieval_config, query: str):
+        """
+        Returns:
+            tuple: (textos relevantes, origen) - origen es "caché" o "top_k=N"
+        """
+        actor_id = self.config.actor_id
+        resolved_namespace = namespace.format(
+            actorId=actor_id,
+            sessionId=self.config.session_id,
+            memoryStrategyId=retrieval_config.strategy_id or "",
+        )
+
+        from ..core.response_cache import normalize_prompt
+
+        cache_query = normalize_prompt(query)
+        cached = _cache.get(actor_id, resolved_namespace, cache_query)
+        if cached is not None:
+            return cached, "caché"
+
+        configured = retrieval_config.top_k
+        top_k = _top_k.get(actor_id, resolved_namespace, configured) if MEMORY_ADAPTIVE_TOP_K else configured
+        memories = self.memory_client.retrieve_memories(
+            memory_id=self.config.memory_id,
+            namespace=resolved_namespace,
+            query=query,
+            top_k=top_k,
+        )
+
+        threshold = retrieval_config.relevance_score
+        scores = []
+        items = []
+        for memory in memories:
+            if not isinstance(memory, dict):
+                continue
+            score = memory.get("score")
+            if score is not None:
+                scores.append(score)
+                if score < threshold:
+                    continue
+            content = memory.get("content", {})
+            text = content.get("text", "").strip() if isinstance(content, dict) else ""
+            if text:
+                items.append(text)
+
+        if MEMORY_ADAPTIVE_TOP_K and len(scores) == len(memories):
+            _top_k.observe(actor_id, resolved_namespace, top_k, configured, scores, threshold)
+
+        _cache.put(actor_id, resolved_namespace, cache_query, items)
+        return items, f"top_k={top_k}"
@@ -0,0 +1,21 @@
+"""
+Observability
+=============
+Medición de fases de cada turno y trazas OpenTelemetry.
+"""
+from .phases import PHASES, PhaseHooks, add_phase_listener, remove_phase_listener, phase, record_phase
+from .tracing import hash_id, init_tracing, set_attributes, shutdown_tracing, start_span
+
+__all__ = [
+    "PHASES",
+    "PhaseHooks",
+    "add_phase_listener",
+    "remove_phase_listener",
+    "phase",
+    "record_phase",
+    "hash_id",
+    "init_tracing",
+    "set_attributes",
+    "shutdown_tracing",
+    "start_span",
+]
@@ -0,0 +1,91 @@
+"""
+Phases
+======
+Medición de las fases de un turno (config, auth, conexión MCP, listado de
+tools, memoria, modelo, tools y render).
+
+El código instrumentado abre `with phase("nombre"):`; la duración se entrega a
+los listeners registrados (p.ej. el benchmark de latencia) y, con trazas
+activas, la fase queda como un span (ver tracing.py). Sin listeners ni trazas
+la medición no hace nada.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent, HookProvider
+
+from .tracing import get_tracer
+
+CONFIG = "config"
+AUTH = "auth"
+MCP_CONNECT = "mcp_connect"
+TOOL_LISTING = "tool_listing"
+MEMORY_RETRIEVAL = "memory_retrieval"
+MODEL = "model"
+TOOLS = "tools"
+RENDER = "render"
+
+PHASES = (CONFIG, AUTH, MCP_CONNECT, TOOL_LISTING, MEMORY_RETRIEVAL, MODEL, TOOLS, RENDER)
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def add_phase_listener(listener):
+    """Registra `listener(nombre, segundos, atributos)` para cada fase medida."""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_phase_listener(listener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def record_phase(name: str, seconds: float, **attributes):
+    """Entrega una fase ya medida a los listeners."""
+    for listener in list(_listeners):
+        try:
+            listener(name, seconds, attributes)
+        except Exception as e:
+            print(f"⚠️ Error en listener de fases: {e}")
+
+
+@contextmanager
+def phase(name: str, **attributes):
+    """Mide la duración del bloque como la fase `name` (y la traza como span `phase.<name>`)."""
+    tracer = get_tracer()
+    if tracer is None and not _listeners:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        if tracer is None:
+            yield
+        else:
+            with tracer.start_as_current_span(f"phase.{name}", attributes=attributes):
+                yield
+    finally:
+        if _listeners:
+            record_phase(name, time.perf_counter() - started, **attributes)
+
+
+class PhaseHooks(HookProvider):
+    """Hooks del agente que miden cada llamada al modelo como la fase MODEL."""
+
+    def __init__(self):
+        self._started = None
+
+    def register_hooks(self, registry, **kwargs):
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+
+    def _before_model_call(self, event):
+        self._started = time.perf_counter()
+
+    def _after_model_call(self, event):
+        if self._started is not None:
+            record_phase(MODEL, time.perf_counter() - self._started)
+            self._started = None
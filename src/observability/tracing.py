@@ -0,0 +1,157 @@
+"""
+Tracing
+=======
+Trazas OpenTelemetry de los turnos del chat.
+
+- `init_tracing()` configura el TracerProvider del proceso (una sola vez) con
+  exportador OTLP; si no está disponible, usa consola o archivo JSONL.
+- Cada fase medida con `phase()` (SSM, Cognito, conexión MCP, listado de
+  tools, memoria) abre un span hijo del span del turno.
+- Las llamadas al modelo (con tokens) y a las tools del Gateway ya las traza
+  Strands con el mismo provider; aquí se agregan atributos (caché, cliente).
+- Los IDs de cliente y conversación van hasheados.
+- Desactivado (default), `start_span` y `set_attributes` no hacen nada.
+"""
+import atexit
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+
+from ..config import TRACING_ENABLED, TRACING_EXPORTER, TRACING_FILE, TRACING_SERVICE_NAME
+
+_tracer = None
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def hash_id(value) -> str:
+    """Hash corto de un identificador (actor_id, session_id) para usarlo como atributo."""
+    return hashlib.sha256(str(value).encode("utf-8")).hexdigest()[:16]
+
+
+class JsonFileSpanExporter:
+    """Exportador que agrega cada span como una línea JSON a un archivo."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        try:
+            lines = [json.dumps(json.loads(span.to_json()), ensure_ascii=False) for span in spans]
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            return SpanExportResult.SUCCESS
+        except Exception as e:
+            print(f"⚠️ Error escribiendo trazas en {self.path}: {e}")
+            return SpanExportResult.FAILURE
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def _create_exporter(kind: str):
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            return OTLPSpanExporter()
+        except Exception as e:
+            # Paquete ausente o configuración OTEL_* inválida: no dejar el proceso sin trazas
+            print(f"⚠️ Exportador OTLP no disponible ({e}), usando archivo {TRACING_FILE}")
+            kind = "file"
+    if kind == "file":
+        return JsonFileSpanExporter(TRACING_FILE)
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    return ConsoleSpanExporter()
+
+
+def init_tracing(enabled: bool = TRACING_ENABLED, exporter: str = TRACING_EXPORTER):
+    """
+    Configura las trazas del proceso (idempotente).
+    Si ya hay un TracerProvider del SDK (p.ej. `opentelemetry-instrument` de ADOT),
+    se reutiliza en lugar de crear otro.
+
+    Returns:
+        Tracer o None si las trazas están desactivadas
+    """
+    global _tracer, _initialized
+    if not enabled:
+        return None
+    with _init_lock:
+        if _initialized:
+            return _tracer
+        _initialized = True
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            provider = trace.get_tracer_provider()
+            if not isinstance(provider, TracerProvider):
+                provider = TracerProvider(resource=Resource.create({"service.name": TRACING_SERVICE_NAME}))
+                provider.add_span_processor(BatchSpanProcessor(_create_exporter(exporter)))
+                trace.set_tracer_provider(provider)
+                atexit.register(shutdown_tracing)
+            _tracer = provider.get_tracer("jamar.agent")
+            print(f"🔭 Trazas OpenTelemetry activas ({exporter})")
+        except Exception as e:
+            print(f"⚠️ No se pudieron configurar las trazas: {e}")
+            _tracer = None
+        return _tracer
+
+
+def shutdown_tracing():
+    """Exporta los spans pendientes y cierra el provider."""
+    from opentelemetry import trace
+
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+
+def get_tracer():
+    """Tracer del proceso, o None si las trazas están desactivadas."""
+    return _tracer
+
+
+def _clean(attributes: dict) -> dict:
+    # OpenTelemetry solo acepta str, bool, int, float y listas de ellos
+    clean = {}
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, (str, bool, int, float)):
+            clean[key] = value
+        elif isinstance(value, (list, tuple)):
+            clean[key] = [item if isinstance(item, (str, bool, int, float)) else str(item) for item in value]
+        else:
+            clean[key] = str(value)
+    return clean
+
+
+@contextmanager
+def start_span(name: str, **attributes):
+    """Abre un span hijo del span actual (no hace nada si las trazas están desactivadas)."""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=_clean(attributes)) as span:
+        yield span
+
+
+def set_attributes(**attributes):
+    """Agrega atributos al span actual (p.ej. el de la tool o la fase en curso)."""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes(_clean(attributes))
@@ -0,0 +1,121 @@
+"""Tests del conversation manager con resumen acumulado (src/core/conversation.py)."""
+from types import SimpleNamespace
+
+import pytest
+
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+
+from src.core.conversation import SUMMARY_TAG, RollingSummaryConversationManager
+
+
+def user(text: str) -> dict:
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def assistant(text: str) -> dict:
+    return {"role": "assistant", "content": [{"text": text}]}
+
+
+def tool_use(name: str, arguments: dict) -> dict:
+    return {"role": "assistant", "content": [{"toolUse": {"toolUseId": "t1", "name": name, "input": arguments}}]}
+
+
+def tool_result(text: str) -> dict:
+    return {"role": "user", "content": [{"toolResult": {"toolUseId": "t1", "status": "success", "content": [{"text": text}]}}]}
+
+
+def sales_conversation() -> list:
+    return [
+        user("Hola, busco un comedor para 6 personas"),
+        assistant("¡Claro! ¿Cuál es tu presupuesto?"),
+        user("hasta 800 dólares"),
+        tool_use("jamar___buscar_productos", {"termino_busqueda": "comedor 6 puestos", "precio_maximo": 800}),
+        tool_result("Comedor Oslo, Comedor Bari"),
+        assistant("Tengo el Comedor Oslo y el Comedor Bari."),
+        user("Me llamo Ana y vivo en Barranquilla"),
+        tool_use("jamar___guardar_nombre_cliente", {"nombre": "Ana"}),
+        tool_result("ok"),
+        assistant("¡Gracias Ana!"),
+    ]
+
+
+def test_compact_keeps_recent_turns_and_summarizes_the_rest():
+    manager = RollingSummaryConversationManager(max_tokens=8000, keep_turns=1)
+    messages = sales_conversation()
+
+    assert manager._compact(messages, manager.keep_turns)
+
+    assert messages[0]["content"][1] == {"text": "Me llamo Ana y vivo en Barranquilla"}
+    summary = messages[0]["content"][0]["text"]
+    assert summary.startswith(f"<{SUMMARY_TAG}>")
+    assert manager.summarized_turns == 2
+    assert manager.removed_message_count == 6
+    assert manager.facts["categoria"] == "comedor"
+    assert manager.facts["puestos"] == "6"
+    assert manager.facts["presupuesto"] == "800"
+    assert manager.facts["busqueda"] == "comedor 6 puestos"
+    assert "Presupuesto: 800 USD" in summary
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("mi presupuesto es $1.500", "1.500"),
+    ("algo de maximo 900 dolares", "900"),
+    ("¿y el de $1.299?", None),
+    ("me gusto el de $899, tienen otro color?", None),
+])
+def test_budget_needs_a_budget_keyword(text, expected):
+    manager = RollingSummaryConversationManager()
+    manager._extract_facts(user(text))
+    assert manager.facts.get("presupuesto") == expected
+
+
+def test_compact_does_nothing_with_a_single_turn():
+    manager = RollingSummaryConversationManager(keep_turns=1)
+    messages = sales_conversation()[:2]
+    assert not manager._compact(messages, 1)
+    assert len(messages) == 2
+
+
+def test_token_budget_folds_turns_beyond_keep_turns():
+    manager = RollingSummaryConversationManager(max_tokens=30, keep_turns=6)
+    messages = sales_conversation()
+    manager._compact(messages, manager.keep_turns)
+    assert manager.summarized_turns == 2
+
+
+def test_injected_user_context_is_not_counted_as_removed():
+    manager = RollingSummaryConversationManager(keep_turns=1)
+    messages = [user("hola"), assistant("<user_context>Se llama Ana</user_context>"), assistant("¡Hola!"), user("gracias")]
+    manager._compact(messages, 1)
+    assert manager.removed_message_count == 2
+
+
+def test_state_round_trip_restores_the_summary():
+    manager = RollingSummaryConversationManager(keep_turns=1)
+    manager._compact(sales_conversation(), 1)
+
+    restored = RollingSummaryConversationManager(keep_turns=1)
+    assert restored.restore_from_session(manager.get_state()) is None
+    assert restored.facts == manager.facts
+    assert restored.summarized_turns == manager.summarized_turns
+    assert restored.removed_message_count == manager.removed_message_count
+
+    # El resumen se agrega de nuevo antes de la siguiente llamada al modelo
+    messages = [user("¿y en otro color?")]
+    restored._on_before_model_call(SimpleNamespace(agent=SimpleNamespace(messages=messages)))
+    assert messages[0]["content"][0]["text"] == manager.summary_text()
+
+
+def test_restores_a_saved_sliding_window_state():
+    old = SlidingWindowConversationManager(window_size=40)
+    old.removed_message_count = 12
+    state = old.get_state()
+    assert state["__name__"] == "SlidingWindowConversationManager"
+
+    manager = RollingSummaryConversationManager()
+    assert manager.restore_from_session(state) is None
+    assert manager.removed_message_count == 12
+    assert manager.facts == {}
+    assert manager.summarized_turns == 0
+    # El estado guardado de nuevo ya es del manager actual
+    assert manager.get_state()["__name__"] == "RollingSummaryConversationManager"
@@ -0,0 +1,94 @@
+"""Tests del motor de ejecución (src/core/engine.py)."""
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.engine import AgentExecutionEngine
+from src.core.streaming import DONE, TEXT, TOOL
+from src.core.turns import store_answer
+
+SESSION = ("ana", "s1")
+
+
+class FakeAgent:
+    """Agente mínimo que responde `answer` después de esperar `release` (si se da)."""
+
+    def __init__(self, answer: str, release: threading.Event = None):
+        self.answer = answer
+        self.release = release
+        self.messages = []
+        self.callback_handler = None
+
+    async def stream_async(self, prompt, invocation_state=None):
+        if self.release is not None:
+            self.release.wait(5)
+        self.messages.append({"role": "user", "content": [{"text": prompt}]})
+        yield {"data": self.answer}
+        self.messages.append({"role": "assistant", "content": [{"text": self.answer}]})
+        yield {"result": SimpleNamespace(metrics=SimpleNamespace(accumulated_usage={}))}
+
+
+def opener(agent: FakeAgent):
+    @contextmanager
+    def open_agent():
+        yield agent
+
+    return open_agent
+
+
+@pytest.fixture
+def engine():
+    engine = AgentExecutionEngine(max_concurrency=2)
+    yield engine
+    engine.shutdown()
+
+
+def test_routed_answer_is_resolved_in_the_worker_after_previous_turns(engine):
+    release = threading.Event()
+    recorded = []
+    callers = []
+
+    def route():
+        callers.append(threading.current_thread())
+        return "🏬 Jamar David: Plaza Terronal", ["buscar_sucursal"]
+
+    first = engine.submit(SESSION, "busco un comedor", opener(FakeAgent("Tengo el Oslo", release)))
+    routed = engine.submit(SESSION, "tiendas en David", opener(FakeAgent("no debería usarse")),
+                           route=route, record=recorded.extend)
+    # Enviar no ejecuta la ruta: el hilo de la UI nunca espera la tool
+    assert callers == [] and not routed.done()
+
+    release.set()
+    assert first.result(timeout=5) is not None
+    assert routed.result(timeout=5) == "🏬 Jamar David: Plaza Terronal"
+    assert callers[0] is not threading.current_thread()
+    assert routed.next_events() == [
+        (TOOL, "buscar_sucursal"), (TEXT, "🏬 Jamar David: Plaza Terronal"), (DONE, "🏬 Jamar David: Plaza Terronal"),
+    ]
+    assert routed.direct
+    engine.submit(SESSION, "sync", opener(FakeAgent("ok"))).result(timeout=5)
+    assert recorded == [
+        {"role": "user", "content": [{"text": "tiendas en David"}]},
+        {"role": "assistant", "content": [{"text": "🏬 Jamar David: Plaza Terronal"}]},
+    ]
+
+
+@pytest.mark.parametrize("route", [lambda: None, lambda: 1 / 0])
+def test_unavailable_route_falls_back_to_the_agent(engine, route):
+    recorded = []
+    handle = engine.submit(SESSION, "ayuda", opener(FakeAgent("Puedo buscar productos")), route=route, record=recorded.append)
+    assert handle.result(timeout=5) is not None
+    assert handle.text == "Puedo buscar productos"
+    assert not handle.direct
+    assert recorded == []
+
+
+def test_direct_answers_are_not_stored_in_the_response_cache(engine, monkeypatch):
+    stored = []
+    monkeypatch.setattr("src.core.response_cache._cache", SimpleNamespace(store=lambda *args: stored.append(args)))
+    handle = engine.submit_cached(SESSION, "cual es la garantia", "Un año.", record=lambda messages: None)
+    handle.faq_candidate = True
+    store_answer(handle, "Un año.")
+    assert stored == []
@@ -0,0 +1,81 @@
+"""Tests del clasificador de intenciones (src/core/intents.py)."""
+import pytest
+
+from src.core.intents import GREETING, INTENT_TOOLS, MENU, PATTERNS, POLICIES, STORES, _result_text, classify_intent
+
+ALL_INTENTS = list(PATTERNS)
+
+
+@pytest.mark.parametrize("prompt, intent", [
+    ("Hola", GREETING),
+    ("¡Holaaa!", GREETING),
+    ("Buenas tardes, ¿cómo estás?", GREETING),
+    ("¿Qué puedes hacer?", MENU),
+    ("Muéstrame el menú", MENU),
+    ("ayuda", MENU),
+    ("¿Cuál es la política de garantía?", POLICIES),
+    ("políticas de envío", POLICIES),
+    ("¿Dónde quedan las tiendas?", STORES),
+    ("sucursales en David", STORES),
+])
+def test_simple_messages_are_routed(prompt, intent):
+    routed = classify_intent(prompt, ALL_INTENTS)
+    assert routed is not None and routed.name == intent
+
+
+@pytest.mark.parametrize("prompt", [
+    "hola, busco un comedor",
+    "quiero ver sofás cama",
+    "¿cuál es la garantía del comedor Oslo?",
+    "¿hay tiendas que vendan colchones de 2 plazas?",
+    "gracias, eso es todo por hoy",
+    "chao",
+    "",
+    "hola " * 30,
+])
+def test_anything_else_goes_to_the_agent(prompt):
+    assert classify_intent(prompt, ALL_INTENTS) is None
+
+
+@pytest.mark.parametrize("prompt, first_turn, intent", [
+    ("opciones", True, MENU),
+    ("Hola, ayuda", True, MENU),
+    ("opciones", False, None),
+    ("ayuda", False, None),
+    ("¿Qué puedes hacer?", False, MENU),
+    ("Muéstrame el menú", False, MENU),
+])
+def test_bare_menu_words_are_routed_only_on_the_first_turn(prompt, first_turn, intent):
+    # Más adelante "opciones" suele responder al agente ("¿quieres ver opciones?")
+    routed = classify_intent(prompt, ALL_INTENTS, first_turn=first_turn)
+    assert (routed.name if routed else None) == intent
+
+
+def test_goodbyes_are_never_routed():
+    # obtener_despedida necesita el nombre del cliente y si compró: solo el agente los tiene
+    assert "obtener_despedida" not in INTENT_TOOLS.values()
+    assert classify_intent("adiós, gracias", ALL_INTENTS + ["despedida"]) is None
+
+
+def test_tool_arguments_come_from_the_message():
+    assert classify_intent("condiciones de devoluciones", ALL_INTENTS).arguments == {"tipo": "devoluciones"}
+    assert classify_intent("¿Hay tienda en Ciudad de Panamá?", ALL_INTENTS).arguments == {"zona": "Ciudad de Panamá"}
+    assert classify_intent("tiendas", ALL_INTENTS).arguments == {}
+
+
+def test_greetings_use_a_template():
+    routed = classify_intent("hola", ALL_INTENTS)
+    assert routed.tool is None
+    assert classify_intent("ayuda", ALL_INTENTS).tool == "obtener_menu_principal"
+
+
+def test_disabled_intents_are_not_routed():
+    assert classify_intent("hola", [MENU]) is None
+
+
+def test_only_plain_text_results_are_shown_directly():
+    text = {"status": "success", "content": [{"text": "🏬 Jamar David: Plaza Terronal"}]}
+    assert _result_text(text) == "🏬 Jamar David: Plaza Terronal"
+    assert _result_text({"status": "success", "content": [{"text": '{"tiendas": []}'}]}) is None
+    assert _result_text({"status": "error", "content": [{"text": "timeout"}]}) is None
+    assert _result_text(None) is None
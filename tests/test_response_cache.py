@@ -0,0 +1,111 @@
+"""Tests de la caché de respuestas (src/core/response_cache.py)."""
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from src.core.engine import AgentExecutionEngine
+from src.core.response_cache import ResponseCache, minhash_signature, normalize_prompt, similarity
+from src.core.turns import store_answer
+
+TOOLS = ["obtener_politicas"]
+
+
+def make_cache(**kwargs) -> ResponseCache:
+    kwargs.setdefault("threshold", 0.8)
+    kwargs.setdefault("excluded_terms", ["pedido", "mi nombre"])
+    kwargs.setdefault("allowed_tools", TOOLS)
+    return ResponseCache(**kwargs)
+
+
+def test_normalize_prompt_drops_accents_case_and_punctuation():
+    assert normalize_prompt("¿Cuánto  cuesta el ENVÍO?") == "cuanto cuesta el envio"
+
+
+def test_similar_prompts_share_most_of_the_signature():
+    a = minhash_signature(normalize_prompt("cuanto cuesta el envio"))
+    b = minhash_signature(normalize_prompt("cuanto cuesta el envio?"))
+    c = minhash_signature(normalize_prompt("tienen sofas cama"))
+    assert similarity(a, b) == 1.0
+    assert similarity(a, c) < 0.3
+
+
+def test_lookup_serves_a_rephrased_question():
+    cache = make_cache(threshold=0.6)
+    assert cache.store("¿Cuánto cuesta el envío a domicilio?", "El envío es gratis.", TOOLS)
+    answer, score = cache.lookup("cuanto cuesta el envio a domicilio")
+    assert answer == "El envío es gratis."
+    assert score == 1.0
+    assert cache.lookup("cuanto cuesta el envio al domicilio")[0] == "El envío es gratis."
+    assert cache.lookup("quiero ver comedores") is None
+
+
+def test_excluded_prompts_are_never_stored_or_served():
+    cache = make_cache()
+    assert not cache.store("estado de mi pedido", "Tu pedido va en camino.", TOOLS)
+    assert not cache.store("cuanto cuesta el envio a 10 km", "Gratis.", TOOLS)
+    assert cache.is_excluded("mi nombre es Ana")
+    assert cache.lookup("estado de mi pedido") is None
+
+
+def test_answers_need_informative_tools():
+    cache = make_cache()
+    assert not cache.store("cual es la garantia", "Un año.", [])
+    assert not cache.store("cual es la garantia", "Un año.", ["obtener_politicas", "consultar_pedido"])
+    assert cache.store("cual es la garantia", "Un año.", ["gateway___obtener_politicas"])
+
+
+def test_expired_entries_are_not_served():
+    cache = make_cache(ttl=0)
+    cache.store("cual es la garantia", "Un año.", TOOLS)
+    assert cache.lookup("cual es la garantia") is None
+    assert cache.metrics()["entries"] == 0
+
+
+class FakeAgent:
+    """Agente mínimo: responde con `answer` y, si hay memoria, inyecta el contexto del cliente."""
+
+    def __init__(self, answer: str, memory: str = None):
+        self.answer = answer
+        self.memory = memory
+        self.messages = []
+        self.callback_handler = None
+
+    async def stream_async(self, prompt, invocation_state=None):
+        self.messages.append({"role": "user", "content": [{"text": prompt}]})
+        if self.memory:
+            self.messages.append({"role": "assistant", "content": [{"text": f"<user_context>{self.memory}</user_context>"}]})
+        yield {"current_tool_use": {"toolUseId": "t1", "name": "obtener_politicas"}}
+        yield {"data": self.answer}
+        self.messages.append({"role": "assistant", "content": [{"text": self.answer}]})
+        yield {"result": SimpleNamespace(metrics=SimpleNamespace(accumulated_usage={}))}
+
+
+def run_first_turn(engine, actor_id: str, prompt: str, agent: FakeAgent):
+    @contextmanager
+    def open_agent():
+        yield agent
+
+    handle = engine.submit((actor_id, "s1"), prompt, open_agent)
+    handle.faq_candidate = True
+    handle.result(timeout=5)
+    return handle
+
+
+def test_personalized_answer_is_never_served_to_another_actor(monkeypatch):
+    cache = make_cache()
+    monkeypatch.setattr("src.core.response_cache._cache", cache)
+    engine = AgentExecutionEngine(max_concurrency=1)
+    try:
+        answer = "¡Hola Ana! Como compraste el comedor Oslo, tu envío es gratis."
+        handle = run_first_turn(engine, "ana", "cuanto cuesta el envio", FakeAgent(answer, memory="Se llama Ana"))
+        assert handle.personalized
+        store_answer(handle, answer)
+        assert cache.lookup("cuanto cuesta el envio") is None
+
+        # Sin memoria del cliente la misma pregunta sí se cachea
+        generic = "El envío es gratis en la ciudad."
+        handle = run_first_turn(engine, "luis", "cuanto cuesta el envio", FakeAgent(generic))
+        assert not handle.personalized
+        store_answer(handle, generic)
+        assert cache.lookup("cuanto cuesta el envio")[0] == generic
+    finally:
+        engine.shutdown()
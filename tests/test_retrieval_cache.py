@@ -0,0 +1,134 @@
+"""Tests de la caché de recuperación de memoria (src/memory/retrieval.py)."""
+from types import SimpleNamespace
+
+from bedrock_agentcore.memory.integrations.strands.config import RetrievalConfig
+
+from src.memory.retrieval import (
+    MAX_ENTRIES_PER_ACTOR,
+    CachedMemorySessionManager,
+    RetrievalCache,
+    get_retrieval_cache,
+    has_customer_context,
+)
+
+NAMESPACE = "shopify/customer/ana/preferences"
+
+
+def test_results_are_reused_for_the_same_query():
+    cache = RetrievalCache(ttl=60)
+    assert cache.get("ana", NAMESPACE, "busco un comedor") is None
+    cache.put("ana", NAMESPACE, "busco un comedor", ["Prefiere madera clara"])
+    assert cache.get("ana", NAMESPACE, "busco un comedor") == ["Prefiere madera clara"]
+    assert cache.metrics() == {"actors": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_entries_are_per_actor_namespace_and_query():
+    cache = RetrievalCache(ttl=60)
+    cache.put("ana", NAMESPACE, "busco un comedor", ["Prefiere madera clara"])
+    assert cache.get("luis", NAMESPACE, "busco un comedor") is None
+    assert cache.get("ana", "shopify/customer/ana/interactions", "busco un comedor") is None
+    # Otro mensaje de la misma conversación no reutiliza los resultados del primero
+    assert cache.get("ana", NAMESPACE, "y cuanto cuesta el envio") is None
+
+
+def test_any_write_for_the_actor_invalidates():
+    cache = RetrievalCache(ttl=60)
+    cache.put("ana", NAMESPACE, "busco un comedor", ["Prefiere madera clara"])
+    cache.put("luis", NAMESPACE, "busco un comedor", [])
+    cache.record_write("ana")
+    assert cache.get("ana", NAMESPACE, "busco un comedor") is None
+    # Otros clientes no se ven afectados
+    assert cache.get("luis", NAMESPACE, "busco un comedor") == []
+
+
+def test_expired_entries_and_explicit_invalidation():
+    cache = RetrievalCache(ttl=0)
+    cache.put("ana", NAMESPACE, "hola", ["Prefiere madera clara"])
+    assert cache.get("ana", NAMESPACE, "hola") is None
+
+    cache = RetrievalCache(ttl=60)
+    cache.put("ana", NAMESPACE, "hola", ["Prefiere madera clara"])
+    cache.put("luis", NAMESPACE, "hola", ["Vive en Barranquilla"])
+    cache.invalidate("ana")
+    assert cache.get("ana", NAMESPACE, "hola") is None
+    assert cache.get("luis", NAMESPACE, "hola") == ["Vive en Barranquilla"]
+    cache.invalidate()
+    assert cache.get("luis", NAMESPACE, "hola") is None
+
+
+def test_entries_per_actor_are_bounded():
+    cache = RetrievalCache(ttl=60)
+    for i in range(MAX_ENTRIES_PER_ACTOR + 1):
+        cache.put("ana", NAMESPACE, f"consulta {i}", [str(i)])
+    assert cache.get("ana", NAMESPACE, "consulta 0") is None
+    assert cache.get("ana", NAMESPACE, f"consulta {MAX_ENTRIES_PER_ACTOR}") == [str(MAX_ENTRIES_PER_ACTOR)]
+
+
+class FakeMemoryClient:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def retrieve_memories(self, memory_id, namespace, query, top_k):
+        self.queries.append(query)
+        return [{"content": {"text": text}, "score": 0.9} for text in self.records]
+
+
+def session_manager(records):
+    manager = CachedMemorySessionManager.__new__(CachedMemorySessionManager)
+    manager.config = SimpleNamespace(
+        actor_id="ana-test",
+        session_id="s1",
+        memory_id="mem-1",
+        retrieval_config={"/preferences/{actorId}": RetrievalConfig(top_k=5, relevance_score=0.3)},
+    )
+    manager.memory_client = FakeMemoryClient(records)
+    return manager
+
+
+def ask(manager, agent, text):
+    agent.messages.append({"role": "user", "content": [{"text": text}]})
+    manager.retrieve_customer_context(SimpleNamespace(agent=agent))
+    agent.messages.append({"role": "assistant", "content": [{"text": "Claro."}]})
+
+
+def test_repeated_query_is_served_from_cache_after_normalizing():
+    get_retrieval_cache().invalidate("ana-test")
+    manager = session_manager(["Prefiere madera clara"])
+    agent = SimpleNamespace(messages=[])
+
+    ask(manager, agent, "¿Tienen comedores?")
+    ask(manager, agent, "tienen comedores")
+    assert manager.memory_client.queries == ["¿Tienen comedores?"]
+
+    get_retrieval_cache().record_write("ana-test")
+    ask(manager, agent, "tienen comedores")
+    assert len(manager.memory_client.queries) == 2
+
+
+def test_unchanged_context_is_not_injected_again():
+    get_retrieval_cache().invalidate("ana-test")
+    manager = session_manager(["Prefiere madera clara"])
+    agent = SimpleNamespace(messages=[])
+
+    ask(manager, agent, "hola")
+    ask(manager, agent, "busco un comedor")
+    contexts = [message for message in agent.messages if "<user_context>" in message["content"][0]["text"]]
+    assert len(contexts) == 1
+
+    # Si cambia lo que se sabe del cliente, se agrega el contexto nuevo
+    manager.memory_client.records = ["Prefiere madera clara", "Vive en Barranquilla"]
+    ask(manager, agent, "y sillas")
+    contexts = [message for message in agent.messages if "<user_context>" in message["content"][0]["text"]]
+    assert len(contexts) == 2
+
+
+def test_customer_context_in_history_counts_for_later_turns():
+    messages = [{"role": "user", "content": [{"text": "cuanto cuesta el envio"}]}]
+    assert not has_customer_context(messages, "cuanto cuesta el envio")
+    messages += [
+        {"role": "assistant", "content": [{"text": "<user_context>Se llama Ana</user_context>"}]},
+        {"role": "assistant", "content": [{"text": "¡Hola Ana!"}]},
+        {"role": "user", "content": [{"text": "y la garantia"}]},
+    ]
+    assert has_customer_context(messages, "y la garantia")
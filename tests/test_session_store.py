@@ -0,0 +1,148 @@
+"""Tests del store de sesiones (src/core/session_store.py)."""
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from benchmarks.stand_ins import LocalRespServer
+from src.core.session_store import (
+    COMPRESS_MIN_BYTES,
+    MAX_STORED_MESSAGES,
+    MemorySessionStore,
+    RedisSessionStore,
+    SQLiteSessionStore,
+    conversation_state,
+    create_session_store,
+    decode_state,
+    encode_state,
+)
+
+
+def sample_state(messages: int = 2) -> dict:
+    history = []
+    for i in range(messages):
+        history.append({"role": "user", "content": f"¿Tienen comedores de {i} puestos?"})
+        history.append({"role": "assistant", "content": "Sí, el Comedor Oslo 🍽️"})
+    return conversation_state("s1", history)
+
+
+def test_small_states_are_plain_json_and_large_ones_compressed():
+    small = sample_state(1)
+    data = encode_state(small)
+    assert data[:1] == b"j"
+    assert decode_state(data) == small
+
+    large = sample_state(50)
+    raw = json.dumps(large, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert len(raw) >= COMPRESS_MIN_BYTES
+    data = encode_state(large)
+    assert data[:1] == b"z"
+    assert len(data) < len(raw)
+    assert decode_state(data) == large
+
+
+def test_conversation_state_keeps_products_and_the_latest_messages():
+    messages = [{"role": "user", "content": str(i)} for i in range(MAX_STORED_MESSAGES + 5)]
+    messages.append({"role": "assistant", "content": "Mira estos", "products": [{"name": "Comedor Oslo"}], "render": object()})
+    state = conversation_state("s1", messages)
+    assert state["session_id"] == "s1"
+    assert len(state["messages"]) == MAX_STORED_MESSAGES
+    assert state["messages"][-1] == {"role": "assistant", "content": "Mira estos", "products": [{"name": "Comedor Oslo"}]}
+    assert "products" not in state["messages"][0]
+
+
+@pytest.fixture
+def redis_url():
+    server = LocalRespServer()
+    try:
+        yield server.start()
+    finally:
+        server.stop()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemorySessionStore(ttl=60)
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=60)
+    else:
+        store = RedisSessionStore(request.getfixturevalue("redis_url"), ttl=60)
+    yield store
+    store.close()
+
+
+def test_round_trip(store):
+    assert store.get("ana") is None
+    state = sample_state(30)
+    store.put("ana", state)
+    assert store.get("ana") == state
+    replacement = sample_state(1)
+    store.put("ana", replacement)
+    assert store.get("ana") == replacement
+    store.delete("ana")
+    assert store.get("ana") is None
+
+
+def test_expired_states_are_not_returned(tmp_path):
+    for store in (MemorySessionStore(ttl=0), SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=0)):
+        store.put("ana", sample_state(1))
+        assert store.get("ana") is None
+        store.close()
+
+
+def test_memory_store_evicts_the_least_recently_written():
+    store = MemorySessionStore(ttl=60, max_entries=2)
+    for actor in ("ana", "luis", "sofia"):
+        store.put(actor, sample_state(1))
+    assert store.get("ana") is None
+    assert store.get("sofia") is not None
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionStore(path, ttl=60), SQLiteSessionStore(path, ttl=60)
+    state = sample_state(1)
+    first.put("ana", state)
+    assert second.get("ana") == state
+    first.close()
+    second.close()
+
+
+def test_sqlite_store_closes_the_connections_of_every_thread(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=60)
+    store.PURGE_EVERY = 4
+    writers = [
+        threading.Thread(target=store.put, args=(f"cliente-{i}", sample_state(1)))
+        for i in range(8)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    connections = list(store._connections.values()) + [store._local.connection]
+    assert store._writes == 8
+
+    store.close()
+
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+    # El store sigue usable después de cerrar
+    assert store.get("cliente-0") is not None
+    store.close()
+
+
+def test_redis_store_reconnects_after_a_dropped_connection(redis_url):
+    store = RedisSessionStore(redis_url, ttl=60)
+    assert store.ping()
+    store._idle[0].close()
+    state = sample_state(1)
+    store.put("ana", state)
+    assert store.get("ana") == state
+    store.close()
+
+
+def test_unknown_backend_falls_back_to_memory():
+    assert isinstance(create_session_store("dynamo"), MemorySessionStore)
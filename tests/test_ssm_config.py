@@ -0,0 +1,80 @@
+"""Tests de la configuración del Gateway leída de SSM (gateway/ssm_config.py y gateway/utils.py)."""
+import pytest
+
+import gateway.ssm_config as ssm_config
+from gateway.ssm_config import SSM_CONFIG_PATH, SSMConfigLoader
+from gateway.utils import get_or_create_cognito_pool, get_ssm_parameter
+
+VALUES = {
+    f"{SSM_CONFIG_PATH}cognito_client_id": "client-123",
+    f"{SSM_CONFIG_PATH}cognito_discovery_url": "https://cognito.example/.well-known/openid-configuration",
+    f"{SSM_CONFIG_PATH}cognito_pool_id": "us-east-1_pool",
+}
+
+
+class FakeSSM:
+    """Cliente SSM que puede negar las lecturas en lote."""
+
+    def __init__(self, batch_fails: bool = False):
+        self.batch_fails = batch_fails
+        self.calls = []
+
+    def get_paginator(self, operation):
+        client = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                client.calls.append("get_parameters_by_path")
+                if client.batch_fails:
+                    raise RuntimeError("AccessDenied")
+                return [{"Parameters": [{"Name": name, "Value": value} for name, value in VALUES.items()]}]
+
+        return Paginator()
+
+    def get_parameters(self, Names, WithDecryption=False):
+        self.calls.append("get_parameters")
+        if self.batch_fails:
+            raise RuntimeError("AccessDenied")
+        return {"Parameters": [{"Name": name, "Value": VALUES[name]} for name in Names if name in VALUES]}
+
+    def get_parameter(self, Name, WithDecryption=False):
+        self.calls.append("get_parameter")
+        return {"Parameter": {"Name": Name, "Value": VALUES[Name]}}
+
+
+@pytest.fixture
+def fake_ssm(monkeypatch):
+    def install(batch_fails: bool = False):
+        client = FakeSSM(batch_fails)
+        monkeypatch.setattr(ssm_config, "_clients", {None: client})
+        monkeypatch.setattr(ssm_config, "_loaders", {None: SSMConfigLoader(None, client=client)})
+        monkeypatch.setattr("boto3.session.Session", lambda: type("Session", (), {"region_name": None})())
+        return client
+
+    return install
+
+
+def test_configuration_is_read_in_one_batch(fake_ssm):
+    client = fake_ssm()
+
+    config = get_or_create_cognito_pool()
+    get_or_create_cognito_pool()
+
+    assert config["client_id"] == "client-123"
+    assert client.calls == ["get_parameters_by_path"]
+
+
+def test_failed_batch_falls_back_to_single_parameters(fake_ssm):
+    client = fake_ssm(batch_fails=True)
+
+    config = get_or_create_cognito_pool()
+
+    assert config["pool_id"] == "us-east-1_pool"
+    assert config["discovery_url"] == VALUES[f"{SSM_CONFIG_PATH}cognito_discovery_url"]
+    assert client.calls.count("get_parameter") == 3
+
+
+def test_get_ssm_parameter_survives_failed_batch(fake_ssm):
+    fake_ssm(batch_fails=True)
+
+    assert get_ssm_parameter(f"{SSM_CONFIG_PATH}cognito_client_id") == "client-123"
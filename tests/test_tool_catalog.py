@@ -0,0 +1,89 @@
+"""Tests del catálogo de tools y su relación con el pool MCP (src/core/tool_catalog.py)."""
+import gc
+import time
+import weakref
+
+from src.core.mcp_pool import MCPSessionPool
+from src.core.tool_catalog import ToolCatalog, get_tool_catalog
+
+
+class FakeTool:
+    def __init__(self, name: str, client):
+        self.tool_name = name
+        self.tool_spec = {"name": name, "description": name, "inputSchema": {"json": {}}}
+        # Como MCPAgentTool: la tool retiene al cliente que la listó
+        self.mcp_client = client
+
+
+class FakeClient:
+    def __init__(self, names=("jamar___ver_categorias", "jamar___obtener_politicas")):
+        self.names = names
+        self.listings = 0
+        self.running = False
+
+    def start(self):
+        self.running = True
+
+    def stop(self, *args):
+        self.running = False
+
+    def _is_session_active(self):
+        return self.running
+
+    def list_tools_sync(self, pagination_token=None):
+        self.listings += 1
+        return [FakeTool(name, self) for name in self.names]
+
+
+def test_tools_are_listed_once_per_client():
+    catalog = ToolCatalog(ttl=60)
+    client = FakeClient()
+    first = catalog.get_tools(client)
+    assert catalog.get_tools(client) is first
+    assert client.listings == 1
+    assert catalog.version == 1
+
+
+def test_same_fingerprint_keeps_the_version():
+    catalog = ToolCatalog(ttl=60)
+    catalog.get_tools(FakeClient())
+    catalog.get_tools(FakeClient())
+    assert catalog.version == 1
+    catalog.get_tools(FakeClient(names=("jamar___buscar_productos",)))
+    assert catalog.version == 2
+
+
+def test_closed_pool_session_releases_its_catalog_entry():
+    catalog = get_tool_catalog()
+    catalog.invalidate()
+    pool = MCPSessionPool(FakeClient, size=1)
+
+    session = pool.acquire()
+    client_ref = weakref.ref(session.client)
+    catalog.get_tools(session.client)
+    assert session.client in catalog._entries
+
+    pool.release(session, discard=True)
+    del session
+    gc.collect()
+    assert client_ref() is None
+    assert not catalog._entries
+
+
+def test_reconnected_session_releases_the_old_client():
+    catalog = get_tool_catalog()
+    catalog.invalidate()
+    pool = MCPSessionPool(FakeClient, size=1, max_session_age=0.0001)
+
+    session = pool.acquire()
+    old = session.client
+    catalog.get_tools(old)
+    pool.release(session)
+    # La sesión superó su edad máxima: al prestarla se recicla
+    time.sleep(0.001)
+    session = pool.acquire()
+    assert session.client is not old
+    assert old not in catalog._entries
+    pool.release(session)
+    pool.close()
+    assert not catalog._entries
@@ -0,0 +1,57 @@
+"""Tests del ejecutor concurrente de tools (src/core/tool_executor.py)."""
+import asyncio
+
+import pytest
+from strands.tools.executors._executor import ToolExecutor
+from strands.types._events import ToolResultEvent
+
+from src.core.tool_executor import BoundedConcurrentToolExecutor
+
+
+def fake_tool(delay: float, progress: int = 0):
+    """Stream de una tool que tarda `delay` segundos y emite `progress` eventos antes del resultado."""
+
+    async def stream(agent, tool_use, tool_results, *args, **kwargs):
+        for i in range(progress):
+            yield {"progress": i}
+        await asyncio.sleep(delay)
+        result = {"toolUseId": tool_use["toolUseId"], "status": "success", "content": [{"text": "ok"}]}
+        tool_results.append(result)
+        yield ToolResultEvent(result)
+
+    return staticmethod(stream)
+
+
+def run_step(executor, consumer_delay: float = 0.0):
+    """Ejecuta un paso con una tool; el consumidor tarda `consumer_delay` en tomar cada evento."""
+    tool_results = []
+    invocation_state = {}
+
+    async def consume():
+        tool_uses = [{"toolUseId": "t1", "name": "jamar___buscar_productos", "input": {}}]
+        async for _ in executor._execute(None, tool_uses, tool_results, None, None, invocation_state):
+            await asyncio.sleep(consumer_delay)
+
+    asyncio.run(consume())
+    return tool_results, invocation_state["tool_trace"][0]
+
+
+def test_slow_tool_times_out(monkeypatch):
+    monkeypatch.setattr(ToolExecutor, "_stream_with_trace", fake_tool(delay=1.0))
+
+    results, record = run_step(BoundedConcurrentToolExecutor(tool_timeout=0.1))
+
+    assert record["status"] == "timeout"
+    assert results[0]["status"] == "error"
+    assert record["end"] - record["start"] < 0.5
+
+
+@pytest.mark.parametrize("progress", [0, 3])
+def test_slow_consumer_does_not_count_against_the_tool(monkeypatch, progress):
+    # La tool responde en 20ms; el consumidor tarda 200ms por evento (más que el timeout)
+    monkeypatch.setattr(ToolExecutor, "_stream_with_trace", fake_tool(delay=0.02, progress=progress))
+
+    results, record = run_step(BoundedConcurrentToolExecutor(tool_timeout=0.15), consumer_delay=0.2)
+
+    assert record["status"] == "success"
+    assert results == [{"toolUseId": "t1", "status": "success", "content": [{"text": "ok"}]}]